@@ -0,0 +1,173 @@
+import csv
+import functools
+import io
+import json
+import shutil
+import struct
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+from batch import (FileResult, RecordWriter, RECORD_FIELDS, apply_new_command_config, apply_privet_smirnovoy,
+                   collect_files, compact, group_commit, load_privet_smirnovoy_sampler, map_files, read_metadata)
+from preferences import NewCommandConfig, PrivetSmirnovoyConfig
+from word import STAGED_FILE_SUFFIX, Metadata, MetadataSnapshot
+
+
+if __name__ == "__main__":
+    BETA_FOLDER = Path("Unittests")
+else:
+    BETA_FOLDER = Path(".")
+BETA_FILE_NAME_WITH_PROPERTIES = Path(BETA_FOLDER, "Beta word file with properties.docx")
+BETA_FILE_NAME_WITHOUT_PROPERTIES = Path(BETA_FOLDER, "Beta word file without properties.docx")
+
+
+class TestBatch(unittest.TestCase):
+    def test_collect_files_from_folder(self):
+        self.assertEqual([BETA_FILE_NAME_WITH_PROPERTIES, BETA_FILE_NAME_WITHOUT_PROPERTIES],
+                         list(collect_files([str(BETA_FOLDER)])), "Collected files are not as expected")
+
+    def test_collect_files_from_glob(self):
+        self.assertEqual([BETA_FILE_NAME_WITH_PROPERTIES],
+                         list(collect_files([str(Path(BETA_FOLDER, "* with properties.docx"))])),
+                         "Collected files are not as expected")
+
+    def test_collect_files_with_glob_characters_in_names(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            folder = Path(temp_folder, "Reports [2024]")
+            folder.mkdir()
+            file = Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, Path(folder, "Report [1].docx")))
+            self.assertEqual([file], list(collect_files([str(file)])), "Existing file was used as a glob pattern")
+            self.assertEqual([file], list(collect_files([str(folder)])), "Existing folder was used as a glob pattern")
+
+    def test_collect_files_without_glob_expansion(self):
+        pattern = str(Path(BETA_FOLDER, "* with properties.docx"))
+        self.assertEqual([Path(pattern)], list(collect_files([pattern], expand_globs=False)),
+                         "Dropped path was expanded as a glob pattern")
+        self.assertEqual([BETA_FILE_NAME_WITH_PROPERTIES, BETA_FILE_NAME_WITHOUT_PROPERTIES],
+                         list(collect_files([str(BETA_FOLDER)], expand_globs=False)), "Folder wasn't expanded")
+
+    def test_read_metadata(self):
+        expected_result = MetadataSnapshot(creator="user", last_modified_by="user", revision=2,
+                                           application_name="Microsoft Office Word", editing_time=None)
+        record = read_metadata(BETA_FILE_NAME_WITH_PROPERTIES)
+        self.assertEqual((expected_result, None), (record.snapshot, record.error), "Metadata record is not as expected")
+        self.assertEqual(BETA_FILE_NAME_WITH_PROPERTIES.stat().st_size, record.size, "File size is not as expected")
+
+    def test_read_metadata_of_bad_file(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            bad_file = Path(temp_folder, "bad.docx")
+            bad_file.write_bytes(b"not a zip file")
+            record = read_metadata(bad_file)
+        self.assertEqual((None, "BadZipFile: File is not a zip file"), (record.snapshot, record.error),
+                         "Error record is not as expected")
+
+    def test_read_metadata_of_corrupted_member(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            file = Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, temp_folder))
+            with zipfile.ZipFile(file) as zip_file:
+                zip_info = zip_file.getinfo("docProps/core.xml")
+                zip_file.fp.seek(zip_info.header_offset + zipfile.sizeFileHeader - 4)
+                name_length, extra_length = struct.unpack("<HH", zip_file.fp.read(4))
+            package = bytearray(file.read_bytes())
+            data_offset = zip_info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+            package[data_offset:data_offset + zip_info.compress_size] = b"\xff" * zip_info.compress_size
+            file.write_bytes(package)
+            record = read_metadata(file)
+        self.assertIsNone(record.snapshot, "Corrupted member was read")
+        self.assertTrue(record.error.startswith("error: "), f"Error record is not as expected: {record.error}")
+
+    def test_map_files_ordered(self):
+        paths = [BETA_FILE_NAME_WITH_PROPERTIES, Path("Missing.docx"), BETA_FILE_NAME_WITHOUT_PROPERTIES]
+        for workers in (1, 2):
+            records = list(map_files(read_metadata, paths, workers=workers, ordered=True))
+            self.assertEqual(paths, [record.path for record in records],
+                             f"Records order is not as expected with {workers} workers")
+            self.assertEqual("File Missing.docx was not found.", records[1].error,
+                             "Missing file error is not as expected")
+
+    def test_apply_new_command_config(self):
+        config = NewCommandConfig(creator="admin", last_modified_by="admin", application="Microsoft Office Word",
+                                  editing_time=60, revision=1)
+        with tempfile.TemporaryDirectory() as temp_folder:
+            file = Path(shutil.copy(BETA_FILE_NAME_WITHOUT_PROPERTIES, temp_folder))
+            self.assertEqual(FileResult(file, "success", None), apply_new_command_config(file, config),
+                             "File result is not as expected")
+            self.assertEqual(tuple(MetadataSnapshot("admin", "admin", 1, "Microsoft Office Word", 60)),
+                             tuple(Metadata(file).snapshot()), "File metadata is not as expected")
+            self.assertEqual(FileResult(file, "unchanged", None), apply_new_command_config(file, config),
+                             "Config was applied again to the file that already has its values")
+
+    def test_apply_privet_smirnovoy_failed_draw(self):
+        load_privet_smirnovoy_sampler(PrivetSmirnovoyConfig(("Excel",), ("User 1",), ("User 1",), 1, 1))
+        with mock.patch("preferences.PrivetSmirnovoySampler.draw", side_effect=OSError(5, "Input/output error")):
+            expected_result = FileResult(BETA_FILE_NAME_WITH_PROPERTIES, "failed",
+                                         "OSError: [Errno 5] Input/output error")
+            self.assertEqual(expected_result,
+                             apply_privet_smirnovoy(BETA_FILE_NAME_WITH_PROPERTIES),
+                             "Failed draw wasn't reported as a failed file")
+
+    def test_compact(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            file = Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, temp_folder))
+            self.assertEqual("skipped", compact(file).status, "Package without dead bytes was compacted")
+            Metadata(file, update_mode="append").creator = "admin"
+            self.assertEqual(FileResult(file, "success", None), compact(file), "File result is not as expected")
+            self.assertEqual("admin", Metadata(file).creator, "Compaction lost the appended entry")
+
+    def test_group_commit(self):
+        results = [FileResult(Path("a.docx"), "success", None), FileResult(Path("b.docx"), "failed", "Error"),
+                   FileResult(Path("c.docx"), "success", None)]
+        with mock.patch.dict("os.environ", {"METADATA_EDITOR_DURABILITY": "group"}), \
+                mock.patch("word.fsync_path") as synced:
+            self.assertEqual(results, list(group_commit(results, group_size=2)), "Results were changed")
+        self.assertEqual([mock.call(Path(".").absolute())], synced.call_args_list,
+                         "Group commit didn't sync only the folder once")
+
+    def test_group_commit_syncs_every_document_once(self):
+        config = NewCommandConfig("Beta creator", "admin", "Microsoft Office Word", 0, 1)
+        with tempfile.TemporaryDirectory() as temp_folder, \
+                mock.patch.dict("os.environ", {"METADATA_EDITOR_DURABILITY": "group"}), \
+                mock.patch("word.fsync_path") as synced:
+            files = [Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, Path(temp_folder, f"{number}.docx")))
+                     for number in range(2)]
+            results = list(group_commit(map_files(functools.partial(apply_new_command_config, config=config),
+                                                  files, workers=1)))
+        self.assertEqual(["success", "success"], [result.status for result in results], "Files weren't written")
+        synced_paths = [call.args[0] for call in synced.call_args_list]
+        self.assertEqual(2, sum(path.name.endswith(STAGED_FILE_SUFFIX) for path in synced_paths),
+                         "Staged files weren't synced once each")
+        self.assertEqual([Path(temp_folder).absolute()], [path for path in synced_paths
+                                                          if not path.name.endswith(STAGED_FILE_SUFFIX)],
+                         "Replaced files were synced again instead of their folder once")
+
+    def test_apply_new_command_config_skips_other_file_types(self):
+        config = NewCommandConfig("admin", "admin", "Microsoft Office Word", 0, 1)
+        self.assertEqual("skipped", apply_new_command_config(Path("Document.txt"), config).status,
+                         "File status is not as expected")
+
+    def test_record_writer_ndjson(self):
+        stream = io.StringIO()
+        RecordWriter(stream, "ndjson").write(read_metadata(Path("Missing.docx")))
+        row = json.loads(stream.getvalue())
+        self.assertEqual(list(RECORD_FIELDS), list(row), "NDJSON fields are not as expected")
+        self.assertEqual(("Missing.docx", None, "File Missing.docx was not found."),
+                         (row["path"], row["creator"], row["error"]), "NDJSON record is not as expected")
+
+    def test_record_writer_csv(self):
+        stream = io.StringIO()
+        RecordWriter(stream, "csv").write(read_metadata(BETA_FILE_NAME_WITH_PROPERTIES))
+        rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(1, len(rows), "CSV rows number is not as expected")
+        self.assertEqual(("user", "2", "Microsoft Office Word", ""),
+                         (rows[0]["creator"], rows[0]["revision"], rows[0]["Application"], rows[0]["error"]),
+                         "CSV record is not as expected")
+
+    def test_map_files_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            list(map_files(read_metadata, [], workers=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+from file_jobs import FileJobExecutor
+from word import Metadata
+
+
+if __name__ == "__main__":
+    BETA_FOLDER = Path("Unittests")
+else:
+    BETA_FOLDER = Path(".")
+BETA_FILE_NAME_WITH_PROPERTIES = Path(BETA_FOLDER, "Beta word file with properties.docx")
+
+WAIT_TIMEOUT = 5
+
+
+class TestFileJobs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.commits = []
+        self.commit_started = threading.Event()
+        self.release_commit = threading.Event()
+
+    def __blocking_commit(self, path: Path, changes: dict) -> None:
+        self.commit_started.set()
+        self.release_commit.wait(WAIT_TIMEOUT)
+        self.commits.append((path, dict(changes)))
+
+    def test_pending_edits_are_merged(self):
+        executor = FileJobExecutor(max_workers=2, commit=self.__blocking_commit)
+        done = []
+        path = Path("document.docx").absolute()
+
+        executor.submit_edit(path, {"creator": "first"}, lambda *result: done.append(result))
+        self.assertTrue(self.commit_started.wait(WAIT_TIMEOUT), "First commit didn't start")
+        # The first commit is running, these edits wait for it and are committed together
+        executor.submit_edit(path, {"creator": "second", "revision": 2}, lambda *result: done.append(result))
+        executor.submit_edit(path, {"creator": "third"}, lambda *result: done.append(result))
+        self.release_commit.set()
+        executor.shutdown()
+
+        self.assertEqual([(path, {"creator": "first"}), (path, {"creator": "third", "revision": 2})], self.commits,
+                         "Waiting edits weren't merged into one commit")
+        self.assertEqual([(path, None)] * 3, done, "Not every edit was reported as done")
+
+    def test_writes_of_one_file_are_serialized(self):
+        running = set()
+        overlaps = []
+        lock = threading.Lock()
+
+        def commit(path: Path, changes: dict) -> None:
+            with lock:
+                if path in running:
+                    overlaps.append(path)
+                running.add(path)
+            threading.Event().wait(0.01)
+            with lock:
+                running.discard(path)
+
+        executor = FileJobExecutor(max_workers=4, commit=commit)
+        for number in range(20):
+            executor.submit_edit(Path(f"document{number % 2}.docx"), {"revision": number})
+        executor.shutdown()
+        self.assertEqual([], overlaps, "Writes of one file overlapped")
+
+    def test_failure_is_reported(self):
+        def commit(path: Path, changes: dict) -> None:
+            raise PermissionError("locked")
+
+        results = []
+        executor = FileJobExecutor(commit=commit)
+        executor.submit_edit(Path("document.docx"), {"creator": "admin"}, lambda *result: results.append(result))
+        executor.shutdown()
+        self.assertIsInstance(results[0][1], PermissionError, "Commit error wasn't reported")
+
+    def test_failing_callback_releases_file(self):
+        def failing_callback(path: Path, error: Exception | None) -> None:
+            raise RuntimeError("Callback failed")
+
+        executor = FileJobExecutor(max_workers=1, commit=lambda path, changes: self.commits.append(dict(changes)))
+        path = Path("document.docx").absolute()
+        with mock.patch("sys.excepthook") as excepthook:
+            executor.submit_edit(path, {"creator": "first"}, failing_callback)
+            # The only worker runs this after the edit is done
+            executor.submit(lambda: None).result(WAIT_TIMEOUT)
+        self.assertEqual(1, excepthook.call_count, "Callback error wasn't reported")
+        executor.submit_edit(path, {"creator": "second"})
+        executor.shutdown()
+        self.assertEqual([{"creator": "first"}, {"creator": "second"}], self.commits,
+                         "File wasn't released after its callback failed")
+
+    def test_interrupted_commit_releases_file(self):
+        def interrupted_commit(path: Path, changes: dict) -> None:
+            self.commits.append(dict(changes))
+            if len(self.commits) == 1:
+                raise KeyboardInterrupt
+
+        executor = FileJobExecutor(max_workers=1, commit=interrupted_commit)
+        path = Path("document.docx").absolute()
+        executor.submit_edit(path, {"creator": "first"})
+        executor.submit(lambda: None).result(WAIT_TIMEOUT)
+        executor.submit_edit(path, {"creator": "second"})
+        executor.shutdown()
+        self.assertEqual([{"creator": "first"}, {"creator": "second"}], self.commits,
+                         "File wasn't released after its commit was interrupted")
+
+    def test_word_file_edit(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            file = Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, temp_folder))
+            executor = FileJobExecutor()
+            executor.submit_edit(file, {"creator": "admin", "revision": 5})
+            executor.shutdown()
+            snapshot = Metadata(file).snapshot()
+            self.assertEqual(("admin", 5), (snapshot.creator, snapshot.revision), "Edit wasn't written to the file")
+
+    def test_wrong_max_workers(self):
+        with self.assertRaises(TypeError):
+            FileJobExecutor(max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from pathlib import Path
+from batch import read_metadata
+from file_table import FileTable, column_value
+
+
+if __name__ == "__main__":
+    BETA_FOLDER = Path("Unittests")
+else:
+    BETA_FOLDER = Path(".")
+BETA_FILE_NAME_WITH_PROPERTIES = Path(BETA_FOLDER, "Beta word file with properties.docx")
+BETA_YAML_FILE_NAME = Path(BETA_FOLDER, "Beta preferences.yaml")
+
+
+class TestFileTable(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = FileTable()
+        self.word_file = BETA_FILE_NAME_WITH_PROPERTIES
+        self.other_file = BETA_YAML_FILE_NAME
+
+    def test_add_files(self):
+        self.assertEqual([self.word_file.absolute(), self.other_file.absolute()],
+                         self.table.add_files([self.word_file, self.other_file, self.word_file.absolute()]),
+                         "Added files are not as expected")
+        self.assertEqual([], self.table.add_files([self.word_file]), "File was added twice")
+        self.assertEqual(2, len(self.table), "Number of rows is not as expected")
+        self.assertTrue(self.table.loading, "Added files are not loading")
+        self.assertEqual([0, 1], [row["index"] for row in self.table.rows], "Row indexes are not as expected")
+        # Files without loaded metadata can't be edited yet
+        self.assertEqual([], self.table.selected_paths, "Loading files are selected")
+
+    def test_set_record(self):
+        self.table.add_files([self.word_file, self.other_file])
+        self.table.set_record(read_metadata(self.word_file))
+        self.table.set_record(read_metadata(self.other_file))
+
+        word_row, other_row = self.table.rows
+        self.assertEqual("loaded", word_row["status"], "Word file wasn't loaded")
+        self.assertEqual(read_metadata(self.word_file).snapshot.creator or "", word_row["creator"],
+                         "Creator of the word file is not as expected")
+        self.assertEqual(("unreadable", False), (other_row["status"], other_row["selected"]),
+                         "Unreadable file is selected")
+        self.assertFalse(self.table.loading, "Table is still loading")
+        self.assertEqual([self.word_file.absolute()], self.table.selected_paths, "Selected files are not as expected")
+
+        self.table.select_all(True)
+        self.assertFalse(self.table.rows[1]["selected"], "Unreadable file was selected")
+        self.table.select(0, False)
+        self.assertEqual([], self.table.selected_paths, "Unselected file is still selected")
+
+    def test_saved_values(self):
+        self.table.add_files([self.word_file])
+        self.table.set_record(read_metadata(self.word_file))
+        self.table.set_status(self.word_file, "failed", "PermissionError")
+        self.assertEqual([self.word_file.absolute()], self.table.selected_paths, "Failed file can't be edited again")
+
+        self.table.set_values(self.word_file, {"creator": "admin", "revision": 3})
+        self.table.set_status(self.word_file, "saved")
+        self.assertEqual(("admin", "3", ""), (self.table.rows[0]["creator"], self.table.rows[0]["revision"],
+                                              self.table.rows[0]["error"]), "Saved values are not as expected")
+        with self.assertRaises(ValueError):
+            self.table.set_status(self.word_file, "done")
+
+        self.table.clear()
+        self.assertNotIn(self.word_file, self.table, "Cleared table has rows")
+
+    def test_column_value(self):
+        self.assertEqual(12, column_value("revision", "12"), "Integer column wasn't converted")
+        self.assertEqual("admin", column_value("creator", "admin"), "Text column was changed")
+        with self.assertRaises(ValueError):
+            column_value("title", "Report")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+from file_watcher import FileWatcher
+
+
+WAIT_TIMEOUT = 5
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_folder = tempfile.TemporaryDirectory()
+        self.watched_file = Path(self.temp_folder.name, "preferences.yaml")
+        self.watched_file.write_text("new: {}\n")
+        self.changed = threading.Event()
+
+    def tearDown(self) -> None:
+        self.temp_folder.cleanup()
+
+    def __check_backend(self, use_inotify: bool):
+        watcher = FileWatcher(self.watched_file, self.changed.set, poll_interval=0.05, use_inotify=use_inotify)
+        watcher.start()
+        try:
+            Path(self.temp_folder.name, "other.yaml").write_text("other")
+            self.assertFalse(self.changed.wait(0.3), f"Change of other file was reported ({watcher.backend})")
+
+            replacement = Path(self.temp_folder.name, "preferences.yaml.tmp")
+            replacement.write_text("new: {creator: admin}\n")
+            os.replace(replacement, self.watched_file)
+            self.assertTrue(self.changed.wait(WAIT_TIMEOUT), f"Replaced file was not reported ({watcher.backend})")
+        finally:
+            watcher.stop()
+
+    def test_file_watcher_inotify(self):
+        self.__check_backend(True)
+
+    def test_file_watcher_polling(self):
+        self.__check_backend(False)
+
+    def test_file_watcher_survives_failing_callback(self):
+        calls = []
+
+        def failing_callback() -> None:
+            calls.append(None)
+            if len(calls) == 1:
+                raise PermissionError(13, "Permission denied")
+            self.changed.set()
+
+        watcher = FileWatcher(self.watched_file, failing_callback, poll_interval=0.05, use_inotify=False)
+        with mock.patch("sys.excepthook") as excepthook:
+            watcher.start()
+            try:
+                self.watched_file.write_text("new: {creator: admin}\n")
+                for _ in range(int(WAIT_TIMEOUT / 0.05)):
+                    if calls:
+                        break
+                    threading.Event().wait(0.05)
+                self.watched_file.write_text("new: {creator: user}\n")
+                self.assertTrue(self.changed.wait(WAIT_TIMEOUT), "Watcher stopped after a failing callback")
+            finally:
+                watcher.stop()
+        self.assertEqual(1, excepthook.call_count, "Callback error wasn't reported")
+
+    def test_file_watcher_invalid_poll_interval(self):
+        with self.assertRaises(TypeError):
+            FileWatcher(self.watched_file, self.changed.set, poll_interval=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from metadata_index import MetadataIndex, IndexRefresh, read_entry
+from word import Metadata
+
+
+if __name__ == "__main__":
+    BETA_FOLDER = Path("Unittests")
+else:
+    BETA_FOLDER = Path(".")
+BETA_FILE_NAME_WITH_PROPERTIES = Path(BETA_FOLDER, "Beta word file with properties.docx")
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_folder = tempfile.TemporaryDirectory()
+        self.file = Path(shutil.copy(BETA_FILE_NAME_WITH_PROPERTIES, self.temp_folder.name))
+        self.index = MetadataIndex(Path(self.temp_folder.name, "index.sqlite3"))
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.temp_folder.cleanup()
+
+    def test_refresh(self):
+        self.assertEqual(IndexRefresh(1, 0, 0), self.index.refresh([self.file], workers=1), "New file wasn't indexed")
+        self.assertEqual(IndexRefresh(0, 1, 0), self.index.refresh([self.file], workers=1),
+                         "Unchanged file was read again")
+
+        entry, = self.index.query()
+        self.assertEqual(str(self.file.absolute()), entry.path, "Indexed path is not absolute")
+        self.assertEqual(Metadata(self.file).snapshot().creator, entry.creator, "Indexed creator is not as expected")
+        self.assertIsNotNone(entry.sha256, "Content hash wasn't indexed")
+        self.assertIsNone(entry.error, "Readable file was indexed with an error")
+
+        Metadata(self.file).creator = "admin"
+        # Stat signature is changed even if the file is rewritten within the same mtime tick
+        os.utime(self.file, ns=(entry.mtime_ns + 1_000_000_000, entry.mtime_ns + 1_000_000_000))
+        self.assertEqual(IndexRefresh(1, 0, 0), self.index.refresh([self.file], workers=1),
+                         "Changed file wasn't read again")
+        self.assertEqual(["admin"], [entry.creator for entry in self.index.query(creator="admin")],
+                         "Changed creator wasn't indexed")
+        self.assertEqual(1, len(self.index), "Changed file was indexed twice")
+
+    def test_interrupted_refresh_keeps_committed_entries(self):
+        files = [Path(shutil.copy(self.file, Path(self.temp_folder.name, f"Copy {number}.docx")))
+                 for number in range(3)]
+
+        def interrupted_read_entry(path: Path):
+            if path == files[2].absolute():
+                raise KeyboardInterrupt
+            return read_entry(path)
+
+        with mock.patch("metadata_index.read_entry", side_effect=interrupted_read_entry):
+            with self.assertRaises(KeyboardInterrupt):
+                self.index.refresh(files, workers=1, commit_size=1)
+        self.assertEqual(IndexRefresh(1, 2, 0), self.index.refresh(files, workers=1),
+                         "Files committed before the interruption were read again")
+
+    def test_prune(self):
+        self.index.refresh([self.file], workers=1)
+        self.file.unlink()
+        self.assertEqual(IndexRefresh(0, 0, 1), self.index.refresh([self.file], workers=1),
+                         "Removed file wasn't counted as missing")
+        self.assertEqual(1, self.index.prune(), "Removed file wasn't pruned")
+        self.assertEqual(0, len(self.index), "Pruned index has entries")
+
+    def test_query(self):
+        self.index.refresh([self.file], workers=1)
+        record = next(self.index.query(revision=Metadata(self.file).revision)).as_record()
+        self.assertEqual(self.file.absolute(), record.path, "Queried path is not as expected")
+        self.assertEqual(Metadata(self.file).snapshot(), record.snapshot, "Queried metadata is not as expected")
+        self.assertEqual([], list(self.index.query(creator="nobody")), "Query found a file of another creator")
+        with self.assertRaises(ValueError):
+            next(self.index.query(path="/"))
+        with self.assertRaises(TypeError):
+            MetadataIndex("index.sqlite3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import collections
+import io
+import tempfile
+import unittest
+from pathlib import Path
+import numpy
+from name_pool import NamePool
+from planner import plan_privet_smirnovoy, read_plan, sample_indexes, write_plan
+from preferences import PrivetSmirnovoyConfig
+
+
+CONFIG = PrivetSmirnovoyConfig(applications=("Minecraft", "Calculator", "Excel"),
+                               creators=("User 1", "User 2", "User 3", "User 3"),
+                               modifiers=("User 1", "User 2"),
+                               creators_number=3,
+                               modifiers_number=1)
+PATHS = [Path(f"File {index}.docx") for index in range(10)]
+
+
+class TestPlanner(unittest.TestCase):
+    def test_sample_indexes_are_distinct(self):
+        for pool_size in (4, 100000000):
+            indexes = sample_indexes(numpy.random.default_rng(1), 1000, pool_size, 4)
+            self.assertTrue(all(len(set(row)) == 4 for row in indexes.tolist()),
+                            f"Sampled indexes are not distinct for pool of {pool_size}")
+
+    def test_sample_indexes_many_files_small_pool(self):
+        indexes = sample_indexes(numpy.random.default_rng(1), 1_000_000, 20, 10)
+        self.assertEqual((1_000_000, 10), indexes.shape, "Not every file got its indexes")
+        sorted_indexes = numpy.sort(indexes, axis=1)
+        self.assertFalse((sorted_indexes[:, 1:] == sorted_indexes[:, :-1]).any(),
+                         "Sampled indexes are not distinct for many files and a small pool")
+
+    def test_sample_indexes_too_many(self):
+        with self.assertRaises(ValueError):
+            sample_indexes(numpy.random.default_rng(), 1, 3, 4)
+
+    def test_plan_privet_smirnovoy(self):
+        plan = plan_privet_smirnovoy(PATHS, CONFIG, seed=1)
+        self.assertEqual([str(path) for path in PATHS], [assignment.path for assignment in plan],
+                         "Planned paths are not as expected")
+        self.assertTrue(all(sorted(assignment.creator.split("; ")) == ["User 1", "User 2", "User 3"]
+                            for assignment in plan), "Planned creators are not as expected")
+        self.assertEqual(plan, plan_privet_smirnovoy(PATHS, CONFIG, seed=1), "Seeded plans are different")
+
+    def test_plan_name_pool_with_repeated_names(self):
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            names_filepath = Path(directory) / "names.txt"
+            names_filepath.write_text("User 1\nUser 2\nUser 2\nUser 2\nUser 3\n", encoding="utf-8")
+            config = CONFIG._replace(creators=NamePool(names_filepath))
+            plan = plan_privet_smirnovoy(PATHS * 10, config, seed=1)
+        self.assertTrue(all(sorted(assignment.creator.split("; ")) == ["User 1", "User 2", "User 3"]
+                            for assignment in plan), "Repeated names of a name pool were planned together")
+
+    def test_plan_even_applications(self):
+        plan = plan_privet_smirnovoy(PATHS, CONFIG, seed=2, even_applications=True)
+        counts = collections.Counter(assignment.Application for assignment in plan)
+        self.assertEqual([3, 3, 4], sorted(counts.values()), "Applications are not spread evenly")
+
+    def test_plan_file_round_trip(self):
+        plan = plan_privet_smirnovoy(PATHS, CONFIG, seed=3)
+        plan_file = io.StringIO()
+        write_plan(plan_file, plan)
+        plan_file.seek(0)
+        self.assertEqual(plan, list(read_plan(plan_file)), "Plan file was not read back as written")
+
+
+if __name__ == "__main__":
+    unittest.main()
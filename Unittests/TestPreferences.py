@@ -1,6 +1,10 @@
+import tempfile
 import unittest
-from preferences import Preferences
+from unittest import mock
+from preferences import (Preferences, NewCommandConfig, PreferencesProblem, PrivetSmirnovoyConfig, PrivetSmirnovoySampler,
+                         preferences_cache, validate_preferences)
 from pathlib import Path
+from name_pool import NamePool
 
 
 if __name__ == "__main__":
@@ -72,3 +76,122 @@ class TestPreferences(unittest.TestCase):
     def test_privet_smirnovoy_modifiers_number_preference_read(self):
         self.assertEqual(1, self.preferences.privet_smirnovoy.modifiers_number,
                          "modifiers_number preference is not as expected")
+
+    def test_preferences_views_follow_validation(self):
+        with open(BETA_YAML_FILE_NAME, "wb") as file:
+            file.write(self.source_file.replace(b"creator: admin", b"creator: 5")
+                                       .replace(b"revision: 1", b"revision: one"))
+        self.assertEqual(validate_preferences(BETA_YAML_FILE_NAME).config.new.creator,
+                         self.preferences.new_command.creator, "creator preference is not as validated")
+        with self.assertRaises(AttributeError):
+            _ = self.preferences.new_command.revision
+        with self.assertRaises(AttributeError):
+            _ = self.preferences.valid
+
+    # Tests for preferences_cache
+    def test_preferences_cache_parses_once(self):
+        self.assertIs(preferences_cache.load(BETA_YAML_FILE_NAME), preferences_cache.load(BETA_YAML_FILE_NAME),
+                      "Unchanged preferences file was parsed again")
+
+    def test_preferences_cache_reloads_changed_file(self):
+        _ = self.preferences.new_command.creator
+        with open(BETA_YAML_FILE_NAME, "wb") as file:
+            file.write(self.source_file.replace(b"creator: admin", b"creator: Beta creator"))
+        self.assertEqual("Beta creator", self.preferences.new_command.creator,
+                         "Changed preferences file was not parsed again")
+
+    # Tests for validate_preferences
+    def test_validate_preferences(self):
+        validation = validate_preferences(BETA_YAML_FILE_NAME)
+        self.assertEqual((), validation.problems, "Problems are not as expected")
+        self.assertEqual(NewCommandConfig("admin", "admin", "Microsoft Office Word", 0, 1), validation.config.new,
+                         "new config is not as expected")
+        self.assertEqual(PrivetSmirnovoyConfig(("Minecraft", "Calculator", "Excel"), ("User 1", "User 2", "User 3"),
+                                               ("User 1", "User 2"), 2, 1),
+                         validation.config.privet_smirnovoy, "privet_smirnovoy config is not as expected")
+
+    def test_validate_preferences_reports_every_problem(self):
+        with open(BETA_YAML_FILE_NAME, "wb") as file:
+            file.write(self.source_file.replace(b"revision: 1", b"revision: one")
+                                       .replace(b"creators number: 2", b"creators number: 5")
+                                       .replace(b"   application: Microsoft Office Word\n", b""))
+        validation = validate_preferences(BETA_YAML_FILE_NAME)
+        expected_result = (
+            PreferencesProblem("new", "application", 'Preference "application" not found'),
+            PreferencesProblem("new", "revision", 'Preference "revision" must be integer'),
+            PreferencesProblem("privet_smirnovoy", "creators number",
+                               'Preference "creators number" is bigger than the number of unique creators')
+        )
+        self.assertEqual(expected_result, validation.problems, "Problems are not as expected")
+        self.assertEqual("Microsoft Office Word", validation.config.new.with_defaults().application,
+                         "Default application is not as expected")
+
+    def test_validate_preferences_missing_file(self):
+        validation = validate_preferences(Path("Missing preferences.yaml"))
+        self.assertEqual('File "Missing preferences.yaml" not found.', validation.file_problem.message,
+                         "File problem is not as expected")
+        self.assertFalse(validation.section_valid("new"), "new section is valid without preferences file")
+
+    def test_validate_preferences_unreadable_file(self):
+        with mock.patch("os.stat", side_effect=PermissionError(13, "Permission denied")):
+            validation = validate_preferences(BETA_YAML_FILE_NAME)
+        self.assertEqual('File "Beta preferences.yaml" can\'t be read: Permission denied.',
+                         validation.file_problem.message, "File problem is not as expected")
+
+    # Tests for PrivetSmirnovoySampler
+    def test_privet_smirnovoy_sampler_draws_distinct_names(self):
+        creators = tuple(f"User {index % 50000}" for index in range(100000))
+        config = PrivetSmirnovoyConfig(("Excel",), creators, ("User 1",), 1000, 1)
+        draw = PrivetSmirnovoySampler(config).draw()
+        self.assertEqual(1000, len(set(draw.creators.split("; "))), "Drawn creators are not distinct")
+        self.assertEqual(("User 1", "Excel"), (draw.modifiers, draw.application), "Draw is not as expected")
+
+    def test_privet_smirnovoy_sampler_seed(self):
+        config = validate_preferences(BETA_YAML_FILE_NAME).config.privet_smirnovoy
+        self.assertEqual(PrivetSmirnovoySampler(config, seed=1).draw("file.docx"),
+                         PrivetSmirnovoySampler(config, seed=1).draw("file.docx"),
+                         "Seeded draws for the same key are different")
+
+    def test_privet_smirnovoy_sampler_missing_preferences(self):
+        config = PrivetSmirnovoyConfig(None, ("User 1",), None, None, None)
+        self.assertEqual((None, None, None), tuple(PrivetSmirnovoySampler(config).draw()),
+                         "Values of missing preferences were drawn")
+
+    # Tests for name pool files
+    def test_privet_smirnovoy_creators_from_file(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            names_filepath = Path(temp_folder, "creators.txt")
+            names_filepath.write_text("User 1\n\nUser 2\r\nUser 2\nUser 3")
+            with open(BETA_YAML_FILE_NAME, "wb") as file:
+                file.write(self.source_file.replace(b"creators:\n       - User 1\n       - User 2\n       - User 3\n",
+                                                    f"creators: {{file: {names_filepath}}}\n".encode()))
+            validation = validate_preferences(BETA_YAML_FILE_NAME)
+            creators = validation.config.privet_smirnovoy.creators
+            self.assertIsInstance(creators, NamePool, "Creators were not read from file")
+            self.assertEqual(["User 1", "User 2", "User 2", "User 3"], list(creators), "Names are not as expected")
+
+            draw = PrivetSmirnovoySampler(validation.config.privet_smirnovoy).draw()
+            self.assertEqual(2, len(set(draw.creators.split("; "))), "Drawn creators are not distinct")
+
+    def test_privet_smirnovoy_creators_file_of_repeated_names(self):
+        with tempfile.TemporaryDirectory() as temp_folder:
+            names_filepath = Path(temp_folder, "creators.txt")
+            names_filepath.write_text("Alice\n" * 4)
+            with open(BETA_YAML_FILE_NAME, "wb") as file:
+                file.write(self.source_file.replace(b"creators:\n       - User 1\n       - User 2\n       - User 3\n",
+                                                    f"creators: {{file: {names_filepath}}}\n".encode()))
+            validation = validate_preferences(BETA_YAML_FILE_NAME)
+        self.assertEqual((PreferencesProblem("privet_smirnovoy", "creators number",
+                                             'Preference "creators number" is bigger than the number of unique '
+                                             'creators'),), validation.problems, "Problems are not as expected")
+
+    def test_name_pool_sample_of_mostly_repeated_names(self):
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_folder:
+            names_filepath = Path(temp_folder, "creators.txt")
+            names_filepath.write_text("Alice\n" * 999 + "Bob\n")
+            name_pool = NamePool(names_filepath)
+            self.assertEqual(2, name_pool.unique_count, "Unique names are not counted")
+            self.assertEqual(["Alice", "Bob"], sorted(name_pool.sample(2)), "Pool of repeated names wasn't sampled")
+            with self.assertRaises(ValueError):
+                name_pool.sample(3)
+
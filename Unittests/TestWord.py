@@ -1,6 +1,10 @@
+import errno
+import io
 import unittest
+import zipfile
 from pathlib import Path
-from word import Metadata, WordCoreXml, WordAppXml
+from unittest import mock
+from word import DurabilityGroup, Metadata, MetadataSnapshot, WordCoreXml, WordAppXml, fsync_path
 
 if __name__ == "__main__":
     BETA_FILE_NAME_WITH_PROPERTIES = Path("Unittests/Beta word file with properties.docx")
@@ -30,8 +34,9 @@ class TestMetadataByFileWithProperties(unittest.TestCase):
         self.metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES)
 
     def tearDown(self) -> None:
-        self.assertFalse(self.metadata._temp_folder_path.exists(),
-                         f"Temp folder \"{self.metadata._temp_folder_path.name}\" wasn't removed")
+        if self.metadata._staged_filepath is not None:
+            self.assertFalse(self.metadata._staged_filepath.exists(),
+                             f"Staged file \"{self.metadata._staged_filepath.name}\" wasn't removed")
         with open(BETA_FILE_NAME_WITH_PROPERTIES, "wb") as file:
             file.write(self.source_file)
 
@@ -189,6 +194,226 @@ class TestMetadataByFileWithProperties(unittest.TestCase):
         self.metadata["revision"] = None
         self.assertEqual(None, self.metadata["revision"], "File revision is not as expected")
 
+    # Tests for Metadata.snapshot
+    def test_metadata_snapshot(self):
+        expected_result = MetadataSnapshot(
+            creator="user",
+            last_modified_by="user",
+            revision=2,
+            application_name="Microsoft Office Word",
+            editing_time=None
+        )
+        self.assertEqual(expected_result, self.metadata.snapshot(), "File snapshot is not as expected")
+
+    # Tests for Metadata.edit
+    def test_metadata_edit_session_commit(self):
+        with self.metadata.edit() as session:
+            session.creator = "Beta creator"
+            session["lastModifiedBy"] = "Beta user"
+            session.revision = 100
+            session.application_name = "Beta application name"
+            session.editing_time = 60
+            self.assertEqual("user", self.metadata.creator, "Changes were committed before the session end")
+        expected_result = MetadataSnapshot(
+            creator="Beta creator",
+            last_modified_by="Beta user",
+            revision=100,
+            application_name="Beta application name",
+            editing_time=60
+        )
+        self.assertEqual(expected_result, self.metadata.snapshot(), "File snapshot is not as expected")
+
+    def test_metadata_edit_session_staged_value(self):
+        with self.metadata.edit() as session:
+            session.revision = session.revision + 1
+            self.assertEqual(3, session.revision, "Staged revision is not as expected")
+        self.assertEqual(3, self.metadata.revision, "File revision is not as expected")
+
+    def test_metadata_edit_session_rollback_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with self.metadata.edit() as session:
+                session.creator = "Beta creator"
+                raise RuntimeError
+        self.assertEqual("user", self.metadata.creator, "Changes were committed despite the exception")
+
+    def test_metadata_edit_session_keeps_untouched_members(self):
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            expected_result = {zip_info.filename: (zip_info.CRC, zip_info.compress_size, zip_info.compress_type)
+                               for zip_info in zip_file.infolist()
+                               if zip_info.filename != "docProps/core.xml"}
+        self.metadata.creator = "Beta creator"
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            self.assertIsNone(zip_file.testzip(), "Archive is corrupted")
+            result = {zip_info.filename: (zip_info.CRC, zip_info.compress_size, zip_info.compress_type)
+                      for zip_info in zip_file.infolist()
+                      if zip_info.filename != "docProps/core.xml"}
+        self.assertEqual(expected_result, result, "Untouched members were encoded again")
+
+    def test_metadata_edit_session_skips_unchanged_values(self):
+        mtime_before = BETA_FILE_NAME_WITH_PROPERTIES.stat().st_mtime_ns
+        with self.metadata.edit() as session:
+            session.creator = "user"
+            session.application_name = "Microsoft Office Word"
+        self.assertFalse(session.written, "Unchanged values were written")
+        self.assertIsNone(self.metadata._staged_filepath, "Unchanged package was rewritten")
+        self.assertEqual(mtime_before, BETA_FILE_NAME_WITH_PROPERTIES.stat().st_mtime_ns, "File was touched")
+
+        with self.metadata.edit() as session:
+            session.creator = "user"
+            session.revision = (self.metadata.revision or 0) + 1
+        self.assertTrue(session.written, "Changed value wasn't written")
+
+    def test_metadata_edit_session_invalid_key(self):
+        with self.assertRaises(KeyError):
+            with self.metadata.edit() as session:
+                session["Invalid"] = "value"
+
+
+    # Tests for Metadata atomic commit
+    def test_metadata_staged_file_is_sibling(self):
+        file_mode = BETA_FILE_NAME_WITH_PROPERTIES.stat().st_mode
+        BETA_FILE_NAME_WITH_PROPERTIES.chmod(0o640)
+        try:
+            self.metadata.creator = "Beta creator"
+            self.assertEqual(BETA_FILE_NAME_WITH_PROPERTIES.absolute().parent, self.metadata._staged_filepath.parent,
+                             "Staged file is not next to the file")
+            self.assertFalse(self.metadata._staged_filepath.exists(), "Staged file wasn't renamed")
+            self.assertEqual(0o640, BETA_FILE_NAME_WITH_PROPERTIES.stat().st_mode & 0o777, "File mode was changed")
+        finally:
+            BETA_FILE_NAME_WITH_PROPERTIES.chmod(file_mode)
+
+    def test_metadata_staged_file_is_unique(self):
+        self.metadata.creator = "Beta creator"
+        first_staged_filepath = self.metadata._staged_filepath
+        self.metadata.creator = "Beta user"
+        self.assertNotEqual(first_staged_filepath, self.metadata._staged_filepath, "Staged file was reused")
+
+    def test_metadata_failed_rewrite_keeps_file(self):
+        with mock.patch("zip_package.rewrite", side_effect=OSError(errno.ENOSPC, "No space left on device")):
+            with self.assertRaises(OSError):
+                self.metadata.creator = "Beta creator"
+        self.assertEqual(self.source_file, BETA_FILE_NAME_WITH_PROPERTIES.read_bytes(), "File was changed")
+
+    def test_metadata_durability_fsync(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, durability="fsync")
+        with mock.patch("word.fsync_path", wraps=fsync_path) as synced:
+            metadata.creator = "Beta creator"
+        self.assertEqual([mock.call(metadata._staged_filepath), mock.call(BETA_FILE_NAME_WITH_PROPERTIES.parent)],
+                         synced.call_args_list, "File data and folder weren't synced")
+
+    def test_metadata_durability_group(self):
+        with DurabilityGroup() as durability_group:
+            metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, durability="group",
+                                durability_group=durability_group)
+            with mock.patch("word.fsync_path") as synced:
+                metadata.creator = "Beta creator"
+                self.assertEqual([mock.call(metadata._staged_filepath)], synced.call_args_list,
+                                 "Staged file wasn't synced before it replaced the original")
+                metadata.creator = "Beta creator 2"
+                self.assertEqual(2, synced.call_count, "Folder was synced before the group flush")
+            self.assertEqual(2, len(durability_group), "Commits weren't added to the group")
+            with mock.patch("word.fsync_path") as synced:
+                durability_group.flush()
+            self.assertEqual([mock.call(BETA_FILE_NAME_WITH_PROPERTIES.absolute().parent)], synced.call_args_list,
+                             "Group flush didn't sync only the folder of the replaced file once")
+        self.assertEqual(0, len(durability_group), "Flushed group has commits")
+
+    def test_metadata_durability_group_in_place(self):
+        durability_group = DurabilityGroup()
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="append", durability="group",
+                            durability_group=durability_group)
+        with mock.patch("word.fsync_path") as synced:
+            metadata.creator = "Beta creator"
+            synced.assert_not_called()
+            durability_group.flush()
+        self.assertEqual([mock.call(BETA_FILE_NAME_WITH_PROPERTIES.absolute())], synced.call_args_list,
+                         "Group flush didn't sync only the file updated in place")
+
+    def test_metadata_durability_group_without_group(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, durability="group")
+        with mock.patch("word.fsync_path", wraps=fsync_path) as synced:
+            metadata.creator = "Beta creator"
+        self.assertEqual([mock.call(metadata._staged_filepath), mock.call(BETA_FILE_NAME_WITH_PROPERTIES.parent)],
+                         synced.call_args_list, "Group durability without a group wasn't synced like fsync")
+
+    def test_metadata_invalid_durability(self):
+        with self.assertRaises(ValueError):
+            Metadata(BETA_FILE_NAME_WITH_PROPERTIES, durability="always")
+
+    # Tests for Metadata append update mode
+    def test_metadata_append_mode(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="append")
+        size_before = BETA_FILE_NAME_WITH_PROPERTIES.stat().st_size
+        with metadata.edit() as session:
+            session.creator = "Beta creator"
+            session.application_name = "Beta application name"
+        self.assertIsNone(metadata._staged_filepath, "Append mode rewrote the package")
+        self.assertEqual(("Beta creator", "Beta application name"), (metadata.creator, metadata.application_name))
+        self.assertGreater(metadata.dead_bytes(), 0, "Replaced entries aren't counted as dead bytes")
+        self.assertLess(BETA_FILE_NAME_WITH_PROPERTIES.stat().st_size - size_before, 4096, "Package was rewritten")
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            self.assertIsNone(zip_file.testzip(), "Archive is corrupted")
+            self.assertEqual(1, zip_file.namelist().count("docProps/core.xml"), "Replaced entry is listed twice")
+
+        self.assertGreater(metadata.compact(), 0, "Dead bytes weren't reclaimed")
+        self.assertEqual(0, metadata.dead_bytes(), "Compacted package has dead bytes")
+        self.assertEqual(0, metadata.compact(), "Compacted package was rewritten again")
+        self.assertEqual("Beta creator", metadata.creator, "Compaction lost the appended entry")
+
+    def test_metadata_append_mode_keeps_old_directory(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="append")
+        creator_before = metadata.creator
+        metadata.creator = "Beta creator"
+        self.assertEqual(self.source_file, BETA_FILE_NAME_WITH_PROPERTIES.read_bytes()[:len(self.source_file)],
+                         "Appended entries overwrote the old central directory")
+        with zipfile.ZipFile(io.BytesIO(self.source_file)) as zip_file:
+            old_directory_size = len(self.source_file) - zip_file.start_dir
+        self.assertGreater(metadata.dead_bytes(), old_directory_size,
+                           "Old central directory isn't counted as dead bytes")
+
+        # A crash in the middle of the append leaves the file with its old central directory
+        appended_package = BETA_FILE_NAME_WITH_PROPERTIES.read_bytes()
+        BETA_FILE_NAME_WITH_PROPERTIES.write_bytes(appended_package[:len(self.source_file) + 100])
+        self.assertEqual(creator_before, Metadata(BETA_FILE_NAME_WITH_PROPERTIES).creator,
+                         "Interrupted append corrupted the package")
+
+    # Tests for Metadata padded update mode
+    def test_metadata_padded_mode(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="padded")
+        metadata.revision = 5
+        padding_staged_filepath = metadata._staged_filepath
+        self.assertIsNotNone(padding_staged_filepath, "Unpadded package wasn't rewritten")
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            self.assertEqual({zipfile.ZIP_STORED},
+                             {zip_file.getinfo(name).compress_type for name in ("docProps/core.xml", "docProps/app.xml")},
+                             "Padded parts are compressed")
+        size_before = BETA_FILE_NAME_WITH_PROPERTIES.stat().st_size
+
+        with metadata.edit() as session:
+            session.revision = 6
+            session.creator = "Beta creator"
+            session.application_name = "Beta application name"
+        self.assertIs(padding_staged_filepath, metadata._staged_filepath, "Padded package was rewritten")
+        self.assertEqual(size_before, BETA_FILE_NAME_WITH_PROPERTIES.stat().st_size, "Package size was changed")
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            self.assertIsNone(zip_file.testzip(), "Archive is corrupted")
+        self.assertEqual((6, "Beta creator", "Beta application name"),
+                         (metadata.revision, metadata.creator, metadata.application_name))
+
+    def test_metadata_padded_mode_exhausted_padding(self):
+        metadata = Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="padded")
+        metadata.creator = "Beta creator"
+        padding_staged_filepath = metadata._staged_filepath
+        long_creator = "Beta creator " * 200
+        metadata.creator = long_creator
+        self.assertIsNot(padding_staged_filepath, metadata._staged_filepath, "Exhausted padding wasn't rewritten")
+        with zipfile.ZipFile(BETA_FILE_NAME_WITH_PROPERTIES) as zip_file:
+            self.assertIsNone(zip_file.testzip(), "Archive is corrupted")
+        self.assertEqual(long_creator.strip(), metadata.creator.strip())
+
+    def test_metadata_invalid_update_mode(self):
+        with self.assertRaises(ValueError):
+            Metadata(BETA_FILE_NAME_WITH_PROPERTIES, update_mode="inplace")
 
 class TestMetadataByFileWithoutProperties(unittest.TestCase):
     def setUp(self) -> None:
@@ -198,8 +423,9 @@ class TestMetadataByFileWithoutProperties(unittest.TestCase):
         self.metadata = Metadata(BETA_FILE_NAME_WITHOUT_PROPERTIES)
 
     def tearDown(self) -> None:
-        self.assertFalse(self.metadata._temp_folder_path.exists(),
-                         f"Temp folder \"{self.metadata._temp_folder_path.name}\" wasn't removed")
+        if self.metadata._staged_filepath is not None:
+            self.assertFalse(self.metadata._staged_filepath.exists(),
+                             f"Staged file \"{self.metadata._staged_filepath.name}\" wasn't removed")
         with open(BETA_FILE_NAME_WITHOUT_PROPERTIES, "wb") as file:
             file.write(self.source_file)
 
@@ -371,6 +597,17 @@ class TestMetadataByFileWithoutProperties(unittest.TestCase):
         self.metadata["revision"] = None
         self.assertEqual(None, self.metadata["revision"], "File revision is not as expected")
 
+    # Tests for Metadata.snapshot
+    def test_metadata_snapshot(self):
+        expected_result = MetadataSnapshot(
+            creator=None,
+            last_modified_by=None,
+            revision=None,
+            application_name=None,
+            editing_time=None
+        )
+        self.assertEqual(expected_result, self.metadata.snapshot(), "File snapshot is not as expected")
+
 
 class TestWordCoreXmlByFileWithProperties(unittest.TestCase):
     def setUp(self) -> None:
@@ -750,5 +987,89 @@ class TestWordAppXmlByFileWithoutProperties(unittest.TestCase):
         self.assertEqual(None, self.app["TotalTime"], "File total time is not as expected")
 
 
+class TestWordXmlByData(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(BETA_CORE_FILE_NAME_WITH_PROPERTIES, "rb") as file:
+            self.core_data = file.read()
+        with open(BETA_APP_FILE_NAME_WITH_PROPERTIES, "rb") as file:
+            self.app_data = file.read()
+
+    def test_core_read_from_data(self):
+        core = WordCoreXml(xml_data=self.core_data)
+        self.assertEqual("user", core.creator, "creator property is not as expected")
+        self.assertEqual(2, core.revision, "revision property is not as expected")
+
+    def test_app_read_from_data(self):
+        app = WordAppXml(xml_data=self.app_data)
+        self.assertEqual("Microsoft Office Word", app.application, "application property is not as expected")
+
+    def test_core_write_to_data(self):
+        core = WordCoreXml(xml_data=self.core_data)
+        core.creator = "Beta user"
+        core.flush()
+        self.assertEqual("Beta user", WordCoreXml(xml_data=core.xml_data).creator, "creator was not written")
+
+    def test_core_write_is_deferred_until_flush(self):
+        core = WordCoreXml(xml_data=self.core_data)
+        core.creator = "Beta user"
+        core.revision = 100
+        self.assertEqual(self.core_data, core.xml_data, "Data was serialized before flush")
+        core.flush()
+        flushed_core = WordCoreXml(xml_data=core.xml_data)
+        self.assertEqual(("Beta user", 100), (flushed_core.creator, flushed_core.revision),
+                         "Properties were not written")
+
+    def test_core_file_written_on_context_exit(self):
+        with open(BETA_CORE_FILE_NAME_WITH_PROPERTIES, "rb") as file:
+            source_file = file.read()
+        try:
+            with WordCoreXml(BETA_CORE_FILE_NAME_WITH_PROPERTIES) as core:
+                core.creator = "Beta user"
+            self.assertEqual("Beta user", WordCoreXml(BETA_CORE_FILE_NAME_WITH_PROPERTIES).creator,
+                             "creator was not written to file")
+        finally:
+            with open(BETA_CORE_FILE_NAME_WITH_PROPERTIES, "wb") as file:
+                file.write(source_file)
+
+    def test_app_stream_read_stops_after_requested_elements(self):
+        truncated_data = self.app_data[:self.app_data.index(b"</Application>") + len(b"</Application>")]
+        app = WordAppXml(xml_data=truncated_data + b"<TitlesOfParts><vt:vector")
+        self.assertEqual("Microsoft Office Word", app.application, "application property is not as expected")
+
+    def test_stream_and_dom_read_engines_agree(self):
+        for read_engine in ("stream", "dom"):
+            core = WordCoreXml(xml_data=self.core_data, read_engine=read_engine)
+            app = WordAppXml(xml_data=self.app_data, read_engine=read_engine)
+            self.assertEqual(("user", "user", 2, "Microsoft Office Word", None),
+                             (core.creator, core.last_modified_by, core.revision, app.application, app.total_time),
+                             f'Properties read by "{read_engine}" engine are not as expected')
+
+    def test_core_write_keeps_untouched_bytes(self):
+        core = WordCoreXml(xml_data=self.core_data)
+        core.creator = "Beta user"
+        core.flush()
+        self.assertEqual(self.core_data.replace(b">user</dc:creator>", b">Beta user</dc:creator>"), core.xml_data,
+                         "Bytes outside of the creator text were changed")
+
+    def test_core_write_inserts_missing_element_in_order(self):
+        core_data = self.core_data.replace(b"<dc:creator>user</dc:creator>", b"")
+        core = WordCoreXml(xml_data=core_data)
+        core.creator = "Beta user"
+        core.flush()
+        self.assertIn(b"<dc:subject></dc:subject><dc:creator>Beta user</dc:creator><cp:keywords>", core.xml_data,
+                      "creator was not inserted between subject and keywords")
+
+    def test_app_write_escapes_text(self):
+        app = WordAppXml(xml_data=self.app_data)
+        app.application = "Word & <Co>"
+        app.flush()
+        self.assertEqual("Word & <Co>", WordAppXml(xml_data=app.xml_data).application,
+                         "application was not escaped")
+
+    def test_path_and_data_together(self):
+        with self.assertRaises(TypeError):
+            WordCoreXml(BETA_CORE_FILE_NAME_WITH_PROPERTIES, self.core_data)
+
+
 if __name__ == '__main__':
     unittest.main()
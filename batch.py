@@ -0,0 +1,256 @@
+import csv
+import datetime
+import glob
+import json
+import multiprocessing
+import pathlib
+from typing import NamedTuple, Iterable, Iterator, Callable, Literal
+
+import planner
+import preferences
+import word
+
+
+# Constants
+WORD_FILE_SUFFIX = ".docx"
+GLOB_CHARACTERS = ("*", "?", "[")
+DEFAULT_CHUNK_SIZE = 16
+GROUP_COMMIT_SIZE = 256
+RECORD_FIELDS = ("path", "size", "mtime", "creator", "lastModifiedBy", "revision", "Application", "TotalTime", "error")
+RECORD_FORMATS = ("ndjson", "csv", "tsv")
+
+
+class MetadataRecord(NamedTuple):
+    path: pathlib.Path
+    size: int | None
+    mtime: datetime.datetime | None
+    snapshot: word.MetadataSnapshot | None
+    error: str | None
+
+    def as_row(self) -> dict[str, str | int | None]:
+        snapshot = self.snapshot if self.snapshot is not None else word.MetadataSnapshot(None, None, None, None, None)
+        return {
+            "path": str(self.path),
+            "size": self.size,
+            "mtime": self.mtime.isoformat() if self.mtime is not None else None,
+            "creator": snapshot.creator,
+            "lastModifiedBy": snapshot.last_modified_by,
+            "revision": snapshot.revision,
+            "Application": snapshot.application_name,
+            "TotalTime": snapshot.editing_time,
+            "error": self.error
+        }
+
+
+class FileResult(NamedTuple):
+    path: pathlib.Path
+    status: Literal["success", "unchanged", "skipped", "failed"]
+    error: str | None
+
+
+# Sampler of the current worker process, see load_privet_smirnovoy_sampler()
+__privet_smirnovoy_sampler = None
+
+
+def collect_files(sources: Iterable[str], expand_globs: bool = True) -> Iterator[pathlib.Path]:
+    """Expand directories (recursively) and glob patterns to .docx files, other sources are yielded as they are
+
+    Existing paths are used literally even if their names contain glob characters, e.g. "Report [1].docx".
+    With expand_globs=False (e.g. for dropped paths) only directories are expanded.
+    """
+    for source in sources:
+        path = pathlib.Path(source)
+        if path.is_dir():
+            yield from sorted(file for file in path.rglob(f"*{WORD_FILE_SUFFIX}") if file.is_file())
+        elif expand_globs and not path.exists() and any(character in source for character in GLOB_CHARACTERS):
+            for match in sorted(glob.iglob(source, recursive=True)):
+                path = pathlib.Path(match)
+                if path.is_file() and path.suffix == WORD_FILE_SUFFIX:
+                    yield path
+        else:
+            yield path
+
+
+def read_file_list(file_list) -> Iterator[str]:
+    """Yield non-empty lines of an opened file list"""
+    for line in file_list:
+        if line := line.rstrip("\r\n"):
+            yield line
+
+
+def error_message(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def read_metadata(path: pathlib.Path) -> MetadataRecord:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return MetadataRecord(path, None, None, None, f"File {path} was not found.")
+    except OSError as error:
+        return MetadataRecord(path, None, None, None, error_message(error))
+    size = stat.st_size
+    mtime = datetime.datetime.fromtimestamp(stat.st_mtime, datetime.timezone.utc)
+
+    if path.suffix != WORD_FILE_SUFFIX:
+        return MetadataRecord(path, size, mtime, None, f"File type {path.suffix} is not yet available.")
+    try:
+        return MetadataRecord(path, size, mtime, word.Metadata(path).snapshot(), None)
+    except Exception as error:
+        return MetadataRecord(path, size, mtime, None, error_message(error))
+
+
+class RecordWriter:
+    """Writes metadata records as NDJSON, CSV or TSV lines, one record per write() call"""
+    def write(self, record: MetadataRecord) -> None:
+        row = record.as_row()
+        if self.__csv_writer is not None:
+            self.__csv_writer.writerow(row)
+        else:
+            self.__stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def __init__(self, stream, record_format: Literal["ndjson", "csv", "tsv"]):
+        match record_format:
+            case "ndjson":
+                self.__csv_writer = None
+            case "csv":
+                self.__csv_writer = csv.DictWriter(stream, RECORD_FIELDS, lineterminator="\n")
+            case "tsv":
+                self.__csv_writer = csv.DictWriter(stream, RECORD_FIELDS, dialect="excel-tab", lineterminator="\n")
+            case _:
+                raise ValueError(f'RecordWriter(stream, record_format) record_format should be one of '
+                                 f'{", ".join(RECORD_FORMATS)} (not "{record_format}")')
+        self.__stream = stream
+        if self.__csv_writer is not None:
+            self.__csv_writer.writeheader()
+
+
+def __worker_durability_group() -> word.DurabilityGroup | None:
+    """Group of a file committed by a worker in "group" durability
+
+    The worker syncs the file if it's updated in place, syncing folders is left to group_commit() of the caller.
+    """
+    return word.DurabilityGroup() if word.default_durability() == "group" else None
+
+
+def __edit(path: pathlib.Path, changes: dict[str, str | int]) -> FileResult:
+    if path.suffix != WORD_FILE_SUFFIX:
+        return FileResult(path, "skipped", f"File type {path.suffix} is not yet available.")
+    if not path.exists():
+        return FileResult(path, "failed", f"File {path} was not found.")
+    durability_group = __worker_durability_group()
+    try:
+        with word.Metadata(path, durability_group=durability_group).edit() as session:
+            for key, value in changes.items():
+                session[key] = value
+        if durability_group is not None:
+            durability_group.flush_files()
+    except Exception as error:
+        return FileResult(path, "failed", error_message(error))
+    return FileResult(path, "success" if session.written else "unchanged", None)
+
+
+def apply_new_command_config(path: pathlib.Path, config: preferences.NewCommandConfig) -> FileResult:
+    return __edit(path, {
+        "TotalTime": config.editing_time,
+        "revision": config.revision,
+        "creator": config.creator,
+        "lastModifiedBy": config.last_modified_by,
+        "Application": config.application
+    })
+
+
+def load_privet_smirnovoy_sampler(config: preferences.PrivetSmirnovoyConfig, seed: int | None = None) -> None:
+    """Worker initializer: create the sampler used by apply_privet_smirnovoy() once per process"""
+    global __privet_smirnovoy_sampler
+    __privet_smirnovoy_sampler = preferences.PrivetSmirnovoySampler(config, seed)
+
+
+def apply_privet_smirnovoy(path: pathlib.Path) -> FileResult:
+    """Apply privet_smirnovoy preferences with their own random draws for every file
+
+    With a seeded sampler the draws depend only on the seed and the file path, not on the worker.
+    """
+    # A failed draw (e.g. an unreadable name pool) fails only this file instead of the whole pool
+    try:
+        draw = __privet_smirnovoy_sampler.draw(str(path))
+    except Exception as error:
+        return FileResult(path, "failed", error_message(error))
+    changes = {
+        "TotalTime": preferences.PRIVET_SMIRNOVOY_EDITING_TIME,
+        "revision": preferences.PRIVET_SMIRNOVOY_REVISION
+    }
+    if draw.creators is not None:
+        changes["creator"] = draw.creators
+    if draw.modifiers is not None:
+        changes["lastModifiedBy"] = draw.modifiers
+    if draw.application is not None:
+        changes["Application"] = draw.application
+    return __edit(path, changes)
+
+
+def apply_assignment(assignment: planner.Assignment) -> FileResult:
+    """Apply one planned assignment of a plan file"""
+    return __edit(pathlib.Path(assignment.path), assignment.changes)
+
+
+def compact(path: pathlib.Path) -> FileResult:
+    """Reclaim space left by "append" update mode, packages without dead bytes are skipped"""
+    if path.suffix != WORD_FILE_SUFFIX:
+        return FileResult(path, "skipped", f"File type {path.suffix} is not yet available.")
+    if not path.exists():
+        return FileResult(path, "failed", f"File {path} was not found.")
+    durability_group = __worker_durability_group()
+    try:
+        reclaimed_bytes = word.Metadata(path, durability_group=durability_group).compact()
+        if durability_group is not None:
+            durability_group.flush_files()
+    except Exception as error:
+        return FileResult(path, "failed", error_message(error))
+    return FileResult(path, "success" if reclaimed_bytes else "skipped", None)
+
+
+def group_commit(results: Iterable[FileResult], group_size: int = GROUP_COMMIT_SIZE) -> Iterator[FileResult]:
+    """Sync written files once per group_size files when METADATA_EDITOR_DURABILITY is "group"
+
+    Workers sync the data of their files, the folders of written files are synced here once per group.
+    """
+    if word.default_durability() != "group":
+        yield from results
+        return
+
+    with word.DurabilityGroup() as durability_group:
+        for result in results:
+            if result.status == "success":
+                # Workers already synced the file data, only its folder is left
+                durability_group.add(result.path, replaced=True)
+                if len(durability_group) >= group_size:
+                    durability_group.flush()
+            yield result
+
+
+def map_files(function: Callable, paths: Iterable[pathlib.Path], workers: int | None = None,
+              ordered: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              initializer: Callable | None = None, initializer_arguments: tuple = ()) -> Iterator:
+    """Apply function to every path in a process pool and yield results as they are done
+
+    With ordered=True results are yielded in the order of paths. workers=1 runs in the current process.
+    initializer is called once in every worker process.
+    """
+    match workers:
+        case int() if workers < 1:
+            raise ValueError(f"map_files() workers should be positive (not {workers})")
+        case int() | None:
+            pass
+        case _:
+            raise TypeError(f"map_files() workers should be int or None (not {type(workers)})")
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initializer_arguments)
+        yield from map(function, paths)
+        return
+
+    with multiprocessing.Pool(workers, initializer, initializer_arguments) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        yield from imap(function, paths, chunk_size)
@@ -0,0 +1,87 @@
+import concurrent.futures
+import pathlib
+import sys
+import threading
+from typing import Callable
+
+import word
+
+
+# Constants
+DEFAULT_MAX_WORKERS = 4
+
+
+def commit_changes(path: pathlib.Path, changes: dict[str, str | int | None]) -> None:
+    with word.Metadata(path).edit() as session:
+        for key, value in changes.items():
+            session[key] = value
+
+
+class FileJobExecutor:
+    """Persistent thread pool where edits of the same file are serialized
+
+    Edits submitted while an edit of the same file is waiting are merged into it (later values win),
+    so rapid saves of one document end up as one commit. Different files are edited in parallel.
+    Callbacks are called from worker threads with the file path and the raised exception or None,
+    their own errors are reported to sys.excepthook.
+    """
+    def __run_file_jobs(self, path: pathlib.Path) -> None:
+        try:
+            while True:
+                with self.__lock:
+                    job = self.__pending_jobs.pop(path, None)
+                    if job is None:
+                        self.__running_paths.discard(path)
+                        return
+                changes, callbacks = job
+
+                error = None
+                try:
+                    self.__commit(path, changes)
+                except Exception as exception:
+                    error = exception
+                for callback in callbacks:
+                    # A failing callback mustn't stop the other callbacks and the next edits of the file
+                    try:
+                        callback(path, error)
+                    except Exception:
+                        sys.excepthook(*sys.exc_info())
+        finally:
+            # Released after a BaseException too, otherwise later edits of the file would wait forever
+            with self.__lock:
+                self.__running_paths.discard(path)
+
+    def submit_edit(self, path: pathlib.Path, changes: dict[str, str | int | None],
+                    on_done: Callable[[pathlib.Path, Exception | None], None] | None = None) -> None:
+        path = path.absolute()
+        with self.__lock:
+            pending_changes, callbacks = self.__pending_jobs.setdefault(path, ({}, []))
+            pending_changes.update(changes)
+            if on_done is not None:
+                callbacks.append(on_done)
+            if path in self.__running_paths:
+                return
+            self.__running_paths.add(path)
+        self.__executor.submit(self.__run_file_jobs, path)
+
+    def submit(self, function: Callable, *args) -> concurrent.futures.Future:
+        """Run a job that doesn't write files (e.g. reading preferences) in the pool"""
+        return self.__executor.submit(function, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.__executor.shutdown(wait=wait)
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 commit: Callable[[pathlib.Path, dict], None] = commit_changes):
+        match max_workers:
+            case int() if max_workers > 0:
+                pass
+            case _:
+                raise TypeError(f"FileJobExecutor(max_workers) max_workers should be positive int "
+                                f"(not {max_workers!r})")
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                                thread_name_prefix="file_jobs")
+        self.__commit = commit
+        self.__lock = threading.Lock()
+        self.__pending_jobs = {}
+        self.__running_paths = set()
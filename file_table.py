@@ -0,0 +1,124 @@
+import pathlib
+from typing import Iterable, Literal
+
+import batch
+
+
+# Constants
+TABLE_COLUMNS = ("creator", "lastModifiedBy", "revision", "Application", "TotalTime")
+INTEGER_COLUMNS = ("revision", "TotalTime")
+# "unreadable" files failed to load and can't be selected, "failed" files failed to save
+ROW_STATUSES = ("loading", "loaded", "unreadable", "saving", "saved", "failed")
+EDITABLE_STATUSES = ("loaded", "saved", "failed")
+
+
+def column_value(column: str, text: str) -> str | int:
+    """Value of a column typed in the GUI as it's written to the file"""
+    match column:
+        case str() if column in INTEGER_COLUMNS:
+            return int(text)
+        case str() if column in TABLE_COLUMNS:
+            return text
+        case _:
+            raise ValueError(f'Unknown column "{column}", columns are {", ".join(TABLE_COLUMNS)}')
+
+
+class FileTable:
+    """Rows of dropped files for the batch editing table
+
+    Rows are dicts in the RecycleView data format, all the cells are strings. Rows are changed only
+    from the main thread, metadata is loaded and saved by the caller.
+    """
+    @staticmethod
+    def __text(value: str | int | None) -> str:
+        return "" if value is None else str(value)
+
+    def __row(self, path: pathlib.Path) -> dict[str, str | bool | int]:
+        return self.rows[self.__indexes[path]]
+
+    def add_files(self, paths: Iterable[pathlib.Path]) -> list[pathlib.Path]:
+        """Add rows in "loading" status and return the paths that weren't in the table yet"""
+        added_paths = []
+        for path in paths:
+            path = path.absolute()
+            if path in self.__indexes:
+                continue
+            self.__indexes[path] = len(self.rows)
+            self.rows.append({
+                "index": len(self.rows),
+                "path": str(path),
+                "file_name": path.name,
+                **{column: "" for column in TABLE_COLUMNS},
+                "status": "loading",
+                "error": "",
+                "selected": True
+            })
+            added_paths.append(path)
+        return added_paths
+
+    def set_record(self, record: batch.MetadataRecord) -> int:
+        """Fill the row of the record and return its index"""
+        row = self.__row(record.path.absolute())
+        if record.error is not None:
+            row.update(status="unreadable", error=record.error, selected=False)
+            return row["index"]
+
+        snapshot = record.snapshot
+        row.update(
+            creator=self.__text(snapshot.creator),
+            lastModifiedBy=self.__text(snapshot.last_modified_by),
+            revision=self.__text(snapshot.revision),
+            Application=self.__text(snapshot.application_name),
+            TotalTime=self.__text(snapshot.editing_time),
+            status="loaded",
+            error=""
+        )
+        return row["index"]
+
+    def set_status(self, path: pathlib.Path,
+                   status: Literal["loading", "loaded", "unreadable", "saving", "saved", "failed"],
+                   error: str | None = None) -> int:
+        match status:
+            case str() if status in ROW_STATUSES:
+                pass
+            case _:
+                raise ValueError(f'Unknown status "{status}", statuses are {", ".join(ROW_STATUSES)}')
+        row = self.__row(path.absolute())
+        row.update(status=status, error=self.__text(error))
+        return row["index"]
+
+    def set_values(self, path: pathlib.Path, changes: dict[str, str | int | None]) -> int:
+        row = self.__row(path.absolute())
+        row.update({column: self.__text(value) for column, value in changes.items() if column in TABLE_COLUMNS})
+        return row["index"]
+
+    def select(self, index: int, selected: bool) -> None:
+        self.rows[index]["selected"] = selected and self.rows[index]["status"] != "unreadable"
+
+    def select_all(self, selected: bool) -> None:
+        for row in self.rows:
+            self.select(row["index"], selected)
+
+    @property
+    def selected_paths(self) -> list[pathlib.Path]:
+        """Selected files with loaded metadata"""
+        return [pathlib.Path(row["path"]) for row in self.rows
+                if row["selected"] and row["status"] in EDITABLE_STATUSES]
+
+    @property
+    def loading(self) -> bool:
+        return any(row["status"] == "loading" for row in self.rows)
+
+    def clear(self) -> None:
+        self.rows.clear()
+        self.__indexes.clear()
+
+    def __contains__(self, path: pathlib.Path) -> bool:
+        return path.absolute() in self.__indexes
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __init__(self):
+        self.rows: list[dict[str, str | bool | int]] = []
+        self.__indexes: dict[pathlib.Path, int] = {}
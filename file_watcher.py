@@ -0,0 +1,143 @@
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Literal
+
+
+# Constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+INOTIFY_READ_SIZE = 64 * 1024
+
+DEFAULT_POLL_INTERVAL = 1.0
+STOP_CHECK_INTERVAL = 0.5
+# Editors save a file with several events (truncate, write, rename), they are reported as one change
+SETTLE_DELAY = 0.1
+
+
+class FileWatcher:
+    """Calls callback from a background thread every time the file is changed, created or removed
+
+    inotify is used on Linux, other systems (or an unavailable inotify) fall back to stat polling.
+    The parent folder is watched, so files replaced by rename are noticed as well.
+    """
+    def __stat_key(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def __inotify_init(folder_path: pathlib.Path) -> int | None:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            inotify_fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if inotify_fd < 0:
+            return None
+        if libc.inotify_add_watch(inotify_fd, os.fsencode(folder_path), INOTIFY_MASK) < 0:
+            os.close(inotify_fd)
+            return None
+        return inotify_fd
+
+    def __read_inotify_events(self, inotify_fd: int) -> bool:
+        """Drain pending events and tell if any of them is about the watched file"""
+        file_name = os.fsencode(self.filepath.name)
+        changed = False
+        while True:
+            try:
+                data = os.read(inotify_fd, INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _watch, _mask, _cookie, name_length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                if data[offset:offset + name_length].rstrip(b"\0") == file_name:
+                    changed = True
+                offset += name_length
+
+    def __watch_inotify(self, inotify_fd: int) -> None:
+        try:
+            while not self.__stop_event.is_set():
+                ready, _, _ = select.select([inotify_fd], [], [], STOP_CHECK_INTERVAL)
+                if not ready or not self.__read_inotify_events(inotify_fd):
+                    continue
+                if self.__stop_event.wait(SETTLE_DELAY):
+                    break
+                self.__read_inotify_events(inotify_fd)
+                self.__notify()
+        finally:
+            os.close(inotify_fd)
+
+    def __watch_polling(self) -> None:
+        while not self.__stop_event.wait(self.poll_interval):
+            self.__notify()
+
+    def __notify(self) -> None:
+        stat_key = self.__stat_key()
+        if stat_key != self.__last_stat_key:
+            self.__last_stat_key = stat_key
+            # A failing callback is reported and the file is still watched for the next changes
+            try:
+                self.callback()
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+
+    def start(self) -> None:
+        if self.__thread is not None:
+            return
+        self.__stop_event.clear()
+        self.__last_stat_key = self.__stat_key()
+
+        inotify_fd = self.__inotify_init(self.filepath.absolute().parent) if self.__use_inotify else None
+        if inotify_fd is not None:
+            self.backend = "inotify"
+            self.__thread = threading.Thread(target=self.__watch_inotify, args=(inotify_fd,), daemon=True)
+        else:
+            self.backend = "polling"
+            self.__thread = threading.Thread(target=self.__watch_polling, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        if self.__thread is None:
+            return
+        self.__stop_event.set()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __init__(self, filepath: pathlib.Path, callback: Callable[[], None],
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        match filepath, poll_interval:
+            case pathlib.Path(), int() | float() if poll_interval > 0:
+                pass
+            case _:
+                raise TypeError("FileWatcher(filepath, callback, poll_interval) expects filepath as pathlib.Path and "
+                                f"positive poll_interval (not {type(filepath)}, {poll_interval!r})")
+        self.filepath = filepath
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.backend: Literal["inotify", "polling"] | None = None
+        self.__use_inotify = use_inotify
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__last_stat_key = None
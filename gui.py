@@ -1,7 +1,8 @@
+import functools
 import os
 import pathlib
 import sys
-from threading import Thread
+from threading import Thread, Event
 from typing import Iterable
 
 from kivy import utils, Config
@@ -13,10 +14,17 @@ from kivy.core.window import Window
 from kivy.animation import Animation
 from kivy.uix.textinput import TextInput
 from kivy.uix.anchorlayout import AnchorLayout
-from kivy.properties import VariableListProperty, StringProperty, ObjectProperty
+from kivy.uix.behaviors import ButtonBehavior
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import VariableListProperty, StringProperty, ObjectProperty, NumericProperty, BooleanProperty
 
 from kivymd.app import MDApp
 
+import batch
+import file_jobs
+import file_table
+import file_watcher
 import preferences
 import word
 
@@ -30,7 +38,7 @@ Config.set('graphics', 'maxfps', 0)
 
 class FileDragAndDropperStateLabel(BoxLayout):
     bg_color = VariableListProperty([0, 0, 0, 0])
-    drag_and_drop_label_text = StringProperty("Drag & drop your file here")
+    drag_and_drop_label_text = StringProperty("Drag & drop your files here")
 
     def __init__(self, **kwargs):
         super(FileDragAndDropperStateLabel, self).__init__(**kwargs)
@@ -39,7 +47,7 @@ class FileDragAndDropperStateLabel(BoxLayout):
 
 class FileDragAndDropperStateInfo(BoxLayout):
     bg_color = VariableListProperty([0, 0, 0, 0])
-    drag_and_drop_label_text = StringProperty("Drag & drop your file here")
+    drag_and_drop_label_text = StringProperty("Drag & drop your files here")
     image_source = StringProperty("")
     info_label_text = StringProperty("")
     drag_and_drop_label_bg_color = VariableListProperty([0, 0, 0, 0])
@@ -49,6 +57,70 @@ class FileDragAndDropperStateInfo(BoxLayout):
         self.default_drag_and_drop_label_color = None
 
 
+class FileTableRow(RecycleDataViewBehavior, ButtonBehavior, BoxLayout):
+    index = NumericProperty(0)
+    path = StringProperty("")
+    file_name = StringProperty("")
+    creator = StringProperty("")
+    lastModifiedBy = StringProperty("")
+    revision = StringProperty("")
+    Application = StringProperty("")
+    TotalTime = StringProperty("")
+    status = StringProperty("")
+    error = StringProperty("")
+    selected = BooleanProperty(False)
+
+    def refresh_view_attrs(self, table_view, index, data):
+        self.table_view = table_view
+        return super(FileTableRow, self).refresh_view_attrs(table_view, index, data)
+
+    def on_release(self):
+        self.table_view.toggle_selection(self.index)
+
+    def __init__(self, **kwargs):
+        self.table_view = None
+        super(FileTableRow, self).__init__(**kwargs)
+
+
+class FileTableView(RecycleView):
+    """Virtualized table of dropped files, only the visible rows have widgets"""
+    summary_text = StringProperty("")
+
+    def __refresh_rows(self, *_):
+        self.data = self.file_table.rows
+        # Rows are changed in place, so the new data is equal to the old one and isn't dispatched by itself
+        self.refresh_from_data()
+        selected_number = len(self.file_table.selected_paths)
+        loading_number = sum(row["status"] == "loading" for row in self.file_table.rows)
+        self.summary_text = f"{len(self.file_table)} files, {selected_number} selected" + \
+                            (f", {loading_number} loading..." if loading_number else "")
+
+    def refresh_rows(self):
+        # Every loaded file asks for a refresh, they are coalesced into one refresh per frame
+        self.__refresh_trigger()
+
+    def toggle_selection(self, index: int):
+        self.file_table.select(index, not self.file_table.rows[index]["selected"])
+        self.refresh_rows()
+
+    def select_all(self, selected: bool):
+        self.file_table.select_all(selected)
+        self.refresh_rows()
+
+    def __init__(self, **kwargs):
+        self.file_table = file_table.FileTable()
+        self.__refresh_trigger = Clock.create_trigger(self.__refresh_rows)
+        super(FileTableView, self).__init__(**kwargs)
+
+
+class FileDragAndDropperStateTable(BoxLayout):
+    bg_color = VariableListProperty([0, 0, 0, 0])
+
+    def __init__(self, **kwargs):
+        super(FileDragAndDropperStateTable, self).__init__(**kwargs)
+        self.default_drag_and_drop_label_color = None
+
+
 class WidgetChangeAnimation:
     def new_widget_add(self):
         self.parent_widget.remove_widget(self.old_widget)
@@ -219,14 +291,21 @@ class FileDragAndDropper(BoxLayout):
             case str("label"), None:
                 self.add_widget(self.__state_label_box_layout)
                 self.current_state = "label"
-            case str("label"), str("info"):
+            case str("label"), str("info" | "table"):
                 change_widget_animation = WidgetChangeAnimation(
                     parent_widget=self,
-                    old_widget=self.__state_info_box_layout,
+                    old_widget=(self.__state_info_box_layout if self.current_state == "info"
+                                else self.__state_table_box_layout),
                     new_widget=self.__state_label_box_layout,
                 )
                 change_widget_animation.start()
 
+                if self.current_state == "table":
+                    self.__table_cancel_event.set()
+                    self.__table_cancel_event = Event()
+                    self.file_table.clear()
+                    self.file_table_view.refresh_rows()
+
                 self.default_text_input_values = None
 
                 self.reset_button.disabled = True
@@ -267,9 +346,22 @@ class FileDragAndDropper(BoxLayout):
                     self.update_info_widget
                 )
                 properties_animation.start()
+            case str("table"), str("label" | "info"):
+                change_widget_animation = WidgetChangeAnimation(
+                    parent_widget=self,
+                    old_widget=(self.__state_label_box_layout if self.current_state == "label"
+                                else self.__state_info_box_layout),
+                    new_widget=self.__state_table_box_layout,
+                )
+                change_widget_animation.start()
+
+                self.current_working_file = None
+                self.current_state = "table"
+                self.__initialize_table_text_inputs()
 
     def __init__(self, **kwargs):
-        Window.bind(on_drop_file=self._on_file_drop)
+        Window.bind(on_drop_begin=self._on_drop_begin, on_drop_file=self._on_file_drop,
+                    on_drop_end=self._on_drop_end)
 
         self.creator_text_input = None
         self.last_modified_by_text_input = None
@@ -286,6 +378,11 @@ class FileDragAndDropper(BoxLayout):
 
         self.current_state = None
         self.current_working_file = None
+        self.loading_file = None
+        self.__load_cancel_event = None
+        self.__table_cancel_event = Event()
+        self.__dropped_paths = []
+        self.file_jobs = None
         self.default_drag_and_drop_label_color = None
         self.drag_and_drop_text_changing = None
 
@@ -297,6 +394,10 @@ class FileDragAndDropper(BoxLayout):
             bg_color=(255, 255, 0, .5)
         )
 
+        self.__state_table_box_layout = FileDragAndDropperStateTable(
+            bg_color=(255, 255, 0, .5)
+        )
+
         self.set_state("label")
 
     def change_drag_and_drop_label_text(self, period, new_text):
@@ -371,32 +472,76 @@ class FileDragAndDropper(BoxLayout):
     def initialize_word_file_animation(self):
         self.set_state("info")
 
+    def show_loading_state(self, file: pathlib.Path):
+        if self.current_state == "info":
+            self.__state_info_box_layout.info_label_text = f'Loading "{file.name}"...'
+        else:
+            self.__state_label_box_layout.drag_and_drop_label_text = f'Loading "{file.name}"...'
+
+    def hide_loading_state(self):
+        self.__state_label_box_layout.drag_and_drop_label_text = "Drag & drop your files here"
+        if self.current_state == "info" and self.current_working_file is not None:
+            self.__state_info_box_layout.info_label_text = f'Word file "{self.current_working_file.name}"'
+
     def __initialize_file(self, file: pathlib.Path):
-        if word.is_word_file(file) is False:
-            self.invalid_file_animation()
+        if file == (self.loading_file or self.current_working_file):
             return
 
-        if self.current_working_file == file:
+        # Newer drop makes every running load stale
+        if self.__load_cancel_event is not None:
+            self.__load_cancel_event.set()
+        self.__load_cancel_event = cancel_event = Event()
+        self.loading_file = file
+
+        self.show_loading_state(file)
+        Thread(target=self.__load_file, args=(file, cancel_event), daemon=True).start()
+
+    def __load_file(self, file: pathlib.Path, cancel_event: Event):
+        loaded = False
+        try:
+            if word.is_word_file(file) is False or cancel_event.is_set():
+                return
+            # Every failure (e.g. zlib.error of a corrupted member) is turned into an error record
+            record = batch.read_metadata(file)
+            if record.error is None:
+                self.__file_loaded(file, record.snapshot, cancel_event)
+                loaded = True
+        finally:
+            # The loading state is cleared whatever happens, otherwise the same file can't be dropped again
+            if not loaded:
+                self.__file_load_failed(cancel_event)
+
+    @mainthread
+    def __file_load_failed(self, cancel_event: Event):
+        if cancel_event.is_set():
             return
+        self.loading_file = None
+        self.hide_loading_state()
+        self.invalid_file_animation()
 
+    @mainthread
+    def __file_loaded(self, file: pathlib.Path, snapshot: word.MetadataSnapshot, cancel_event: Event):
+        if cancel_event.is_set():
+            return
+        self.loading_file = None
+        self.hide_loading_state()
         self.current_working_file = file
-        metadata = word.Metadata(self.current_working_file)
 
-        if (creator := metadata.creator) is None:
+        if (creator := snapshot.creator) is None:
             creator = ""
 
-        if (last_modified_by := metadata.last_modified_by) is None:
+        if (last_modified_by := snapshot.last_modified_by) is None:
             last_modified_by = ""
 
-        if (revision := metadata.revision) is None:
+        if (revision := snapshot.revision) is None:
             revision = ""
         else:
             revision = str(revision)
 
-        if (application := metadata.application_name) is None:
+        if (application := snapshot.application_name) is None:
             application = ""
 
-        if (editing_time := metadata.editing_time) is None:
+        if (editing_time := snapshot.editing_time) is None:
             editing_time = "0"
         else:
             editing_time = str(editing_time)
@@ -440,17 +585,9 @@ class FileDragAndDropper(BoxLayout):
 
         self.initialize_word_file_animation()
 
-        try:
-            self.reset_button.disabled = not preferences.NewCommandPreferences().valid
-        except (preferences.InvalidPreferencesStructureError, FileNotFoundError, UnicodeDecodeError,
-                AttributeError, ValueError, TypeError):
-            self.reset_button.disabled = True
-
-        try:
-            self.send_hello_button.disabled = not preferences.PrivetSmirnovoyPreference().valid
-        except (preferences.InvalidPreferencesStructureError, FileNotFoundError, UnicodeDecodeError,
-                AttributeError, ValueError, TypeError):
-            self.send_hello_button.disabled = True
+        preferences_validation = preferences.validate_preferences()
+        self.reset_button.disabled = not preferences_validation.section_valid("new")
+        self.send_hello_button.disabled = not preferences_validation.section_valid("privet_smirnovoy")
 
         self.creator_text_input.disabled = False
         self.last_modified_by_text_input.disabled = False
@@ -460,6 +597,83 @@ class FileDragAndDropper(BoxLayout):
 
         self.save_button.disabled = True
 
+    @property
+    def file_table_view(self) -> FileTableView:
+        return self.__state_table_box_layout.ids.file_table_view
+
+    @property
+    def file_table(self) -> file_table.FileTable:
+        return self.file_table_view.file_table
+
+    def __initialize_table_text_inputs(self):
+        """Empty inputs that set a column of every selected file, empty input keeps the column as it is"""
+        text_inputs = {
+            "creator": self.creator_text_input,
+            "lastModifiedBy": self.last_modified_by_text_input,
+            "revision": self.revision_text_input,
+            "Application": self.application_text_input,
+            "TotalTime": self.editing_time_text_input
+        }
+        for text_input in text_inputs.values():
+            text_input.text = ""
+            text_input.disabled = False
+
+        self.default_text_input_values = TextInputsDefaultValues(
+            TextInputDefaultValue(input_name=input_name, input_object=text_input, input_value=None)
+            for input_name, text_input in text_inputs.items()
+        )
+
+        preferences_validation = preferences.validate_preferences()
+        self.reset_button.disabled = not preferences_validation.section_valid("new")
+        self.send_hello_button.disabled = not preferences_validation.section_valid("privet_smirnovoy")
+        self.save_button.disabled = True
+
+    def __initialize_files(self, paths: list[pathlib.Path]):
+        # A single file that is still loading is dropped in favour of the table
+        if self.__load_cancel_event is not None:
+            self.__load_cancel_event.set()
+            self.loading_file = None
+            self.hide_loading_state()
+
+        self.set_state("table")
+        self.file_jobs.submit(self.__queue_files, paths, self.__table_cancel_event)
+
+    def __queue_files(self, paths: list[pathlib.Path], cancel_event: Event):
+        # Dropped paths are always literal, they are never expanded as glob patterns
+        files = list(batch.collect_files((str(path) for path in paths), expand_globs=False))
+        self.__files_queued(files, cancel_event)
+
+    @mainthread
+    def __files_queued(self, files: list[pathlib.Path], cancel_event: Event):
+        if cancel_event.is_set():
+            return
+        for file in self.file_table.add_files(files):
+            self.file_jobs.submit(self.__load_table_file, file, cancel_event)
+        self.file_table_view.refresh_rows()
+
+    def __load_table_file(self, file: pathlib.Path, cancel_event: Event):
+        if cancel_event.is_set():
+            return
+        self.__table_file_loaded(batch.read_metadata(file), cancel_event)
+
+    @mainthread
+    def __table_file_loaded(self, record: batch.MetadataRecord, cancel_event: Event):
+        if cancel_event.is_set():
+            return
+        self.file_table.set_record(record)
+        self.file_table_view.refresh_rows()
+
+    def _on_drop_begin(self, *_):
+        self.__dropped_paths = []
+
+    def _on_drop_end(self, *_):
+        dropped_paths, self.__dropped_paths = self.__dropped_paths, []
+        match dropped_paths:
+            case [pathlib.Path() as file_path] if not file_path.is_dir() and self.current_state != "table":
+                self.__initialize_file(file_path)
+            case [_, *_]:
+                self.__initialize_files(dropped_paths)
+
     def _on_file_drop(self, window, file_path, *_):
         for children in window.children:
             match children:
@@ -471,14 +685,18 @@ class FileDragAndDropper(BoxLayout):
         else:
             return
 
-        if self.current_state == "label":
-            dropped_correctly = self.__state_label_box_layout.collide_point(*Window.mouse_pos)
-        else:
-            dropped_correctly = self.__state_info_box_layout.ids.drag_and_drop_label.collide_point(*Window.mouse_pos)
+        match self.current_state:
+            case "label":
+                dropped_correctly = self.__state_label_box_layout.collide_point(*Window.mouse_pos)
+            case "table":
+                dropped_correctly = self.__state_table_box_layout.collide_point(*Window.mouse_pos)
+            case _:
+                dropped_correctly = self.__state_info_box_layout.ids.drag_and_drop_label.collide_point(
+                    *Window.mouse_pos)
 
+        # Files of one drop are handled together in _on_drop_end()
         if dropped_correctly:
-            file_path = pathlib.Path(file_path.decode("utf-8"))
-            self.__initialize_file(file_path)
+            self.__dropped_paths.append(pathlib.Path(file_path.decode("utf-8")))
 
 
 class CustomTextInput(AnchorLayout):
@@ -533,13 +751,10 @@ class ScreenManagement(ScreenManager):
 
 
 class MainUi(Screen):
+    @mainthread
     def update_reset_metadata_button(self, preferences_valid: bool | None = None):
         if preferences_valid is None:
-            try:
-                preferences_valid = preferences.NewCommandPreferences().valid
-            except (preferences.InvalidPreferencesStructureError, FileNotFoundError, UnicodeDecodeError,
-                    AttributeError, ValueError, TypeError):
-                preferences_valid = False
+            preferences_valid = preferences.validate_preferences().section_valid("new")
 
         if preferences_valid:
             if self.default_values is not None:
@@ -549,13 +764,10 @@ class MainUi(Screen):
         else:
             self.ids.reset_button.disabled = True
 
+    @mainthread
     def update_send_hello_button(self, preferences_valid: bool | None = None):
         if preferences_valid is None:
-            try:
-                preferences_valid = preferences.PrivetSmirnovoyPreference().valid
-            except (preferences.InvalidPreferencesStructureError, FileNotFoundError, UnicodeDecodeError,
-                    AttributeError, ValueError, TypeError):
-                preferences_valid = False
+            preferences_valid = preferences.validate_preferences().section_valid("privet_smirnovoy")
 
         if preferences_valid:
             if self.default_values is not None:
@@ -575,46 +787,26 @@ class MainUi(Screen):
         else:
             self.ids.save_button.disabled = True
 
+    @staticmethod
+    def preferences_problems_text(problems: Iterable[preferences.PreferencesProblem]) -> str:
+        return "\n".join(problem.message for problem in problems)
+
     def check_preferences(self) -> None:
-        new_command = preferences.NewCommandPreferences()
-        privet_smirnovoy_command = preferences.PrivetSmirnovoyPreference()
+        preferences_validation = preferences.validate_preferences()
 
-        try:
-            if new_command.valid:
-                self.update_reset_metadata_button(True)
-                self.hide_reset_button_warning()
-        except preferences.InvalidPreferencesStructureError:
-            self.update_reset_metadata_button(False)
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-        except FileNotFoundError:
+        if new_command_problems := preferences_validation.section_problems("new"):
             self.update_reset_metadata_button(False)
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-        except UnicodeDecodeError:
-            self.update_reset_metadata_button(False)
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-        except (AttributeError, ValueError, TypeError):
-            self.update_reset_metadata_button(False)
-            self.show_reset_button_warning(f"Some preferences was not found or invalid\n"
-                                           f"Please, check {preferences.PREFERENCES_FILEPATH.name}")
+            self.show_reset_button_warning(self.preferences_problems_text(new_command_problems))
+        else:
+            self.update_reset_metadata_button(True)
+            self.hide_reset_button_warning()
 
-        try:
-            if privet_smirnovoy_command.valid:
-                self.update_send_hello_button(True)
-                self.hide_send_hello_button_warning()
-        except preferences.InvalidPreferencesStructureError:
-            self.update_send_hello_button(False)
-            self.show_send_hello_button_warning(f'Invalid structure of '
-                                                f'"{preferences.PREFERENCES_FILEPATH.name}" file.')
-        except FileNotFoundError:
-            self.update_send_hello_button(False)
-            self.show_send_hello_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-        except UnicodeDecodeError:
-            self.update_send_hello_button(False)
-            self.show_send_hello_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-        except (AttributeError, ValueError, TypeError):
+        if privet_smirnovoy_problems := preferences_validation.section_problems("privet_smirnovoy"):
             self.update_send_hello_button(False)
-            self.show_send_hello_button_warning(f"Some preferences was not found or invalid\n"
-                                                f"Please, check {preferences.PREFERENCES_FILEPATH.name}")
+            self.show_send_hello_button_warning(self.preferences_problems_text(privet_smirnovoy_problems))
+        else:
+            self.update_send_hello_button(True)
+            self.hide_send_hello_button_warning()
 
     @mainthread
     def show_reset_button_warning(self, text: str | None = None):
@@ -712,228 +904,158 @@ class MainUi(Screen):
 
     def save_button_pressed(self):
         self.ids.save_button.disabled = True
-        save_process = Thread(target=self.save_changes)
-        save_process.start()
+        self.save_changes()
 
     def save_changes(self):
-        if (current_file := self.ids.file_drag_and_dropper.current_working_file) is None:
+        """Queue the changed values, writes of the same file are serialized and merged by file_jobs"""
+        if self.ids.file_drag_and_dropper.current_state == "table":
+            self.save_table_changes()
             return
 
-        metadata = word.Metadata(current_file)
+        if (current_file := self.ids.file_drag_and_dropper.current_working_file) is None:
+            return
 
         if not self.default_values.changed:
             return
 
+        if not current_file.exists():
+            self.ids.file_drag_and_dropper.set_state("label")
+            self.update_save_button()
+            return
+
+        changes = {}
         for value in self.default_values:
             value.apply_changes()
-            if not current_file.exists():
-                self.ids.file_drag_and_dropper.set_state("label")
-                break
-            try:
-                match value.input_name:
-                    case str("revision" | "TotalTime"):
-                        match value.input_value:
-                            case str():
-                                metadata[value.input_name] = int(value.input_value)
-                            case None:
-                                metadata[value.input_name] = value.input_value
-                    case _:
-                        metadata[value.input_name] = value.input_value
-            except PermissionError:
+            match value.input_name, value.input_value:
+                case str("revision" | "TotalTime"), str():
+                    changes[value.input_name] = int(value.input_value)
+                case _:
+                    changes[value.input_name] = value.input_value
+        self.file_jobs.submit_edit(current_file, changes, self.__changes_saved)
+
+    @mainthread
+    def __changes_saved(self, file: pathlib.Path, error: Exception | None):
+        match error:
+            case None:
+                self.hide_save_button_warning()
+            case PermissionError():
                 self.show_save_button_warning(f"Not enough permissions for saving "
-                                              f'"{self.ids.file_drag_and_dropper.current_working_file.name}".\n'
+                                              f'"{file.name}".\n'
                                               f"Maybe the file is already opened in Word?")
-                break
-        else:
-            self.hide_save_button_warning()
+            case _:
+                self.show_save_button_warning(f'Can\'t save "{file.name}".\n{error}')
 
         self.update_save_button()
 
-    def reset_data_button_pressed(self):
-        reset_process = Thread(target=self.reset_data)
-        reset_process.start()
-
-    def reset_data(self):
-        if self.ids.file_drag_and_dropper.current_working_file is None:
+    def save_table_changes(self):
+        """Set every filled input as the column value of the selected files, one commit per file"""
+        if self.default_values is None or not self.default_values.changed:
             return
 
-        new_command_preferences = preferences.NewCommandPreferences()
+        changes = {}
+        for value in self.default_values:
+            if value.changed:
+                changes[value.input_name] = file_table.column_value(value.input_name, value.input_object.text)
+            value.apply_changes()
 
-        completed_with_errors = False
+        file_table_view = self.ids.file_drag_and_dropper.file_table_view
+        for file in file_table_view.file_table.selected_paths:
+            file_table_view.file_table.set_status(file, "saving")
+            self.file_jobs.submit_edit(file, changes, functools.partial(self.__table_changes_saved, changes))
+        file_table_view.refresh_rows()
+        self.update_save_button()
 
-        editing_time = preferences.DEFAULT_WORD_EDITING_TIME
-        try:
-            editing_time = new_command_preferences.editing_time
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
+    @mainthread
+    def __table_changes_saved(self, changes: dict[str, str | int], file: pathlib.Path, error: Exception | None):
+        file_table_view = self.ids.file_drag_and_dropper.file_table_view
+        # The table could be closed while the file was saved
+        if file not in file_table_view.file_table:
             return
 
-        revision = preferences.DEFAULT_WORD_REVISION
-        try:
-            revision = new_command_preferences.revision
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-            return
+        if error is None:
+            file_table_view.file_table.set_values(file, changes)
+            file_table_view.file_table.set_status(file, "saved")
+        else:
+            file_table_view.file_table.set_status(file, "failed", batch.error_message(error))
+            self.show_save_button_warning(f'Can\'t save "{file.name}".\n{batch.error_message(error)}')
+        file_table_view.refresh_rows()
 
-        creator = preferences.DEFAULT_WORD_CREATOR
-        try:
-            creator = new_command_preferences.creator
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-            return
+    def reset_data_button_pressed(self):
+        self.file_jobs.submit(self.reset_data)
 
-        last_modified_by = preferences.DEFAULT_WORD_LAST_MODIFIED_BY
-        try:
-            last_modified_by = new_command_preferences.last_modified_by
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
+    def reset_data(self):
+        if self.default_values is None:
             return
 
-        application_name = preferences.DEFAULT_WORD_APPLICATION_NAME
-        try:
-            application_name = new_command_preferences.application
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_reset_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_reset_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_reset_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
+        preferences_validation = preferences.validate_preferences()
+        if (file_problem := preferences_validation.file_problem) is not None:
+            self.show_reset_button_warning(file_problem.message)
             return
 
+        new_command_problems = preferences_validation.section_problems("new")
+        new_command_config = preferences_validation.config.new.with_defaults()
+
         self.update_text_inputs(
-            editing_time_text_input=str(editing_time),
-            revision_text_input=str(revision),
-            creator_text_input=str(creator),
-            last_modified_by_text_input=str(last_modified_by),
-            application_text_input=str(application_name)
+            editing_time_text_input=str(new_command_config.editing_time),
+            revision_text_input=str(new_command_config.revision),
+            creator_text_input=str(new_command_config.creator),
+            last_modified_by_text_input=str(new_command_config.last_modified_by),
+            application_text_input=str(new_command_config.application)
         )
 
-        if completed_with_errors:
-            self.show_reset_button_warning(f"Some preferences was not found\n"
-                                           f"Please, check {preferences.PREFERENCES_FILEPATH.name}")
+        if new_command_problems:
+            self.show_reset_button_warning(self.preferences_problems_text(new_command_problems))
         else:
             self.hide_reset_button_warning()
 
     def send_hello_button_pressed(self):
-        send_hello_process = Thread(target=self.send_hello)
-        send_hello_process.start()
+        self.file_jobs.submit(self.send_hello)
 
     def send_hello(self):
-        privet_smirnovoy_preferences = preferences.PrivetSmirnovoyPreference()
-
-        completed_with_errors = False
-
-        random_creators_string = None
-        try:
-            random_creators_string = privet_smirnovoy_preferences.random_creators_string
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_send_hello_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_send_hello_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_send_hello_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
+        preferences_validation = preferences.validate_preferences()
+        if (file_problem := preferences_validation.file_problem) is not None:
+            self.show_send_hello_button_warning(file_problem.message)
             return
 
-        random_modifiers_string = None
-        try:
-            random_modifiers_string = privet_smirnovoy_preferences.random_modifiers_string
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_send_hello_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_send_hello_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_send_hello_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-            return
-
-        random_application = None
-        try:
-            random_application = privet_smirnovoy_preferences.random_application
-        except (AttributeError, ValueError, TypeError):
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            self.show_send_hello_button_warning(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.')
-            return
-        except FileNotFoundError:
-            self.show_send_hello_button_warning(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.')
-            return
-        except UnicodeDecodeError:
-            self.show_send_hello_button_warning(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.')
-            return
+        privet_smirnovoy_problems = preferences_validation.section_problems("privet_smirnovoy")
+        draw = preferences.PrivetSmirnovoySampler(preferences_validation.config.privet_smirnovoy).draw()
 
         self.update_text_inputs(
             editing_time_text_input=str(preferences.PRIVET_SMIRNOVOY_EDITING_TIME),
             revision_text_input=str(preferences.PRIVET_SMIRNOVOY_REVISION),
         )
 
-        if random_creators_string is not None:
-            self.update_text_inputs(creator_text_input=str(random_creators_string))
-        if random_modifiers_string is not None:
-            self.update_text_inputs(last_modified_by_text_input=str(random_modifiers_string))
-        if random_application is not None:
-            self.update_text_inputs(application_text_input=str(random_application))
+        if draw.creators is not None:
+            self.update_text_inputs(creator_text_input=draw.creators)
+        if draw.modifiers is not None:
+            self.update_text_inputs(last_modified_by_text_input=draw.modifiers)
+        if draw.application is not None:
+            self.update_text_inputs(application_text_input=draw.application)
 
-        if completed_with_errors:
-            self.show_send_hello_button_warning(f"Some preferences was not found or invalid\n"
-                                                f"Please, check {preferences.PREFERENCES_FILEPATH.name}")
+        if privet_smirnovoy_problems:
+            self.show_send_hello_button_warning(self.preferences_problems_text(privet_smirnovoy_problems))
         else:
             self.hide_send_hello_button_warning()
 
         self.update_save_button()
 
     def on_leave(self, *args):
-        self.check_preferences_event.stop_clock()
+        if self.preferences_watcher is not None:
+            self.preferences_watcher.stop()
 
     def on_enter(self, *args):
-        self.check_preferences_event = Clock.schedule_interval(lambda *_: self.check_preferences(), 3)
-        self.check_preferences_event()
+        # Preferences are validated again in the watcher thread only when preferences.yaml changes
+        if self.preferences_watcher is None:
+            self.preferences_watcher = file_watcher.FileWatcher(preferences.PREFERENCES_FILEPATH.absolute(),
+                                                                self.check_preferences)
+        self.preferences_watcher.start()
+        Thread(target=self.check_preferences, daemon=True).start()
 
     def __init__(self, **kwargs):
-        self.check_preferences_event = None
+        self.preferences_watcher = None
+        self.file_jobs = file_jobs.FileJobExecutor()
         super(MainUi, self).__init__(**kwargs)
+        self.ids.file_drag_and_dropper.file_jobs = self.file_jobs
 
 
 class AntismirnovaApp(MDApp):
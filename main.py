@@ -1,7 +1,15 @@
 import word
 import pathlib
+import itertools
+import multiprocessing
+import sys
+import functools
+from typing import Iterable
 import click
 import preferences
+import batch
+import metadata_index
+import planner
 
 
 @click.group()
@@ -12,28 +20,74 @@ def main():
 
 @click.command()
 @click.argument("file", type=pathlib.Path)  # File or path of the next document types: .docx
-def get_metadata(file: pathlib.Path):
+@click.option("--format", "output_format", type=click.Choice(("text",) + batch.RECORD_FORMATS), default="text",
+              help="Output format")
+def get_metadata(file: pathlib.Path, output_format: str):
     """Get file known metadata"""
+    if output_format != "text":
+        stdout = sys.stdout
+        batch.RecordWriter(stdout, output_format).write(batch.read_metadata(file))
+        stdout.flush()
+        return
+
     if file.exists() is False:
         click.echo(click.style(f"File {file} was not found.", fg="red"))
         return
 
     if file.suffix == ".docx":
-        word_file_metadata = word.Metadata(file)
-        click.echo(click.style("Creator: ", fg="yellow") +
-                   click.style(word_file_metadata.creator, fg="white"))
-        click.echo(click.style("Last modified by: ", fg="yellow") +
-                   click.style(word_file_metadata.last_modified_by, fg="white"))
-        click.echo(click.style("Revision: ", fg="yellow") +
-                   click.style(word_file_metadata.revision, fg="white"))
-        click.echo(click.style("Application: ", fg="yellow") +
-                   click.style(word_file_metadata.application_name, fg="white"))
-        click.echo(click.style("Editing time: ", fg="yellow") +
-                   click.style(word_file_metadata.editing_time, fg="white"))
+        echo_snapshot(word.Metadata(file).snapshot())
     else:
         click.echo(click.style(f"File type {file.suffix} is not yet available.", fg="red"))
 
 
+def echo_snapshot(snapshot: word.MetadataSnapshot) -> None:
+    click.echo(click.style("Creator: ", fg="yellow") +
+               click.style(snapshot.creator, fg="white"))
+    click.echo(click.style("Last modified by: ", fg="yellow") +
+               click.style(snapshot.last_modified_by, fg="white"))
+    click.echo(click.style("Revision: ", fg="yellow") +
+               click.style(snapshot.revision, fg="white"))
+    click.echo(click.style("Application: ", fg="yellow") +
+               click.style(snapshot.application_name, fg="white"))
+    click.echo(click.style("Editing time: ", fg="yellow") +
+               click.style(snapshot.editing_time, fg="white"))
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+@click.option("--ordered", is_flag=True, help="Print results in input order instead of as they are done")
+@click.option("--format", "output_format", type=click.Choice(("text",) + batch.RECORD_FORMATS), default="text",
+              help="Output format, ndjson/csv/tsv print one record per file")
+def get_metadata_batch(sources: tuple[str, ...], files_from, workers: int | None, ordered: bool, output_format: str):
+    """Get known metadata of many files using a process pool"""
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+    records = batch.map_files(batch.read_metadata, batch.collect_files(sources), workers, ordered)
+
+    if output_format != "text":
+        # Stdout stays block buffered when it is piped, records are flushed together at the end
+        stdout = sys.stdout
+        record_writer = batch.RecordWriter(stdout, output_format)
+        for record in records:
+            record_writer.write(record)
+        stdout.flush()
+        return
+
+    failed_count = 0
+    for record in records:
+        click.secho(f"{record.path}:", fg="cyan")
+        if record.error is not None:
+            click.secho(record.error, fg="red")
+            failed_count += 1
+        else:
+            echo_snapshot(record.snapshot)
+
+    if failed_count:
+        click.secho(f"Failed: {failed_count}", fg="red")
+
+
 @click.command()
 @click.argument("file", type=pathlib.Path)
 @click.argument("new_creator", type=str)
@@ -119,6 +173,48 @@ def change_editing_time(file: pathlib.Path, new_editing_time: int):
         click.echo(click.style(f"File type {file.suffix} is not yet available.", fg="red"))
 
 
+def load_new_command_config() -> tuple[preferences.NewCommandConfig, bool] | None:
+    """Echo problems of "new" preferences and return config with defaults and if any problem was found
+
+    None is returned when preferences file can't be used at all.
+    """
+    validation = preferences.validate_preferences()
+    if (file_problem := validation.file_problem) is not None:
+        click.secho(file_problem.message, fg="red")
+        return None
+
+    problems = validation.section_problems("new")
+    for problem in problems:
+        click.secho(f"{problem.message}. Default value{'s' if problem.key is None else ''} used.", fg="red")
+    return validation.config.new.with_defaults(), bool(problems)
+
+
+def load_privet_smirnovoy_config() -> tuple[preferences.PrivetSmirnovoyConfig, bool] | None:
+    """Echo problems of "privet_smirnovoy" preferences and return config and if any problem was found
+
+    None is returned when preferences file can't be used at all.
+    """
+    validation = preferences.validate_preferences()
+    if (file_problem := validation.file_problem) is not None:
+        click.secho(file_problem.message, fg="red")
+        return None
+
+    problems = validation.section_problems("privet_smirnovoy")
+    for problem in problems:
+        click.secho(f"{problem.message}.", fg="red")
+    return validation.config.privet_smirnovoy, bool(problems)
+
+
+def echo_completed(completed_with_errors: bool, written: bool = True) -> None:
+    if completed_with_errors:
+        click.secho("Completed with errors.", fg="yellow")
+        click.secho(f"Please, check {preferences.PREFERENCES_FILEPATH.name}", fg="yellow")
+    elif not written:
+        click.secho("Unchanged, the file already has these values.", fg="green")
+    else:
+        click.secho("Success.", fg="green")
+
+
 @click.command()
 @click.argument("file", type=pathlib.Path)
 def new(file: pathlib.Path):
@@ -127,197 +223,214 @@ def new(file: pathlib.Path):
         click.echo(click.style(f"File {file} was not found.", fg="red"))
         return
     if file.suffix == ".docx":
-        word_file_metadata = word.Metadata(file)
-        new_command_preferences = preferences.NewCommandPreferences()
-
-        completed_with_errors = False
-
-        editing_time = preferences.DEFAULT_WORD_EDITING_TIME
-        try:
-            editing_time = new_command_preferences.editing_time
-        except AttributeError:
-            click.secho('Preference for "editing time" not found. '
-                        f'Default value "{preferences.DEFAULT_WORD_EDITING_TIME}" used.', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
-            return
-
-        revision = preferences.DEFAULT_WORD_REVISION
-        try:
-            revision = new_command_preferences.revision
-        except AttributeError:
-            click.secho('Preference for "revision" not found. '
-                        f'Default value "{preferences.DEFAULT_WORD_REVISION}" used.', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
+        if (loaded_config := load_new_command_config()) is None:
             return
+        config, completed_with_errors = loaded_config
 
-        creator = preferences.DEFAULT_WORD_CREATOR
-        try:
-            creator = new_command_preferences.creator
-        except AttributeError:
-            click.secho('Preference for "creator" not found. '
-                        f'Default value "{preferences.DEFAULT_WORD_CREATOR}" used.', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
-            return
+        with word.Metadata(file).edit() as session:
+            session.editing_time = config.editing_time
+            session.revision = config.revision
+            session.creator = config.creator
+            session.last_modified_by = config.last_modified_by
+            session.application_name = config.application
 
-        last_modified_by = preferences.DEFAULT_WORD_LAST_MODIFIED_BY
-        try:
-            last_modified_by = new_command_preferences.last_modified_by
-        except AttributeError:
-            click.secho('Preference for "last modified by" not found. '
-                        f'Default value "{preferences.DEFAULT_WORD_LAST_MODIFIED_BY}" used.', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
-            return
-
-        application_name = preferences.DEFAULT_WORD_APPLICATION_NAME
-        try:
-            application_name = new_command_preferences.application
-        except AttributeError:
-            click.secho('Preference for "application name" not found. '
-                        f'Default value "{preferences.DEFAULT_WORD_APPLICATION_NAME}" used.', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
-            return
-
-        word_file_metadata.editing_time = editing_time
-        word_file_metadata.revision = revision
-        word_file_metadata.creator = creator
-        word_file_metadata.last_modified_by = last_modified_by
-        word_file_metadata.application_name = application_name
-
-        if completed_with_errors:
-            click.secho("Completed with errors.", fg="yellow")
-            click.secho("Please, check preferences.yaml", fg="yellow")
-        else:
-            click.secho("Success.", fg="green")
+        echo_completed(completed_with_errors, session.written)
     else:
         click.echo(click.style(f"File type {file.suffix} is not yet available.", fg="red"))
 
 
 @click.command()
 @click.argument("file", type=pathlib.Path)
-def privet_smirnovoy(file: pathlib.Path):
+@click.option("--seed", type=int, default=None, help="Seed for reproducible random values")
+def privet_smirnovoy(file: pathlib.Path, seed: int | None):
     """Send hello to Smirnova according to preferences in preferences.yaml file"""
     if file.exists() is False:
         click.echo(click.style(f"File {file} was not found.", fg="red"))
         return
     if file.suffix == ".docx":
-        word_file_metadata = word.Metadata(file)
-        privet_smirnovoy_preferences = preferences.PrivetSmirnovoyPreference()
-
-        completed_with_errors = False
-
-        random_creators_string = None
-        try:
-            random_creators_string = privet_smirnovoy_preferences.random_creators_string
-        except AttributeError:
-            click.secho('Preference for "creator" not found.', fg="red")
-            completed_with_errors = True
-        except ValueError:
-            click.secho('Preference "creators number" is invalid. Maybe too big?', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
+        if (loaded_config := load_privet_smirnovoy_config()) is None:
             return
+        config, completed_with_errors = loaded_config
+        draw = preferences.PrivetSmirnovoySampler(config, seed).draw()
+
+        with word.Metadata(file).edit() as session:
+            session.editing_time = preferences.PRIVET_SMIRNOVOY_EDITING_TIME
+            session.revision = preferences.PRIVET_SMIRNOVOY_REVISION
+            if draw.creators is not None:
+                session.creator = draw.creators
+            if draw.modifiers is not None:
+                session.last_modified_by = draw.modifiers
+            if draw.application is not None:
+                session.application_name = draw.application
+
+        echo_completed(completed_with_errors, session.written)
+    else:
+        click.echo(click.style(f"File type {file.suffix} is not yet available.", fg="red"))
 
-        random_modifiers_string = None
-        try:
-            random_modifiers_string = privet_smirnovoy_preferences.random_modifiers_string
-        except AttributeError:
-            click.secho('Preference for "last modified by" not found.', fg="red")
-            completed_with_errors = True
-        except ValueError:
-            click.secho('Preference "modifiers number" is invalid. Maybe too big?', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
-            return
 
-        random_application = None
-        try:
-            random_application = privet_smirnovoy_preferences.random_application
-        except AttributeError:
-            click.secho('Preference for "application name" not found. ', fg="red")
-            completed_with_errors = True
-        except preferences.InvalidPreferencesStructureError:
-            click.secho(f'Invalid structure of "{preferences.PREFERENCES_FILEPATH.name}" file.', fg="red")
-            return
-        except FileNotFoundError:
-            click.secho(f'File "{preferences.PREFERENCES_FILEPATH.name}" not found.', fg="red")
-            return
-        except UnicodeDecodeError:
-            click.secho(f'Encoding of "{preferences.PREFERENCES_FILEPATH.name}" must be UTF-8.', fg="red")
+def echo_batch_results(results: Iterable[batch.FileResult], completed_with_errors: bool) -> None:
+    counts = {"success": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    for result in results:
+        counts[result.status] += 1
+        if result.error is not None:
+            click.secho(f"{result.path}: {result.error}", fg="red" if result.status == "failed" else "yellow")
+
+    click.secho(f"Success: {counts['success']}", fg="green")
+    click.secho(f"Unchanged: {counts['unchanged']}", fg="green")
+    click.secho(f"Skipped: {counts['skipped']}", fg="yellow")
+    click.secho(f"Failed: {counts['failed']}", fg="red")
+    if completed_with_errors:
+        click.secho("Completed with errors.", fg="yellow")
+        click.secho(f"Please, check {preferences.PREFERENCES_FILEPATH.name}", fg="yellow")
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+def new_batch(sources: tuple[str, ...], files_from, workers: int | None):
+    """Set all metadata fields of many files to default values set in preferences.yaml"""
+    if (loaded_config := load_new_command_config()) is None:
+        return
+    config, completed_with_errors = loaded_config
+
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+
+    results = batch.map_files(functools.partial(batch.apply_new_command_config, config=config),
+                              batch.collect_files(sources), workers)
+    echo_batch_results(batch.group_commit(results), completed_with_errors)
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+@click.option("--seed", type=int, default=None, help="Seed for reproducible random values, draws depend on file paths")
+def privet_smirnovoy_batch(sources: tuple[str, ...], files_from, workers: int | None, seed: int | None):
+    """Send hello to Smirnova in many files according to preferences in preferences.yaml file"""
+    if (loaded_config := load_privet_smirnovoy_config()) is None:
+        return
+    config, completed_with_errors = loaded_config
+
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+
+    results = batch.map_files(batch.apply_privet_smirnovoy, batch.collect_files(sources), workers,
+                              initializer=batch.load_privet_smirnovoy_sampler,
+                              initializer_arguments=(config, seed))
+    echo_batch_results(batch.group_commit(results), completed_with_errors)
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--output", type=click.File("w", encoding="utf-8"), default="-", help="Plan file (stdout by default)")
+@click.option("--seed", type=int, default=None, help="Seed for reproducible random values")
+@click.option("--even-applications", is_flag=True, help="Assign every application to the same number of files")
+def plan_privet_smirnovoy(sources: tuple[str, ...], files_from, output, seed: int | None, even_applications: bool):
+    """Plan privet_smirnovoy values for many files and write them to a plan file for apply-plan"""
+    if (loaded_config := load_privet_smirnovoy_config()) is None:
+        return
+    config, _ = loaded_config
+
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+
+    paths = list(batch.collect_files(sources))
+    planner.write_plan(output, planner.plan_privet_smirnovoy(paths, config, seed, even_applications))
+
+
+@click.command()
+@click.argument("plan_file", type=click.File("r", encoding="utf-8"))
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+def apply_plan(plan_file, workers: int | None):
+    """Apply a plan file written by plan-privet-smirnovoy"""
+    try:
+        assignments = list(planner.read_plan(plan_file))
+    except ValueError as error:
+        click.secho(str(error), fg="red")
+        return
+    results = batch.map_files(batch.apply_assignment, assignments, workers)
+    echo_batch_results(batch.group_commit(results), False)
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+def compact(sources: tuple[str, ...], files_from, workers: int | None):
+    """Reclaim space left in files edited with METADATA_EDITOR_UPDATE_MODE=append"""
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+
+    results = batch.map_files(batch.compact, batch.collect_files(sources), workers)
+    echo_batch_results(batch.group_commit(results), False)
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=str)  # Files, directories (searched recursively) or glob patterns
+@click.option("--files-from", type=click.File("r", encoding="utf-8"), help="File with one path per line (- for stdin)")
+@click.option("--workers", type=click.IntRange(min=1), default=None, help="Number of worker processes")
+@click.option("--database", type=pathlib.Path, default=metadata_index.DEFAULT_INDEX_FILEPATH, help="Index file")
+@click.option("--prune", is_flag=True, help="Remove indexed files that don't exist anymore")
+def index(sources: tuple[str, ...], files_from, workers: int | None, database: pathlib.Path, prune: bool):
+    """Store metadata of many files in a SQLite index, only new and changed files are read again"""
+    if files_from is not None:
+        sources = itertools.chain(sources, batch.read_file_list(files_from))
+
+    with metadata_index.MetadataIndex(database) as metadata_index_database:
+        refresh = metadata_index_database.refresh(batch.collect_files(sources), workers)
+        removed = metadata_index_database.prune() if prune else 0
+
+    click.secho(f"Indexed: {refresh.indexed}", fg="green")
+    click.secho(f"Unchanged: {refresh.unchanged}", fg="green")
+    if refresh.missing:
+        click.secho(f"Missing: {refresh.missing}", fg="yellow")
+    if prune:
+        click.secho(f"Removed: {removed}", fg="yellow")
+
+
+@click.command()
+@click.option("--database", type=pathlib.Path, default=metadata_index.DEFAULT_INDEX_FILEPATH, help="Index file")
+@click.option("--creator", type=str, default=None)
+@click.option("--last-modified-by", type=str, default=None)
+@click.option("--revision", type=int, default=None)
+@click.option("--application", type=str, default=None)
+@click.option("--format", "output_format", type=click.Choice(("text",) + batch.RECORD_FORMATS), default="text",
+              help="Output format, ndjson/csv/tsv print one record per file")
+def query_index(database: pathlib.Path, creator: str | None, last_modified_by: str | None, revision: int | None,
+                application: str | None, output_format: str):
+    """Find files in the index by their metadata without reading the files"""
+    if database.exists() is False:
+        click.echo(click.style(f"Index {database} was not found, create it with the index command.", fg="red"))
+        return
+
+    conditions = {"creator": creator, "lastModifiedBy": last_modified_by, "revision": revision,
+                  "Application": application}
+    with metadata_index.MetadataIndex(database) as metadata_index_database:
+        records = (entry.as_record() for entry in metadata_index_database.query(
+            **{field: value for field, value in conditions.items() if value is not None}
+        ))
+
+        if output_format != "text":
+            stdout = sys.stdout
+            record_writer = batch.RecordWriter(stdout, output_format)
+            for record in records:
+                record_writer.write(record)
+            stdout.flush()
             return
 
-        word_file_metadata.editing_time = preferences.PRIVET_SMIRNOVOY_EDITING_TIME
-        word_file_metadata.revision = preferences.PRIVET_SMIRNOVOY_REVISION
-        if random_creators_string is not None:
-            word_file_metadata.creator = random_creators_string
-        if random_modifiers_string is not None:
-            word_file_metadata.last_modified_by = random_modifiers_string
-        if random_application is not None:
-            word_file_metadata.application_name = random_application
-
-        if completed_with_errors:
-            click.secho("Completed with errors.", fg="yellow")
-            click.secho("Please, check preferences.yaml", fg="yellow")
-        else:
-            click.secho("Success.", fg="green")
-    else:
-        click.echo(click.style(f"File type {file.suffix} is not yet available.", fg="red"))
+        for record in records:
+            click.secho(f"{record.path}:", fg="cyan")
+            if record.error is not None:
+                click.secho(record.error, fg="red")
+            else:
+                echo_snapshot(record.snapshot)
 
 
 main.add_command(get_metadata)
+main.add_command(get_metadata_batch)
 main.add_command(change_creator)
 main.add_command(change_modifier)
 main.add_command(change_revision)
@@ -325,7 +438,16 @@ main.add_command(change_application)
 main.add_command(change_editing_time)
 main.add_command(new)
 main.add_command(privet_smirnovoy)
+main.add_command(new_batch)
+main.add_command(privet_smirnovoy_batch)
+main.add_command(plan_privet_smirnovoy)
+main.add_command(apply_plan)
+main.add_command(compact)
+main.add_command(index)
+main.add_command(query_index)
 
 
 if __name__ == "__main__":
+    # Batch commands spawn worker processes, a frozen executable has to run them instead of the CLI
+    multiprocessing.freeze_support()
     main()
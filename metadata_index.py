@@ -0,0 +1,193 @@
+import datetime
+import hashlib
+import os
+import pathlib
+import sqlite3
+from typing import NamedTuple, Iterable, Iterator
+
+import batch
+import word
+
+
+# Constants
+DEFAULT_INDEX_FILEPATH = pathlib.Path("metadata_index.sqlite3")
+HASH_CHUNK_SIZE = 1024 * 1024
+# Entries are committed in batches, so an interrupted refresh keeps the files it has already read
+REFRESH_COMMIT_SIZE = 1000
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    sha256 TEXT,
+    creator TEXT,
+    lastModifiedBy TEXT,
+    revision INTEGER,
+    Application TEXT,
+    TotalTime INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_creator ON files (creator);
+CREATE INDEX IF NOT EXISTS files_last_modified_by ON files (lastModifiedBy);
+CREATE INDEX IF NOT EXISTS files_application ON files (Application);
+"""
+ENTRY_FIELDS = ("path", "size", "mtime_ns", "inode", "sha256", "creator", "lastModifiedBy", "revision",
+                "Application", "TotalTime", "error")
+QUERY_FIELDS = ("creator", "lastModifiedBy", "revision", "Application")
+
+
+class StatSignature(NamedTuple):
+    """Files are read again only when one of these is changed"""
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class IndexEntry(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    sha256: str | None
+    creator: str | None
+    lastModifiedBy: str | None
+    revision: int | None
+    Application: str | None
+    TotalTime: int | None
+    error: str | None
+
+    def as_record(self) -> batch.MetadataRecord:
+        snapshot = None
+        if self.error is None:
+            snapshot = word.MetadataSnapshot(self.creator, self.lastModifiedBy, self.revision, self.Application,
+                                             self.TotalTime)
+        mtime = datetime.datetime.fromtimestamp(self.mtime_ns / 1_000_000_000, datetime.timezone.utc)
+        return batch.MetadataRecord(pathlib.Path(self.path), self.size, mtime, snapshot, self.error)
+
+
+class IndexRefresh(NamedTuple):
+    indexed: int
+    unchanged: int
+    missing: int
+
+
+def stat_signature(path: pathlib.Path) -> StatSignature | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return StatSignature(stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+def file_hash(path: pathlib.Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def read_entry(path: pathlib.Path) -> IndexEntry | None:
+    """Index entry of an absolute path or None when the file is missing, used in worker processes"""
+    # The signature is taken first, so a file changed while it is read is read again by the next refresh
+    if (signature := stat_signature(path)) is None:
+        return None
+
+    record = batch.read_metadata(path)
+    snapshot = record.snapshot if record.snapshot is not None else word.MetadataSnapshot(None, None, None, None, None)
+    error = record.error
+    sha256 = None
+    if error is None:
+        try:
+            sha256 = file_hash(path)
+        except OSError as os_error:
+            error = batch.error_message(os_error)
+    return IndexEntry(str(path), *signature, sha256, snapshot.creator, snapshot.last_modified_by, snapshot.revision,
+                      snapshot.application_name, snapshot.editing_time, error)
+
+
+class MetadataIndex:
+    """SQLite database of file metadata, refresh() reads only new files and files with a changed stat signature"""
+    def __signatures(self) -> dict[str, StatSignature]:
+        rows = self.__connection.execute("SELECT path, size, mtime_ns, inode FROM files")
+        return {path: StatSignature(size, mtime_ns, inode) for path, size, mtime_ns, inode in rows}
+
+    def refresh(self, paths: Iterable[pathlib.Path], workers: int | None = None,
+                commit_size: int = REFRESH_COMMIT_SIZE) -> IndexRefresh:
+        signatures = self.__signatures()
+        changed_paths = []
+        unchanged = 0
+        missing = 0
+        for path in paths:
+            path = path.absolute()
+            signature = stat_signature(path)
+            if signature is None:
+                missing += 1
+            elif signatures.get(str(path)) == signature:
+                unchanged += 1
+            else:
+                changed_paths.append(path)
+
+        indexed = 0
+        entries = []
+        for entry in batch.map_files(read_entry, changed_paths, workers):
+            if entry is None:
+                missing += 1
+                continue
+            entries.append(entry)
+            if len(entries) >= commit_size:
+                indexed += self.__insert(entries)
+        indexed += self.__insert(entries)
+        return IndexRefresh(indexed, unchanged, missing)
+
+    def __insert(self, entries: list[IndexEntry]) -> int:
+        """Insert or replace the entries in one transaction, empty the list and return their number"""
+        with self.__connection:
+            self.__connection.executemany(f"INSERT OR REPLACE INTO files ({', '.join(ENTRY_FIELDS)}) "
+                                          f"VALUES ({', '.join('?' * len(ENTRY_FIELDS))})", entries)
+        inserted = len(entries)
+        entries.clear()
+        return inserted
+
+    def prune(self) -> int:
+        """Remove entries of files that don't exist anymore and return their number"""
+        removed_paths = [(path,) for path in self.__signatures() if not os.path.exists(path)]
+        with self.__connection:
+            self.__connection.executemany("DELETE FROM files WHERE path = ?", removed_paths)
+        return len(removed_paths)
+
+    def query(self, **conditions: str | int) -> Iterator[IndexEntry]:
+        """Entries with the given values, e.g. query(lastModifiedBy="admin"), ordered by path"""
+        for field in conditions:
+            if field not in QUERY_FIELDS:
+                raise ValueError(f'Index can\'t be queried by "{field}", fields are {", ".join(QUERY_FIELDS)}')
+        where = " AND ".join(f"{field} = ?" for field in conditions) or "1"
+        cursor = self.__connection.execute(f"SELECT {', '.join(ENTRY_FIELDS)} FROM files WHERE {where} ORDER BY path",
+                                           tuple(conditions.values()))
+        for row in cursor:
+            yield IndexEntry(*row)
+
+    def __len__(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
+
+    def __init__(self, database_path: pathlib.Path = DEFAULT_INDEX_FILEPATH):
+        match database_path:
+            case pathlib.Path():
+                pass
+            case _:
+                raise TypeError(f"MetadataIndex(database_path) database_path should be pathlib.Path "
+                                f"(not {type(database_path)})")
+        self.database_path = database_path
+        self.__connection = sqlite3.connect(database_path)
+        self.__connection.executescript(INDEX_SCHEMA)
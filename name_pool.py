@@ -0,0 +1,115 @@
+import array
+import mmap
+import os
+import pathlib
+import random
+import threading
+from typing import Callable, Sequence
+
+import numpy
+
+
+# Constants
+# Duplicated lines make some drawn indexes useless, after number * this factor tries
+# the remaining names are sampled from the deduplicated pool
+MAX_DRAWS_FACTOR = 32
+
+
+class NamePool(Sequence[str]):
+    """Newline-delimited file of names, memory-mapped and indexed by line offsets
+
+    Only the offsets of non-blank lines are kept in memory, a name is decoded when it is accessed.
+    """
+    def __build_index(self) -> None:
+        position = 0
+        for line in iter(self.__mmap.readline, b""):
+            if line.strip():
+                self.__offsets.append(position)
+            position += len(line)
+
+    def __getitem__(self, index: int) -> str:
+        start = self.__offsets[index]
+        end = self.__mmap.find(b"\n", start)
+        if end == -1:
+            end = len(self.__mmap)
+        return self.__mmap[start:end].decode("utf-8").strip()
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    def __reduce__(self):
+        # Worker processes open the file themselves instead of receiving its names
+        return open_name_pool, (self.filepath,)
+
+    @property
+    def unique_count(self) -> int:
+        """Number of distinct names, counted by their hashes once per pool"""
+        with self.__lock:
+            if self.__unique_count is None:
+                name_hashes = numpy.fromiter((hash(name) for name in self), dtype=numpy.int64, count=len(self))
+                self.__unique_count = len(numpy.unique(name_hashes))
+            return self.__unique_count
+
+    def add_missing_names(self, names: dict[str, None], number: int, randrange: Callable[[int], int]) -> None:
+        """Add random names until there are number distinct names, randrange(n) draws an index below n
+
+        Pools of mostly repeated lines fall back to the deduplicated pool after number * MAX_DRAWS_FACTOR draws.
+        """
+        draws = 0
+        while len(names) < number:
+            if draws >= number * MAX_DRAWS_FACTOR:
+                remaining_names = [name for name in dict.fromkeys(self) if name not in names]
+                if len(remaining_names) < number - len(names):
+                    raise ValueError(f'Name pool "{self.filepath.name}" has less than {number} unique names')
+                while len(names) < number:
+                    names.setdefault(remaining_names.pop(randrange(len(remaining_names))))
+                return
+            names.setdefault(self[randrange(len(self))])
+            draws += 1
+
+    def sample(self, number: int, random_generator: random.Random | None = None) -> list[str]:
+        """number distinct names in random order, O(number) regardless of the pool size"""
+        random_generator = random_generator if random_generator is not None else random.Random()
+        if number > len(self):
+            raise ValueError(f'Name pool "{self.filepath.name}" has less than {number} names')
+
+        names = dict.fromkeys(self[index] for index in random_generator.sample(range(len(self)), number))
+        self.add_missing_names(names, number, random_generator.randrange)
+        return list(names)
+
+    def __init__(self, filepath: pathlib.Path):
+        match filepath:
+            case pathlib.Path():
+                pass
+            case _:
+                raise TypeError(f"NamePool(filepath) filepath should be pathlib.Path (not {type(filepath)})")
+        self.filepath = filepath
+        self.__unique_count = None
+        self.__lock = threading.Lock()
+        self.__offsets = array.array("Q")
+        with open(filepath, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                raise ValueError(f'Name pool "{filepath.name}" is empty')
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__build_index()
+        if not self.__offsets:
+            raise ValueError(f'Name pool "{filepath.name}" is empty')
+
+
+# Opened pools by absolute path, a pool is opened again only when its file is changed
+__name_pools = {}
+__name_pools_lock = threading.Lock()
+
+
+def open_name_pool(filepath: pathlib.Path) -> NamePool:
+    """NamePool of the file, opened once per process while the file stays the same"""
+    stat = os.stat(filepath)
+    stat_key = stat.st_mtime_ns, stat.st_size, stat.st_ino
+    cache_key = os.path.abspath(filepath)
+    with __name_pools_lock:
+        match __name_pools.get(cache_key):
+            case (cached_stat_key, name_pool) if cached_stat_key == stat_key:
+                return name_pool
+        name_pool = NamePool(pathlib.Path(filepath))
+        __name_pools[cache_key] = (stat_key, name_pool)
+        return name_pool
@@ -0,0 +1,120 @@
+import json
+import pathlib
+from typing import NamedTuple, Sequence, Iterable, Iterator
+
+import numpy
+
+import name_pool
+import preferences
+
+
+# Constants
+# Samples much smaller than their pool draw indexes and redraw only the rows with repeated indexes,
+# bigger samples sort random keys in chunks of rows of up to this number of cells (files * names)
+MAX_SORTED_SAMPLING_CELLS = 16 * 1024 * 1024
+MAX_REDRAW_ROUNDS = 64
+
+
+class Assignment(NamedTuple):
+    """Metadata planned for one file, keys are the same as MetadataEditSession keys"""
+    path: str
+    creator: str | None
+    lastModifiedBy: str | None
+    Application: str | None
+    TotalTime: int
+    revision: int
+
+    @property
+    def changes(self) -> dict[str, str | int]:
+        return {key: value for key, value in self._asdict().items() if key != "path" and value is not None}
+
+
+def sample_indexes(generator: numpy.random.Generator, files_number: int, pool_size: int,
+                   number: int) -> numpy.ndarray:
+    """files_number rows of number distinct indexes below pool_size"""
+    if number > pool_size:
+        raise ValueError(f"Can't sample {number} distinct names from {pool_size} names")
+    # A row of number draws has no repeated index with probability about exp(-number² / 2 pool_size),
+    # so redrawing converges in a few rounds only while number² <= pool_size
+    if number * number <= pool_size:
+        indexes = generator.integers(0, pool_size, size=(files_number, number))
+        for _ in range(MAX_REDRAW_ROUNDS):
+            sorted_indexes = numpy.sort(indexes, axis=1)
+            repeated_rows = numpy.flatnonzero((sorted_indexes[:, 1:] == sorted_indexes[:, :-1]).any(axis=1))
+            if repeated_rows.size == 0:
+                return indexes
+            indexes[repeated_rows] = generator.integers(0, pool_size, size=(repeated_rows.size, number))
+        raise ValueError(f"Can't sample {number} distinct names from {pool_size} names")
+
+    indexes = numpy.empty((files_number, number), dtype=numpy.intp)
+    chunk_rows = max(1, MAX_SORTED_SAMPLING_CELLS // pool_size)
+    for start in range(0, files_number, chunk_rows):
+        rows = min(chunk_rows, files_number - start)
+        indexes[start:start + rows] = numpy.argsort(generator.random((rows, pool_size)), axis=1)[:, :number]
+    return indexes
+
+
+def __sample_names(generator: numpy.random.Generator, names: Sequence[str], files_number: int,
+                   number: int) -> list[str]:
+    """files_number "; "-joined samples of number distinct names
+
+    Lines of a NamePool aren't loaded to be deduplicated, a repeated name is replaced by a new draw instead.
+    """
+    if not isinstance(names, name_pool.NamePool):
+        names = tuple(dict.fromkeys(names))
+        return ["; ".join(names[index] for index in row)
+                for row in sample_indexes(generator, files_number, len(names), number).tolist()]
+
+    samples = []
+    for row in sample_indexes(generator, files_number, len(names), number).tolist():
+        row_names = dict.fromkeys(names[index] for index in row)
+        names.add_missing_names(row_names, number, lambda bound: int(generator.integers(0, bound)))
+        samples.append("; ".join(row_names))
+    return samples
+
+
+def plan_privet_smirnovoy(paths: Sequence[pathlib.Path], config: preferences.PrivetSmirnovoyConfig,
+                          seed: int | None = None, even_applications: bool = False) -> list[Assignment]:
+    """Draw privet_smirnovoy values for every file at once
+
+    With even_applications every application is assigned to the same number of files (±1).
+    """
+    generator = numpy.random.default_rng(seed)
+    files_number = len(paths)
+
+    creators = [None] * files_number
+    if config.creators is not None and config.creators_number is not None:
+        creators = __sample_names(generator, config.creators, files_number, config.creators_number)
+    modifiers = [None] * files_number
+    if config.modifiers is not None and config.modifiers_number is not None:
+        modifiers = __sample_names(generator, config.modifiers, files_number, config.modifiers_number)
+    applications = [None] * files_number
+    if config.applications is not None:
+        if even_applications:
+            application_indexes = generator.permutation(numpy.resize(numpy.arange(len(config.applications)),
+                                                                     files_number))
+        else:
+            application_indexes = generator.integers(0, len(config.applications), size=files_number)
+        applications = [config.applications[index] for index in application_indexes.tolist()]
+
+    return [
+        Assignment(str(path), creator, modifier, application,
+                   preferences.PRIVET_SMIRNOVOY_EDITING_TIME, preferences.PRIVET_SMIRNOVOY_REVISION)
+        for path, creator, modifier, application in zip(paths, creators, modifiers, applications)
+    ]
+
+
+def write_plan(plan_file, assignments: Iterable[Assignment]) -> None:
+    """Write assignments as NDJSON, one file per line"""
+    for assignment in assignments:
+        plan_file.write(json.dumps(assignment._asdict(), ensure_ascii=False) + "\n")
+
+
+def read_plan(plan_file) -> Iterator[Assignment]:
+    for line_number, line in enumerate(plan_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield Assignment(**json.loads(line))
+        except (json.JSONDecodeError, TypeError) as error:
+            raise ValueError(f"Invalid plan line {line_number}: {error}")
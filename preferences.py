@@ -1,7 +1,11 @@
+import os
 import pathlib
 import random
+import threading
+from typing import NamedTuple, Sequence
 import yaml
-from numpy import unique
+
+import name_pool
 
 
 # Constants
@@ -25,123 +29,124 @@ class InvalidPreferencesStructureError(Exception):
     pass
 
 
-class NewCommandPreferences:
-    def __dump(self):
-        with open(self.__preferences_filepath, "w", encoding="utf-8") as yaml_file:
-            yaml_file.write(yaml.safe_dump(self.__preferences))
-
-    @property
-    def __preferences(self) -> dict:
-        with open(self.__preferences_filepath, "r", encoding="utf-8") as yaml_file:
-            try:
-                preferences_dict = yaml.safe_load(yaml_file)
-            except yaml.YAMLError:
-                raise InvalidPreferencesStructureError
-        return preferences_dict
+def unique_names_number(names: Sequence[str]) -> int:
+    """Number of unique names, the same number NamePool.sample() can draw"""
+    if isinstance(names, name_pool.NamePool):
+        return names.unique_count
+    return len(set(names))
+
+
+def sample_names(names: Sequence[str], number: int) -> list[str]:
+    """number distinct names in random order, duplicates in names are dropped first"""
+    if isinstance(names, name_pool.NamePool):
+        return names.sample(number)
+    unique_names = tuple(dict.fromkeys(names))
+    if number > len(unique_names):
+        raise ValueError("Invalid preferences value")
+    return random.sample(unique_names, number)
+
+
+class PreferencesCache:
+    """Process-wide cache of parsed preferences files
+
+    A file is parsed again only when its mtime, size or inode changes.
+    """
+    @staticmethod
+    def __stat_key(preferences_filepath: pathlib.Path) -> tuple[int, int, int]:
+        stat = os.stat(preferences_filepath)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def load(self, preferences_filepath: pathlib.Path) -> dict:
+        """Parsed preferences file, the result is shared and must not be changed"""
+        cache_key = os.path.abspath(preferences_filepath)
+        stat_key = self.__stat_key(preferences_filepath)
+        with self.__lock:
+            match self.__entries.get(cache_key):
+                case (cached_stat_key, InvalidPreferencesStructureError()) if cached_stat_key == stat_key:
+                    raise InvalidPreferencesStructureError
+                case (cached_stat_key, preferences_dict) if cached_stat_key == stat_key:
+                    return preferences_dict
+
+            with open(preferences_filepath, "r", encoding="utf-8") as yaml_file:
+                try:
+                    preferences_dict = yaml.safe_load(yaml_file)
+                except yaml.YAMLError:
+                    self.__entries[cache_key] = (stat_key, InvalidPreferencesStructureError())
+                    raise InvalidPreferencesStructureError
+            self.__entries[cache_key] = (stat_key, preferences_dict)
+            return preferences_dict
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def __init__(self):
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+
+preferences_cache = PreferencesCache()
+
+
+class PreferencesSection:
+    """View of one section of validate_preferences(), a missing or invalid preference raises AttributeError"""
+    section_name = None
+
+    def _value(self, field: str):
+        validation = validate_preferences(self.preferences_filepath)
+        key = field.replace("_", " ")
+        for problem in validation.section_problems(self.section_name):
+            if problem.key in (None, key):
+                raise AttributeError(problem.message)
+        return getattr(getattr(validation.config, self.section_name), field)
 
     @property
     def valid(self) -> bool:
-        _ = self.application
-        _ = self.creator
-        _ = self.last_modified_by
-        _ = self.editing_time
-        _ = self.revision
-
+        """True for a valid section, AttributeError with the first problem otherwise"""
+        validation = validate_preferences(self.preferences_filepath)
+        for problem in validation.section_problems(self.section_name):
+            raise AttributeError(problem.message)
         return True
 
+    def __init__(self, preferences_filepath: pathlib.Path = PREFERENCES_FILEPATH):
+        self.preferences_filepath = preferences_filepath
+
+
+class NewCommandPreferences(PreferencesSection):
+    section_name = "new"
+
     @property
     def application(self) -> str:
-        try:
-            return self.__preferences["new"]["application"]
-        except KeyError:
-            raise AttributeError("Preference application not found")
-        except TypeError:
-            raise AttributeError('Preferences section "new" is invalid')
+        return self._value("application")
 
     @property
     def creator(self) -> str:
-        try:
-            return self.__preferences["new"]["creator"]
-        except KeyError:
-            raise AttributeError("Preference creator not found")
-        except TypeError:
-            raise AttributeError('Preferences section "new" is invalid')
+        return self._value("creator")
 
     @property
     def last_modified_by(self) -> str:
-        try:
-            return self.__preferences["new"]["last modified by"]
-        except KeyError:
-            raise AttributeError("Preference last modified by not found")
-        except TypeError:
-            raise AttributeError('Preferences section "new" is invalid')
+        return self._value("last_modified_by")
 
     @property
     def editing_time(self) -> int:
-        try:
-            if (value := str(self.__preferences["new"]["editing time"])).isdigit():
-                if len(str(int(value))) < 10:
-                    return int(value)
-                else:
-                    raise ValueError("Editing time value should consist of less than 10 digits")
-            else:
-                raise ValueError("Editing time value must be integer")
-        except KeyError:
-            raise AttributeError("Preference editing time not found")
-        except TypeError:
-            raise AttributeError('Preferences section "new" is invalid')
+        return self._value("editing_time")
 
     @property
     def revision(self) -> int:
-        try:
-            if (value := str(self.__preferences["new"]["revision"])).isdigit():
-                return int(value)
-            else:
-                raise ValueError('Revision value must be integer')
-        except KeyError:
-            raise AttributeError("Preference revision not found")
-        except TypeError:
-            raise AttributeError('Preferences section "new" is invalid')
+        return self._value("revision")
 
-    def __init__(self, preferences_filepath: pathlib.Path = PREFERENCES_FILEPATH):
-        self.__preferences_filepath = preferences_filepath
 
+class PrivetSmirnovoyPreference(PreferencesSection):
+    section_name = "privet_smirnovoy"
 
-class PrivetSmirnovoyPreference:
-    @property
-    def __preferences(self) -> dict:
-        with open(self.__preferences_filepath, "r", encoding="utf-8") as yaml_file:
-            try:
-                preferences_dict = yaml.safe_load(yaml_file)
-            except yaml.YAMLError:
-                raise InvalidPreferencesStructureError
-        return preferences_dict
-
-    @property
-    def valid(self) -> bool:
-        _ = self.applications
-        _ = self.random_application
-        _ = self.creators
-        _ = self.random_creator
-        _ = self.random_creators_list
-        _ = self.random_creators_string
-        _ = self.modifiers
-        _ = self.random_modifier
-        _ = self.random_modifiers_list
-        _ = self.random_modifiers_string
-        _ = self.creators_number
-        _ = self.modifiers_number
-
-        return True
+    def _value(self, field: str):
+        value = super()._value(field)
+        # Inline name lists are lists like in the preferences file, name pool files are NamePool
+        return list(value) if isinstance(value, tuple) else value
 
     @property
     def applications(self) -> list:
-        try:
-            return self.__preferences["privet_smirnovoy"]["applications"]
-        except KeyError:
-            raise AttributeError("Preference applications not found")
-        except TypeError:
-            raise AttributeError('Preferences section "privet_smirnovoy" is invalid')
+        return self._value("applications")
 
     @property
     def random_application(self) -> str:
@@ -149,12 +154,7 @@ class PrivetSmirnovoyPreference:
 
     @property
     def creators(self) -> list:
-        try:
-            return self.__preferences["privet_smirnovoy"]["creators"]
-        except KeyError:
-            raise AttributeError("Preference creators not found")
-        except TypeError:
-            raise AttributeError('Preferences section "privet_smirnovoy" is invalid')
+        return self._value("creators")
 
     @property
     def random_creator(self) -> str:
@@ -162,37 +162,15 @@ class PrivetSmirnovoyPreference:
 
     @property
     def random_creators_list(self) -> list:
-        unique_creators = list(unique(self.creators))
-        if len(unique_creators) > self.creators_number:
-            result = []
-            for _ in range(self.creators_number):
-                random_creator = random.choice(unique_creators)
-                result.append(random_creator)
-                unique_creators.remove(random_creator)
-            return result
-        elif len(unique_creators) == self.creators_number:
-            return self.creators
-        else:
-            raise ValueError("Invalid preferences value")
+        return sample_names(self.creators, self.creators_number)
 
     @property
-    def random_creators_string(self):
-        creators_string = ""
-        random_creators_list = self.random_creators_list
-        for index, creator in enumerate(random_creators_list):
-            creators_string += creator
-            if index != len(random_creators_list) - 1:
-                creators_string += "; "
-        return creators_string
+    def random_creators_string(self) -> str:
+        return "; ".join(self.random_creators_list)
 
     @property
     def modifiers(self) -> list:
-        try:
-            return self.__preferences["privet_smirnovoy"]["modifiers"]
-        except KeyError:
-            raise AttributeError("Preference modifiers not found")
-        except TypeError:
-            raise AttributeError('Preferences section "privet_smirnovoy" is invalid')
+        return self._value("modifiers")
 
     @property
     def random_modifier(self) -> str:
@@ -200,49 +178,19 @@ class PrivetSmirnovoyPreference:
 
     @property
     def random_modifiers_list(self) -> list:
-        unique_modifiers = list(unique(self.modifiers))
-        if len(unique_modifiers) > self.modifiers_number:
-            result = []
-            for _ in range(self.modifiers_number):
-                random_modifiers = random.choice(unique_modifiers)
-                result.append(random_modifiers)
-                unique_modifiers.remove(random_modifiers)
-            return result
-        elif len(unique_modifiers) == self.modifiers_number:
-            return self.modifiers
-        else:
-            raise ValueError("Invalid preferences value")
+        return sample_names(self.modifiers, self.modifiers_number)
 
     @property
     def random_modifiers_string(self) -> str:
-        modifiers_string = ""
-        random_modifiers_list = self.random_modifiers_list
-        for index, modifier in enumerate(random_modifiers_list):
-            modifiers_string += modifier
-            if index != len(random_modifiers_list) - 1:
-                modifiers_string += "; "
-        return modifiers_string
+        return "; ".join(self.random_modifiers_list)
 
     @property
     def creators_number(self) -> int:
-        try:
-            return self.__preferences["privet_smirnovoy"]["creators number"]
-        except KeyError:
-            raise AttributeError("Preference creators number not found")
-        except TypeError:
-            raise AttributeError('Preferences section "privet_smirnovoy" is invalid')
+        return self._value("creators_number")
 
     @property
     def modifiers_number(self) -> int:
-        try:
-            return self.__preferences["privet_smirnovoy"]["modifiers number"]
-        except KeyError:
-            raise AttributeError("Preference modifiers number not found")
-        except TypeError:
-            raise AttributeError('Preferences section "privet_smirnovoy" is invalid')
-    
-    def __init__(self, preferences_filepath: pathlib.Path = PREFERENCES_FILEPATH):
-        self.__preferences_filepath = preferences_filepath
+        return self._value("modifiers_number")
 
 
 class Preferences:
@@ -261,3 +209,252 @@ class Preferences:
     def __init__(self, preferences_filepath: pathlib.Path = PREFERENCES_FILEPATH):
         self.__new_command_preferences = NewCommandPreferences(preferences_filepath)
         self.__privet_smirnovoy_preferences = PrivetSmirnovoyPreference(preferences_filepath)
+
+
+class NewCommandConfig(NamedTuple):
+    creator: str | None
+    last_modified_by: str | None
+    application: str | None
+    editing_time: int | None
+    revision: int | None
+
+    def with_defaults(self):
+        """Config where every missing preference is replaced with its default value"""
+        return NewCommandConfig(*(default if value is None else value
+                                  for value, default in zip(self, DEFAULT_NEW_COMMAND_CONFIG)))
+
+
+DEFAULT_NEW_COMMAND_CONFIG = NewCommandConfig(
+    creator=DEFAULT_WORD_CREATOR,
+    last_modified_by=DEFAULT_WORD_LAST_MODIFIED_BY,
+    application=DEFAULT_WORD_APPLICATION_NAME,
+    editing_time=DEFAULT_WORD_EDITING_TIME,
+    revision=DEFAULT_WORD_REVISION
+)
+
+
+class PrivetSmirnovoyConfig(NamedTuple):
+    applications: tuple[str, ...] | name_pool.NamePool | None
+    creators: tuple[str, ...] | name_pool.NamePool | None
+    modifiers: tuple[str, ...] | name_pool.NamePool | None
+    creators_number: int | None
+    modifiers_number: int | None
+
+
+class PreferencesConfig(NamedTuple):
+    new: NewCommandConfig
+    privet_smirnovoy: PrivetSmirnovoyConfig
+
+
+class PreferencesProblem(NamedTuple):
+    section: str | None  # None for problems of the whole file
+    key: str | None  # None for problems of the whole section
+    message: str
+
+
+class PreferencesValidation(NamedTuple):
+    """Config with None in place of every missing or invalid preference and all found problems"""
+    config: PreferencesConfig
+    problems: tuple[PreferencesProblem, ...]
+
+    @property
+    def file_problem(self) -> PreferencesProblem | None:
+        for problem in self.problems:
+            if problem.section is None:
+                return problem
+        return None
+
+    def section_problems(self, section: str) -> tuple[PreferencesProblem, ...]:
+        return tuple(problem for problem in self.problems if problem.section in (None, section))
+
+    def section_valid(self, section: str) -> bool:
+        return not self.section_problems(section)
+
+
+def __text(value) -> str:
+    match value:
+        case str():
+            return value
+        case bool():
+            raise ValueError("must be text")
+        case int() | float():
+            return str(value)
+        case _:
+            raise ValueError("must be text")
+
+
+def __digits(value, max_digits: int | None = None) -> int:
+    if not (text := str(value)).isdigit():
+        raise ValueError("must be integer")
+    if max_digits is not None and len(str(int(text))) > max_digits:
+        raise ValueError(f"should consist of less than {max_digits + 1} digits")
+    return int(text)
+
+
+def __editing_time(value) -> int:
+    return __digits(value, max_digits=9)
+
+
+def __names(value) -> tuple[str, ...] | name_pool.NamePool:
+    match value:
+        case [*names] if names and all(isinstance(name, str) for name in names):
+            return tuple(names)
+        case {"file": str(filepath)}:
+            try:
+                return name_pool.open_name_pool(pathlib.Path(filepath))
+            except OSError:
+                raise ValueError(f'file "{filepath}" can\'t be read')
+            except ValueError as error:
+                raise ValueError(f"is invalid: {error}")
+        case _:
+            raise ValueError("must be a non-empty list of text values or {file: path to names file}")
+
+
+def __number(value) -> int:
+    match value:
+        case bool():
+            raise ValueError("must be integer")
+        case int() if value >= 0:
+            return value
+        case _:
+            raise ValueError("must be non-negative integer")
+
+
+# Section name: (config type, (preference key, validator) for every config field in its order)
+PREFERENCES_SCHEMA = {
+    "new": (NewCommandConfig, (
+        ("creator", __text),
+        ("last modified by", __text),
+        ("application", __text),
+        ("editing time", __editing_time),
+        ("revision", __digits)
+    )),
+    "privet_smirnovoy": (PrivetSmirnovoyConfig, (
+        ("applications", __names),
+        ("creators", __names),
+        ("modifiers", __names),
+        ("creators number", __number),
+        ("modifiers number", __number)
+    ))
+}
+# Number of names to sample: names pool it is sampled from
+PRIVET_SMIRNOVOY_NUMBER_POOLS = (("creators_number", "creators"), ("modifiers_number", "modifiers"))
+
+
+def __file_problem_validation(message: str) -> PreferencesValidation:
+    config = PreferencesConfig(*(config_type(*(None for _ in fields))
+                                 for config_type, fields in PREFERENCES_SCHEMA.values()))
+    return PreferencesValidation(config, (PreferencesProblem(None, None, message),))
+
+
+def validate_preferences(preferences_filepath: pathlib.Path = PREFERENCES_FILEPATH) -> PreferencesValidation:
+    """Validate every section of preferences file in one pass over the parsed document"""
+    try:
+        document = preferences_cache.load(preferences_filepath)
+    except InvalidPreferencesStructureError:
+        return __file_problem_validation(f'Invalid structure of "{preferences_filepath.name}" file.')
+    except FileNotFoundError:
+        return __file_problem_validation(f'File "{preferences_filepath.name}" not found.')
+    except UnicodeDecodeError:
+        return __file_problem_validation(f'Encoding of "{preferences_filepath.name}" must be UTF-8.')
+    except OSError as error:
+        # Validation runs on the FileWatcher thread, an unreadable file mustn't stop the watcher
+        return __file_problem_validation(f'File "{preferences_filepath.name}" can\'t be read: '
+                                         f'{error.strerror or error}.')
+    if not isinstance(document, dict):
+        return __file_problem_validation(f'Invalid structure of "{preferences_filepath.name}" file.')
+
+    problems = []
+    sections = {}
+    for section_name, (config_type, fields) in PREFERENCES_SCHEMA.items():
+        values = [None] * len(fields)
+        match document.get(section_name):
+            case dict() as section:
+                for index, (key, validator) in enumerate(fields):
+                    if key not in section:
+                        problems.append(PreferencesProblem(section_name, key, f'Preference "{key}" not found'))
+                        continue
+                    try:
+                        values[index] = validator(section[key])
+                    except ValueError as error:
+                        problems.append(PreferencesProblem(section_name, key, f'Preference "{key}" {error}'))
+            case None:
+                problems.append(PreferencesProblem(section_name, None,
+                                                   f'Preferences section "{section_name}" not found'))
+            case _:
+                problems.append(PreferencesProblem(section_name, None,
+                                                   f'Preferences section "{section_name}" is invalid'))
+        sections[section_name] = config_type(*values)
+
+    privet_smirnovoy = sections["privet_smirnovoy"]
+    for number_field, pool_field in PRIVET_SMIRNOVOY_NUMBER_POOLS:
+        number, pool = getattr(privet_smirnovoy, number_field), getattr(privet_smirnovoy, pool_field)
+        if number is not None and pool is not None and number > unique_names_number(pool):
+            key = number_field.replace("_", " ")
+            problems.append(PreferencesProblem("privet_smirnovoy", key,
+                                               f'Preference "{key}" is bigger than the number of unique {pool_field}'))
+            privet_smirnovoy = privet_smirnovoy._replace(**{number_field: None})
+    sections["privet_smirnovoy"] = privet_smirnovoy
+
+    return PreferencesValidation(PreferencesConfig(**sections), tuple(problems))
+
+
+class PrivetSmirnovoyDraw(NamedTuple):
+    creators: str | None
+    modifiers: str | None
+    application: str | None
+
+
+class PrivetSmirnovoySampler:
+    """Draws random creators, modifiers and application for privet_smirnovoy from a validated config
+
+    Name pools are deduplicated once, so every draw samples k distinct names in O(k) instead of O(n).
+    With a seed, draws with the same key (e.g. a file path) are the same in every run and every process.
+    Values missing in config are drawn as None.
+    """
+    @staticmethod
+    def __unique(names: Sequence[str] | None) -> Sequence[str] | None:
+        # Name pool files are sampled by line indexes, they are not loaded to be deduplicated
+        if names is None or isinstance(names, name_pool.NamePool):
+            return names
+        return tuple(dict.fromkeys(names))
+
+    @staticmethod
+    def __sample(names: Sequence[str], number: int, random_generator: random.Random) -> list[str]:
+        if isinstance(names, name_pool.NamePool):
+            return names.sample(number, random_generator)
+        return random_generator.sample(names, number)
+
+    def __random_generator(self, key: str | None) -> random.Random:
+        if self.seed is None or key is None:
+            return self.__random
+        return random.Random(f"{self.seed}:{key}")
+
+    def draw(self, key: str | None = None) -> PrivetSmirnovoyDraw:
+        random_generator = self.__random_generator(key)
+
+        creators = None
+        if self.__creators is not None and self.__creators_number is not None:
+            creators = "; ".join(self.__sample(self.__creators, self.__creators_number, random_generator))
+        modifiers = None
+        if self.__modifiers is not None and self.__modifiers_number is not None:
+            modifiers = "; ".join(self.__sample(self.__modifiers, self.__modifiers_number, random_generator))
+        application = None
+        if self.__applications is not None:
+            application = random_generator.choice(self.__applications)
+        return PrivetSmirnovoyDraw(creators, modifiers, application)
+
+    def __init__(self, config: PrivetSmirnovoyConfig, seed: int | None = None):
+        match config, seed:
+            case PrivetSmirnovoyConfig(), int() | None:
+                pass
+            case _:
+                raise TypeError("PrivetSmirnovoySampler(config, seed) expects config as PrivetSmirnovoyConfig and "
+                                f"seed as int or None (not {type(config)}, {type(seed)})")
+        self.seed = seed
+        self.__random = random.Random(seed)
+        self.__creators = self.__unique(config.creators)
+        self.__modifiers = self.__unique(config.modifiers)
+        self.__applications = config.applications
+        self.__creators_number = config.creators_number
+        self.__modifiers_number = config.modifiers_number
@@ -4,10 +4,16 @@ import zipfile
 import pathlib
 import os
 import shutil
+import tempfile
 from typing import NamedTuple, Literal
 import xml.dom.minidom
+from xml.sax.saxutils import quoteattr
 import pytz
 
+import xml_patch
+import xml_stream
+import zip_package
+
 
 __word_file_suffixes = [".docx"]
 
@@ -15,7 +21,41 @@ __word_file_suffixes = [".docx"]
 DEFAULT_WORD_CORE_XML_FILEPATH = pathlib.Path(__file__).resolve().with_name("default_word_core.xml")
 DEFAULT_WORD_APP_XML_FILEPATH = pathlib.Path(__file__).resolve().with_name("default_word_app.xml")
 
+CORE_XML_PART_NAME = "docProps/core.xml"
+APP_XML_PART_NAME = "docProps/app.xml"
+CONTENT_TYPES_XML_PART_NAME = "[Content_Types].xml"
+RELS_XML_PART_NAME = "_rels/.rels"
+
+# Rewritten packages are staged next to the original file and replace it atomically
+STAGED_FILE_SUFFIX = ".metadata_editor.tmp"
+# "none" leaves flushing to the OS, "fsync" syncs every commit, "group" syncs staged packages before they replace
+# the original and leaves syncing their folders (and files updated in place) to a DurabilityGroup
+DURABILITY_ENVIRONMENT_VARIABLE = "METADATA_EDITOR_DURABILITY"
+DURABILITY_MODES = ("none", "fsync", "group")
+# "rewrite" copies the whole package on every commit, "append" adds only the changed parts to its end,
+# "padded" overwrites padded uncompressed core.xml and app.xml in place (rewriting once to pad them)
+UPDATE_MODE_ENVIRONMENT_VARIABLE = "METADATA_EDITOR_UPDATE_MODE"
+UPDATE_MODES = ("rewrite", "append", "padded")
+
 W3CDTF_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+CORE_PROPERTIES_NAMESPACES = {
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "cp": "http://schemas.openxmlformats.org/package/2006/metadata/core-properties",
+    "dcterms": "http://purl.org/dc/terms/"
+}
+EXTENDED_PROPERTIES_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/extended-properties"
+CORE_TAGS_SUBSEQUENCE = (
+    "title", "subject", "creator", "keywords", "description",
+    "lastModifiedBy", "revision", "created", "modified"
+)
+APP_TAGS_SUBSEQUENCE = (
+    "Template", "TotalTime", "Pages", "Words", "Characters",
+    "Application", "DocSecurity", "Lines", "Paragraphs",
+    "ScaleCrop", "Company", "LinksUpToDate", "CharactersWithSpaces",
+    "SharedDoc", "HyperlinksChanged", "AppVersion"
+)
+APP_READ_TAGS = ("TotalTime", "Application")
+
 RE_W3CDTF = "(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(.(\d{2}))?Z?"
 
 
@@ -50,6 +90,15 @@ class WordProperty(NamedTuple):
     property_value: str | None = None
 
 
+class MetadataSnapshot(NamedTuple):
+    """All known core and app properties of a word file read at once"""
+    creator: str | None
+    last_modified_by: str | None
+    revision: int | None
+    application_name: str | None
+    editing_time: int | None
+
+
 def is_word_file(filepath: pathlib.Path) -> bool:
     if filepath.suffix in __word_file_suffixes:
         if zipfile.is_zipfile(filepath):
@@ -62,101 +111,134 @@ class PropertyNotFoundError(Exception):
 
 
 class WordRelsXml:
-    """Class to work with .rels file"""
-    def add_information_about_core(self):
-        domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-        core_file = domtree.documentElement
-
-        new_property = domtree.createElement("Relationship")
-        new_property.setAttribute("Id", "rId2")
-        new_property.setAttribute(
-            "Type", "http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties"
-        )
-        new_property.setAttribute("Target", "docProps/core.xml")
-
-        core_file.appendChild(new_property)
+    """Class to work with .rels file or in-memory .rels data"""
+    def __read(self) -> bytes:
+        if self.xml_data is not None:
+            return self.xml_data
+        return self.xml_file_path.read_bytes()
+
+    def __write(self, xml_data: bytes) -> None:
+        if self.xml_data is not None:
+            self.xml_data = xml_data
+        else:
+            self.xml_file_path.write_bytes(xml_data)
 
-        with open(self.xml_file_path, "w", encoding='utf-8') as file:
-            domtree.writexml(file, encoding='utf-8')
+    def __add_relationship(self, preferred_id: str, relationship_type: str, target: str) -> None:
+        patcher = xml_patch.XmlPatcher(self.__read())
+        used_ids = {span.attributes.get("Id") for _, span in patcher.children}
 
-    def add_information_about_app(self):
-        domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-        core_file = domtree.documentElement
+        relationship_id = preferred_id
+        index = 1
+        while relationship_id in used_ids:
+            relationship_id = f"rId{index}"
+            index += 1
 
-        new_property = domtree.createElement("Relationship")
-        new_property.setAttribute("Id", "rId3")
-        new_property.setAttribute("Type", "http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties")
-        new_property.setAttribute("Target", "docProps/app.xml")
+        patcher.append_child(f"<Relationship Id={quoteattr(relationship_id)} Type={quoteattr(relationship_type)} "
+                             f"Target={quoteattr(target)}/>")
+        self.__write(patcher.patch())
 
-        core_file.appendChild(new_property)
+    def add_information_about_core(self):
+        self.__add_relationship(
+            "rId2", "http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties",
+            "docProps/core.xml"
+        )
 
-        with open(self.xml_file_path, "w", encoding='utf-8') as file:
-            domtree.writexml(file, encoding='utf-8')
+    def add_information_about_app(self):
+        self.__add_relationship(
+            "rId3", "http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties",
+            "docProps/app.xml"
+        )
 
-    def __init__(self, xml_file_path: pathlib.Path):
-        match xml_file_path:
-            case pathlib.Path():
-                self.xml_file_path = xml_file_path
+    def __init__(self, xml_file_path: pathlib.Path | None = None, xml_data: bytes | None = None):
+        match xml_file_path, xml_data:
+            case pathlib.Path(), None:
+                pass
+            case None, bytes():
+                pass
             case _:
-                raise TypeError("WordRelsXml(xml_file_path) xml_file_path should be pathlib.Path"
-                                f'(not {type(xml_file_path)})')
+                raise TypeError("WordRelsXml(xml_file_path, xml_data) expects either xml_file_path as pathlib.Path "
+                                f"or xml_data as bytes (not {type(xml_file_path)}, {type(xml_data)})")
+        self.xml_file_path = xml_file_path
+        self.xml_data = xml_data
 
 
 class WordContentTypesXml:
-    """Class to work with [Content_Types].xml file"""
-    def add_information_about_core(self):
-        domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-        core_file = domtree.documentElement
+    """Class to work with [Content_Types].xml file or in-memory [Content_Types].xml data"""
+    def __read(self) -> bytes:
+        if self.xml_data is not None:
+            return self.xml_data
+        return self.xml_file_path.read_bytes()
+
+    def __write(self, xml_data: bytes) -> None:
+        if self.xml_data is not None:
+            self.xml_data = xml_data
+        else:
+            self.xml_file_path.write_bytes(xml_data)
 
-        new_property = domtree.createElement("Override")
-        new_property.setAttribute("PartName", "/docProps/core.xml")
-        new_property.setAttribute("ContentType", "application/vnd.openxmlformats-package.core-properties+xml")
+    def __add_override(self, part_name: str, content_type: str) -> None:
+        patcher = xml_patch.XmlPatcher(self.__read())
+        if any(span.attributes.get("PartName") == part_name for _, span in patcher.children):
+            return
 
-        core_file.appendChild(new_property)
+        patcher.append_child(f"<Override PartName={quoteattr(part_name)} ContentType={quoteattr(content_type)}/>")
+        self.__write(patcher.patch())
 
-        with open(self.xml_file_path, "w", encoding='utf-8') as file:
-            domtree.writexml(file, encoding='utf-8')
+    def add_information_about_core(self):
+        self.__add_override("/docProps/core.xml", "application/vnd.openxmlformats-package.core-properties+xml")
 
     def add_information_about_app(self):
-        domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-        core_file = domtree.documentElement
-
-        new_property = domtree.createElement("Override")
-        new_property.setAttribute("PartName", "/docProps/app.xml")
-        new_property.setAttribute("ContentType", "application/vnd.openxmlformats-officedocument.extended-properties+xml")
-
-        core_file.appendChild(new_property)
-
-        with open(self.xml_file_path, "w", encoding='utf-8') as file:
-            domtree.writexml(file, encoding='utf-8')
+        self.__add_override(
+            "/docProps/app.xml", "application/vnd.openxmlformats-officedocument.extended-properties+xml"
+        )
 
-    def __init__(self, xml_file_path: pathlib.Path):
-        match xml_file_path:
-            case pathlib.Path():
-                self.xml_file_path = xml_file_path
+    def __init__(self, xml_file_path: pathlib.Path | None = None, xml_data: bytes | None = None):
+        match xml_file_path, xml_data:
+            case pathlib.Path(), None:
+                pass
+            case None, bytes():
+                pass
             case _:
-                raise TypeError("WordContentTypesXml(xml_file_path) xml_file_path should be pathlib.Path"
-                                f'(not {type(xml_file_path)})')
+                raise TypeError("WordContentTypesXml(xml_file_path, xml_data) expects either xml_file_path as "
+                                f"pathlib.Path or xml_data as bytes (not {type(xml_file_path)}, {type(xml_data)})")
+        self.xml_file_path = xml_file_path
+        self.xml_data = xml_data
 
 
 class WordCoreXml:
-    """Class to work with core.xml file"""
-    def __recover_namespaces(self) -> None:
-        domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-        core_file = domtree.documentElement
-        namespaces = {
-            "xmlns:cp": "http://schemas.openxmlformats.org/package/2006/metadata/core-properties",
-            "xmlns:dc": "http://purl.org/dc/elements/1.1/",
-            "xmlns:dcterms": "http://purl.org/dc/terms/",
-            "xmlns:dcmitype": "http://purl.org/dc/dcmitype/",
-            "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance"
-        }
+    """Class to work with core.xml file or in-memory core.xml data
+
+    Reads are streamed with expat. Changes are kept until flush(), which patches only the text of changed
+    elements, so every other byte of the part stays as it is.
+    """
+    def __reader_source(self) -> tuple[pathlib.Path | None, bytes | None]:
+        if self.xml_data is not None:
+            return None, self.xml_data
+        if self.xml_file_path.exists():
+            return self.xml_file_path, None
+        return DEFAULT_WORD_CORE_XML_FILEPATH, None
 
-        for namespace, uri in namespaces.items():
-            core_file.setAttribute(namespace, uri)
+    @property
+    def __domtree(self) -> xml.dom.minidom.Document:
+        if self.__parsed_domtree is None:
+            match self.__reader_source():
+                case None, bytes() as xml_data:
+                    self.__parsed_domtree = xml.dom.minidom.parseString(xml_data)
+                case pathlib.Path() as xml_file_path, None:
+                    self.__parsed_domtree = xml.dom.minidom.parse(str(xml_file_path.absolute()))
+        return self.__parsed_domtree
 
-        with open(self.xml_file_path, "w", encoding='utf-8') as file:
-            domtree.writexml(file, encoding='utf-8')
+    @property
+    def __streamed_properties(self) -> dict[str, str | None]:
+        if self.__streamed_properties_cache is None:
+            expanded_names = {
+                xml_stream.expanded_name(CORE_PROPERTIES_NAMESPACES[self.__get_tag_namespace(tag)], tag): tag
+                for tag in CORE_TAGS_SUBSEQUENCE
+            }
+            reader = xml_stream.XmlStreamReader(*self.__reader_source())
+            self.__streamed_properties_cache = {
+                expanded_names[name]: value for name, value in reader.read(expanded_names).items()
+            }
+        return self.__streamed_properties_cache
 
     @staticmethod
     def __get_tag_namespace(tag: str) -> str | None:
@@ -172,68 +254,28 @@ class WordCoreXml:
                     return namespace
         return None
 
-    def __create_core_xml(self):
-        domtree = xml.dom.minidom.parse(str(DEFAULT_WORD_CORE_XML_FILEPATH.absolute()))
-
-        pathlib.Path(str(self.xml_file_path.absolute().parent)).mkdir()
-        with open(self.xml_file_path.absolute(), mode="w") as file:
-            domtree.writexml(file, encoding='utf-8')
+    def __create_core_xml(self) -> bytes:
+        pathlib.Path(str(self.xml_file_path.absolute().parent)).mkdir(exist_ok=True)
 
         content_types = WordContentTypesXml(pathlib.Path(self.xml_file_path.parent.parent, "[Content_Types].xml"))
         content_types.add_information_about_core()
 
         rels = WordRelsXml(pathlib.Path(self.xml_file_path.parent.parent, "_rels", ".rels"))
         rels.add_information_about_core()
-        self.__fill_created_date(datetime.datetime.now(pytz.utc))
-        self.__fill_modified_data(datetime.datetime.now(pytz.utc))
 
-    def __fill_created_date(self, date: datetime.datetime):
-        self.__set_property(WordCoreProperty("created", datetime_to_w3cdtf(date)))
-
-    def __fill_modified_data(self, date: datetime.datetime):
-        self.__set_property(WordCoreProperty("modified", datetime_to_w3cdtf(date)))
+        if "created" not in self.__changes:
+            self.created = datetime.datetime.now(pytz.utc)
+        if "modified" not in self.__changes:
+            self.modified = datetime.datetime.now(pytz.utc)
+        return DEFAULT_WORD_CORE_XML_FILEPATH.read_bytes()
 
     def __set_property(self, core_property: WordCoreProperty) -> None:
-        if not self.xml_file_path.exists():
-            self.__create_core_xml()
-        self.__recover_namespaces()
-
-        core_tags_subsequence = (
-            "title", "subject", "creator", "keywords", "description",
-            "lastModifiedBy", "revision", "created", "modified"
-        )
-
         match core_property:
             case WordCoreProperty(
                     property_name=str("title" | "subject" | "creator" | "keywords" | "description" |
                                       "lastModifiedBy" | "revision" | "created" | "modified" as property_name),
                     property_value=str(property_value)):
-                domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-                core_file = domtree.documentElement
-
-                core_property_name = f"{self.__get_tag_namespace(property_name)}:{property_name}"
-                try:
-                    if core_file.getElementsByTagName(core_property_name)[0].childNodes.length == 0:
-                        text_node = domtree.createTextNode(property_value)
-                        core_file.getElementsByTagName(core_property_name)[0].childNodes.append(text_node)
-                    else:
-                        core_file.getElementsByTagName(core_property_name)[0].childNodes[0].data = property_value
-                except IndexError:
-                    new_property = domtree.createElement(core_property_name)
-                    new_property.appendChild(domtree.createTextNode(property_value))
-
-                    after_property = None
-                    for core_tag in core_tags_subsequence[core_tags_subsequence.index(property_name)+1:]:
-                        after_core_property_tag = f"{self.__get_tag_namespace(core_tag)}:{core_tag}"
-                        try:
-                            after_property = core_file.getElementsByTagName(after_core_property_tag)[0]
-                            break
-                        except IndexError:
-                            continue
-                    core_file.insertBefore(new_property, after_property)
-
-                with open(self.xml_file_path, "w", encoding='utf-8') as file:
-                    domtree.writexml(file, encoding='utf-8')
+                self.__changes[property_name] = property_value
             case _:
                 raise TypeError("WordCoreXml.__set_property(core_property) core_property should be WordCoreProperty"
                                 f"(not {type(core_property)})")
@@ -241,20 +283,87 @@ class WordCoreXml:
     def __get_property(self, property_name: str) -> str | None:
         match property_name:
             case str():
-                if not self.xml_file_path.exists():
-                    self.__create_core_xml()
-                domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-                core_file = domtree.documentElement
+                if property_name in self.__changes:
+                    return self.__changes[property_name] or None
+                if self.__read_engine == "stream":
+                    return self.__streamed_properties.get(property_name)
+
+                core_file = self.__domtree.documentElement
 
                 core_property_name = f"{self.__get_tag_namespace(property_name)}:{property_name}"
                 try:
-                    return core_file.getElementsByTagName(core_property_name)[0].childNodes[0].data
+                    return core_file.getElementsByTagName(core_property_name)[0].childNodes[0].data or None
                 except IndexError:
                     return None
             case _:
                 raise TypeError(f"WordCoreXml.__get_property(property_name) property_name should be str"
                                 f"(not {type(property_name)})")
 
+    def flush(self) -> None:
+        if not self.__changes:
+            return
+        if self.xml_data is not None:
+            xml_data = self.xml_data
+        elif self.xml_file_path.exists():
+            xml_data = self.xml_file_path.read_bytes()
+        else:
+            xml_data = self.__create_core_xml()
+
+        patcher = xml_patch.XmlPatcher(xml_data)
+        for property_name, property_value in self.__changes.items():
+            namespace = self.__get_tag_namespace(property_name)
+            following_names = [
+                (CORE_PROPERTIES_NAMESPACES[self.__get_tag_namespace(core_tag)], core_tag)
+                for core_tag in CORE_TAGS_SUBSEQUENCE[CORE_TAGS_SUBSEQUENCE.index(property_name)+1:]
+            ]
+            patcher.set_text(CORE_PROPERTIES_NAMESPACES[namespace], property_name, property_value,
+                             preferred_prefix=namespace, following_names=following_names)
+
+        if self.xml_data is not None:
+            self.xml_data = patcher.patch()
+        else:
+            self.xml_file_path.write_bytes(patcher.patch())
+
+        self.__changes.clear()
+        self.__parsed_domtree = None
+        self.__streamed_properties_cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.flush()
+        return False
+
+    @property
+    def created(self) -> datetime.datetime | None:
+        if (created := self.__get_property("created")) is None:
+            return None
+        return w3cdtf_to_datetime(created)
+
+    @created.setter
+    def created(self, value: datetime.datetime) -> None:
+        match value:
+            case datetime.datetime():
+                self.__set_property(WordCoreProperty("created", datetime_to_w3cdtf(value)))
+            case _:
+                raise TypeError(f"WordCoreXml.created should be datetime.datetime (not {type(value)})")
+
+    @property
+    def modified(self) -> datetime.datetime | None:
+        if (modified := self.__get_property("modified")) is None:
+            return None
+        return w3cdtf_to_datetime(modified)
+
+    @modified.setter
+    def modified(self, value: datetime.datetime) -> None:
+        match value:
+            case datetime.datetime():
+                self.__set_property(WordCoreProperty("modified", datetime_to_w3cdtf(value)))
+            case _:
+                raise TypeError(f"WordCoreXml.modified should be datetime.datetime (not {type(value)})")
+
     @property
     def creator(self) -> str | None:
         return self.__get_property("creator")
@@ -331,60 +440,77 @@ class WordCoreXml:
             case _:
                 raise TypeError("Invalid key and value")
 
-    def __init__(self, xml_file_path: pathlib.Path):
+    def __init__(self, xml_file_path: pathlib.Path | None = None, xml_data: bytes | None = None,
+                 read_engine: Literal["stream", "dom"] = "stream"):
+        match xml_file_path, xml_data:
+            case pathlib.Path(), None:
+                pass
+            case None, bytes():
+                pass
+            case _:
+                raise TypeError("WordCoreXml(xml_file_path, xml_data) expects either xml_file_path as pathlib.Path "
+                                f"or xml_data as bytes (not {type(xml_file_path)}, {type(xml_data)})")
+        match read_engine:
+            case str("stream" | "dom"):
+                self.__read_engine = read_engine
+            case _:
+                raise ValueError(f'WordCoreXml(read_engine) read_engine should be "stream" or "dom" '
+                                 f"(not {read_engine})")
         self.xml_file_path = xml_file_path
+        self.xml_data = xml_data
+        self.__parsed_domtree = None
+        self.__streamed_properties_cache = None
+        self.__changes = {}
 
 
 class WordAppXml:
-    """Class to work with app.xml file"""
-    def __create_app_xml(self):
-        domtree = xml.dom.minidom.parse(str(DEFAULT_WORD_APP_XML_FILEPATH.absolute()))
+    """Class to work with app.xml file or in-memory app.xml data
+
+    Reads are streamed with expat. Changes are kept until flush(), which patches only the text of changed
+    elements, so every other byte of the part stays as it is.
+    """
+    def __reader_source(self) -> tuple[pathlib.Path | None, bytes | None]:
+        if self.xml_data is not None:
+            return None, self.xml_data
+        if self.xml_file_path.exists():
+            return self.xml_file_path, None
+        return DEFAULT_WORD_APP_XML_FILEPATH, None
 
-        if not self.xml_file_path.absolute().parent.exists():
-            pathlib.Path(str(self.xml_file_path.absolute().parent)).mkdir()
-        with open(self.xml_file_path.absolute(), mode="w") as file:
-            domtree.writexml(file, encoding='utf-8')
+    @property
+    def __domtree(self) -> xml.dom.minidom.Document:
+        if self.__parsed_domtree is None:
+            match self.__reader_source():
+                case None, bytes() as xml_data:
+                    self.__parsed_domtree = xml.dom.minidom.parseString(xml_data)
+                case pathlib.Path() as xml_file_path, None:
+                    self.__parsed_domtree = xml.dom.minidom.parse(str(xml_file_path.absolute()))
+        return self.__parsed_domtree
+
+    @property
+    def __streamed_properties(self) -> dict[str, str | None]:
+        if self.__streamed_properties_cache is None:
+            expanded_names = {xml_stream.expanded_name(EXTENDED_PROPERTIES_NAMESPACE, tag): tag
+                              for tag in APP_READ_TAGS}
+            reader = xml_stream.XmlStreamReader(*self.__reader_source())
+            self.__streamed_properties_cache = {
+                expanded_names[name]: value for name, value in reader.read(expanded_names).items()
+            }
+        return self.__streamed_properties_cache
+
+    def __create_app_xml(self) -> bytes:
+        pathlib.Path(str(self.xml_file_path.absolute().parent)).mkdir(exist_ok=True)
 
         content_types = WordContentTypesXml(pathlib.Path(self.xml_file_path.parent.parent, "[Content_Types].xml"))
         content_types.add_information_about_app()
 
         rels = WordRelsXml(pathlib.Path(self.xml_file_path.parent.parent, "_rels", ".rels"))
         rels.add_information_about_app()
+        return DEFAULT_WORD_APP_XML_FILEPATH.read_bytes()
 
     def __set_property(self, app_property: WordAppProperty) -> None:
-        app_tags_subsequence = (
-            "Template", "TotalTime", "Pages", "Words", "Characters",
-            "Application", "DocSecurity", "Lines", "Paragraphs",
-            "ScaleCrop", "Company", "LinksUpToDate", "CharactersWithSpaces",
-            "SharedDoc", "HyperlinksChanged", "AppVersion"
-        )
         match app_property:
-            case WordAppProperty("TotalTime" | "Application" as property_name, str() | None as property_value):
-                if not self.xml_file_path.exists():
-                    self.__create_app_xml()
-                domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-                core_file = domtree.documentElement
-
-                try:
-                    if core_file.getElementsByTagName(property_name)[0].childNodes.length == 0:
-                        text_node = domtree.createTextNode(property_value)
-                        core_file.getElementsByTagName(property_name)[0].childNodes.append(text_node)
-                    else:
-                        core_file.getElementsByTagName(property_name)[0].childNodes[0].data = property_value
-                except IndexError:
-                    new_property = domtree.createElement(property_name)
-                    new_property.appendChild(domtree.createTextNode(property_value))
-
-                    after_property = None
-                    for core_tag in app_tags_subsequence[app_tags_subsequence.index(property_name) + 1:]:
-                        try:
-                            after_property = core_file.getElementsByTagName(core_tag)[0]
-                            break
-                        except IndexError:
-                            continue
-                    core_file.insertBefore(new_property, after_property)
-                with open(self.xml_file_path, "w", encoding='utf-8') as file:
-                    domtree.writexml(file, encoding='utf-8')
+            case WordAppProperty("TotalTime" | "Application" as property_name, str() as property_value):
+                self.__changes[property_name] = property_value
             case _:
                 raise TypeError("WordXmlApp.__set_property(app_property) app_property should be WordAppProperty "
                                 f'(not {type(app_property)})')
@@ -392,13 +518,15 @@ class WordAppXml:
     def __get_property(self, app_property: str) -> str | None:
         match app_property:
             case str("TotalTime" | "Application" as property_name):
-                if not self.xml_file_path.exists():
-                    self.__create_app_xml()
-                domtree = xml.dom.minidom.parse(str(self.xml_file_path.absolute()))
-                core_file = domtree.documentElement
+                if property_name in self.__changes:
+                    return self.__changes[property_name] or None
+                if self.__read_engine == "stream":
+                    return self.__streamed_properties[property_name]
+
+                core_file = self.__domtree.documentElement
 
                 try:
-                    return core_file.getElementsByTagName(property_name)[0].childNodes[0].data
+                    return core_file.getElementsByTagName(property_name)[0].childNodes[0].data or None
                 except IndexError:
                     return None
             case _:
@@ -406,6 +534,42 @@ class WordAppXml:
                                 'be str("TotalTime" | "Application") '
                                 f'(not {type(app_property)})')
 
+    def flush(self) -> None:
+        if not self.__changes:
+            return
+        if self.xml_data is not None:
+            xml_data = self.xml_data
+        elif self.xml_file_path.exists():
+            xml_data = self.xml_file_path.read_bytes()
+        else:
+            xml_data = self.__create_app_xml()
+
+        patcher = xml_patch.XmlPatcher(xml_data)
+        for property_name, property_value in self.__changes.items():
+            following_names = [
+                (EXTENDED_PROPERTIES_NAMESPACE, app_tag)
+                for app_tag in APP_TAGS_SUBSEQUENCE[APP_TAGS_SUBSEQUENCE.index(property_name) + 1:]
+            ]
+            patcher.set_text(EXTENDED_PROPERTIES_NAMESPACE, property_name, property_value,
+                             following_names=following_names)
+
+        if self.xml_data is not None:
+            self.xml_data = patcher.patch()
+        else:
+            self.xml_file_path.write_bytes(patcher.patch())
+
+        self.__changes.clear()
+        self.__parsed_domtree = None
+        self.__streamed_properties_cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.flush()
+        return False
+
     @property
     def application(self) -> str | None:
         return self.__get_property("Application")
@@ -466,217 +630,512 @@ class WordAppXml:
             case _:
                 raise TypeError("Invalid key and value")
 
-    def __init__(self, xml_file_path: pathlib.Path):
-        match xml_file_path:
-            case pathlib.Path():
-                self.xml_file_path = xml_file_path
+    def __init__(self, xml_file_path: pathlib.Path | None = None, xml_data: bytes | None = None,
+                 read_engine: Literal["stream", "dom"] = "stream"):
+        match xml_file_path, xml_data:
+            case pathlib.Path(), None:
+                pass
+            case None, bytes():
+                pass
+            case _:
+                raise TypeError("WordAppXml(xml_file_path, xml_data) expects either xml_file_path as pathlib.Path "
+                                f"or xml_data as bytes (not {type(xml_file_path)}, {type(xml_data)})")
+        match read_engine:
+            case str("stream" | "dom"):
+                self.__read_engine = read_engine
             case _:
-                raise TypeError("WordAppXml(xml_file_path) xml_file_path should be pathlib.Path"
-                                f'(not {type(xml_file_path)})')
+                raise ValueError(f'WordAppXml(read_engine) read_engine should be "stream" or "dom" '
+                                 f"(not {read_engine})")
+        self.xml_file_path = xml_file_path
+        self.xml_data = xml_data
+        self.__parsed_domtree = None
+        self.__streamed_properties_cache = None
+        self.__changes = {}
 
 
-class Metadata:
+class MetadataEditSession:
+    """Stages changes of word file metadata and commits them with one archive rewrite (or none if nothing differs)"""
     @property
-    def _temp_folder_path(self) -> pathlib.Path:
-        return pathlib.Path(f"temp_{self.__filepath.name}")
-
-    def __remove_temp_folder(self):
-        shutil.rmtree(self._temp_folder_path.absolute())
-
-    def __extract_all(self):
-        with zipfile.ZipFile(self.__filepath, "r") as zip_file:
-            zip_file.extractall(f"temp_{self.__filepath.name}")
+    def changed(self) -> bool:
+        return bool(self.__core_changes) or bool(self.__app_changes)
 
-    def __pack_all(self):
-        with zipfile.ZipFile(self.__filepath, 'w', compression=zipfile.ZIP_DEFLATED) as myzip:
-            temp_folder = self._temp_folder_path.name
-            for root, dirs, files in os.walk(temp_folder):
-                for f in files:
-                    myzip.write(os.path.join(root, f), os.path.join(root.removeprefix(temp_folder), f))
+    @property
+    def core_changes(self) -> dict[str, str | int | None]:
+        return dict(self.__core_changes)
 
     @property
-    def filepath(self) -> pathlib.Path:
-        return self.__filepath
+    def app_changes(self) -> dict[str, str | int | None]:
+        return dict(self.__app_changes)
 
     @property
     def application_name(self) -> str | None:
-        try:
-            self.__extract_all()
-            property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-            app = WordAppXml(property_xml_file)
-            application_name = app.application
-            self.__remove_temp_folder()
-            return application_name
-        except PropertyNotFoundError:
-            return None
+        if "Application" in self.__app_changes:
+            return self.__app_changes["Application"]
+        return self.__metadata.application_name
 
     @application_name.setter
     def application_name(self, value: str | None) -> None:
         match value:
             case str() | None:
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-                app = WordAppXml(property_xml_file)
-                app.application = value
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__app_changes["Application"] = value
             case _:
                 raise TypeError(f"Metadata.application_name should be str or None (not {type(value)})")
 
     @property
     def editing_time(self) -> int | None:
-        self.__extract_all()
-        property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-        app = WordAppXml(property_xml_file)
-        editing_time = app.total_time
-        self.__remove_temp_folder()
-        return editing_time
+        if "TotalTime" in self.__app_changes:
+            return self.__app_changes["TotalTime"]
+        return self.__metadata.editing_time
 
     @editing_time.setter
-    def editing_time(self, value: int | None):
+    def editing_time(self, value: int | None) -> None:
         match value:
             case int():
                 if len(str(value)) >= 10:
                     raise ValueError("Metadata.editing_time length should be less than 10 digits")
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-                app = WordAppXml(property_xml_file)
-                app.total_time = value
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__app_changes["TotalTime"] = value
             case None:
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-                app = WordAppXml(property_xml_file)
-                app.total_time = None
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__app_changes["TotalTime"] = None
             case _:
                 raise TypeError(f"Metadata.editing_time should be int or None (not {type(value)})")
 
     @property
     def creator(self) -> str | None:
-        self.__extract_all()
-        property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-        core = WordCoreXml(property_xml_file)
-        creator = core.creator
-        self.__remove_temp_folder()
-        return creator
+        if "creator" in self.__core_changes:
+            return self.__core_changes["creator"]
+        return self.__metadata.creator
 
     @creator.setter
     def creator(self, value: str | None) -> None:
         match value:
             case str() | None:
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-                core = WordCoreXml(property_xml_file)
-                core.creator = value
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__core_changes["creator"] = value
             case _:
                 raise TypeError(f"Metadata.creator should be str or None (not {type(value)})")
 
     @property
     def last_modified_by(self) -> str | None:
-        self.__extract_all()
-        property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-        core = WordCoreXml(property_xml_file)
-        last_modified_by = core.last_modified_by
-        self.__remove_temp_folder()
-        return last_modified_by
+        if "lastModifiedBy" in self.__core_changes:
+            return self.__core_changes["lastModifiedBy"]
+        return self.__metadata.last_modified_by
 
     @last_modified_by.setter
-    def last_modified_by(self, value: str | None):
+    def last_modified_by(self, value: str | None) -> None:
         match value:
             case str() | None:
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-                core = WordCoreXml(property_xml_file)
-                core.last_modified_by = value
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__core_changes["lastModifiedBy"] = value
             case _:
                 raise TypeError(f"Metadata.last_modified_by should be str or None (not {type(value)})")
 
     @property
     def revision(self) -> int | None:
-        self.__extract_all()
-        property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-        core = WordCoreXml(property_xml_file)
-        revision = core.revision
-        self.__remove_temp_folder()
-        return revision
+        if "revision" in self.__core_changes:
+            return self.__core_changes["revision"]
+        return self.__metadata.revision
 
     @revision.setter
-    def revision(self, value: int | None):
+    def revision(self, value: int | None) -> None:
         match value:
             case int() | None:
-                self.__extract_all()
-                property_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-                core = WordCoreXml(property_xml_file)
-                core.revision = value
-                self.__pack_all()
-                self.__remove_temp_folder()
+                self.__core_changes["revision"] = value
             case _:
                 raise TypeError(f"Metadata.revision should be int or None (not {type(value)})")
 
     def __getitem__(self, item: str) -> str | int | None:
         match item:
+            case str("creator"):
+                return self.creator
+            case str("lastModifiedBy"):
+                return self.last_modified_by
+            case str("revision"):
+                return self.revision
+            case str("TotalTime"):
+                return self.editing_time
+            case str("Application"):
+                return self.application_name
             case str():
-                core_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-                core = WordCoreXml(core_xml_file)
-                try:
-                    self.__extract_all()
-                    return core[item]
-                except KeyError:
-                    pass
-                finally:
-                    self.__remove_temp_folder()
-
-                app_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-                app = WordAppXml(app_xml_file)
-                try:
-                    self.__extract_all()
-                    return app[item]
-                except KeyError:
-                    raise KeyError(f'Invalid property name "{item}"')
-                finally:
-                    self.__remove_temp_folder()
+                raise KeyError(f'Invalid property name "{item}"')
             case _:
                 raise TypeError(f"Key should be string (not {type(item)})")
 
-    def __setitem__(self, key: str, value: str | int | None):
+    def __setitem__(self, key: str, value: str | int | None) -> None:
         match key, value:
+            case str("creator"), _:
+                self.creator = value
+            case str("lastModifiedBy"), _:
+                self.last_modified_by = value
+            case str("revision"), _:
+                self.revision = value
+            case str("TotalTime"), _:
+                self.editing_time = value
+            case str("Application"), _:
+                self.application_name = value
             case str(), str() | int() | None:
-                core_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "core.xml")
-                core = WordCoreXml(core_xml_file)
+                raise KeyError(f'Invalid property name "{key}"')
+            case _, str() | int() | None:
+                raise TypeError(f"Key should be string (not {type(key)})")
+            case str(), _:
+                raise TypeError(f"Value should be string/int/NoneType (not {type(value)})")
+            case _:
+                raise TypeError("Invalid key and value")
+
+    @property
+    def written(self) -> bool | None:
+        """Whether the last commit wrote the file, False when the file already had the staged values"""
+        return self.__written
+
+    def commit(self) -> None:
+        if not self.changed:
+            self.__written = False
+            return
+        self.__written = self.__commit(self.core_changes, self.app_changes)
+        self.__core_changes.clear()
+        self.__app_changes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def __init__(self, metadata, commit: callable):
+        self.__metadata = metadata
+        self.__commit = commit
+        self.__core_changes = {}
+        self.__app_changes = {}
+        self.__written = None
+
+
+def default_durability() -> Literal["none", "fsync", "group"]:
+    """Durability from $METADATA_EDITOR_DURABILITY, none by default"""
+    durability = os.environ.get(DURABILITY_ENVIRONMENT_VARIABLE) or "none"
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f'{DURABILITY_ENVIRONMENT_VARIABLE} should be one of {", ".join(DURABILITY_MODES)} '
+                         f'(not "{durability}")')
+    return durability
+
+
+def fsync_path(path: pathlib.Path) -> None:
+    """fsync a file or a folder, folders can't be synced on Windows and are skipped there"""
+    if path.is_dir():
+        if os.name != "posix":
+            return
+        file_descriptor = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    else:
+        file_descriptor = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+class DurabilityGroup:
+    """Files committed with "group" durability, synced together by flush()
+
+    Replaced files were synced before the rename, so only their folders are synced, once per folder
+    however many of its files were replaced. Until flush() a crash can bring back the previous version
+    of a file but never leaves it empty. Files updated in place are synced themselves. A file can be
+    synced from any process, so worker processes sync their files updated in place with flush_files()
+    and the folders of their files are added by the parent.
+    """
+    def add(self, path: pathlib.Path, replaced: bool = False) -> None:
+        path = path.absolute()
+        if replaced:
+            self.__folder_paths.add(path.parent)
+        else:
+            self.__file_paths.add(path)
+        self.__commits_number += 1
+
+    def flush_files(self) -> None:
+        """Sync files updated in place, folders of replaced files are left for flush()"""
+        file_paths, self.__file_paths = self.__file_paths, set()
+        for path in file_paths:
+            fsync_path(path)
+
+    def flush(self) -> None:
+        self.flush_files()
+        folder_paths, self.__folder_paths = self.__folder_paths, set()
+        for folder_path in folder_paths:
+            fsync_path(folder_path)
+        self.__commits_number = 0
+
+    def __len__(self) -> int:
+        """Number of commits since the last flush()"""
+        return self.__commits_number
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.flush()
+        return False
+
+    def __init__(self):
+        self.__file_paths = set()
+        self.__folder_paths = set()
+        self.__commits_number = 0
+
+
+def default_update_mode() -> Literal["rewrite", "append", "padded"]:
+    """Update mode from $METADATA_EDITOR_UPDATE_MODE, rewrite by default"""
+    update_mode = os.environ.get(UPDATE_MODE_ENVIRONMENT_VARIABLE) or "rewrite"
+    if update_mode not in UPDATE_MODES:
+        raise ValueError(f'{UPDATE_MODE_ENVIRONMENT_VARIABLE} should be one of {", ".join(UPDATE_MODES)} '
+                         f'(not "{update_mode}")')
+    return update_mode
+
+
+class Metadata:
+    @property
+    def _staged_filepath(self) -> pathlib.Path | None:
+        """Staged package of the last rewrite (it replaces the file or is removed when the commit finishes)"""
+        return self.__staged_filepath
+
+    def __read_parts(self, *part_names: str) -> tuple[bytes | None, ...]:
+        parts = []
+        with zipfile.ZipFile(self.__filepath, "r") as zip_file:
+            for part_name in part_names:
+                try:
+                    parts.append(zip_file.read(part_name))
+                except KeyError:
+                    parts.append(None)
+        return tuple(parts)
+
+    @staticmethod
+    def __core_xml_from(xml_data: bytes | None) -> WordCoreXml:
+        if xml_data is None:
+            xml_data = DEFAULT_WORD_CORE_XML_FILEPATH.read_bytes()
+        return WordCoreXml(xml_data=xml_data)
+
+    @staticmethod
+    def __app_xml_from(xml_data: bytes | None) -> WordAppXml:
+        if xml_data is None:
+            xml_data = DEFAULT_WORD_APP_XML_FILEPATH.read_bytes()
+        return WordAppXml(xml_data=xml_data)
+
+    @property
+    def __core_xml(self) -> WordCoreXml:
+        return self.__core_xml_from(*self.__read_parts(CORE_XML_PART_NAME))
+
+    @property
+    def __app_xml(self) -> WordAppXml:
+        return self.__app_xml_from(*self.__read_parts(APP_XML_PART_NAME))
+
+    def snapshot(self) -> MetadataSnapshot:
+        core_data, app_data = self.__read_parts(CORE_XML_PART_NAME, APP_XML_PART_NAME)
+        core = self.__core_xml_from(core_data)
+        app = self.__app_xml_from(app_data)
+        return MetadataSnapshot(
+            creator=core.creator,
+            last_modified_by=core.last_modified_by,
+            revision=core.revision,
+            application_name=app.application,
+            editing_time=app.total_time
+        )
+
+    @property
+    def filepath(self) -> pathlib.Path:
+        return self.__filepath
+
+    @staticmethod
+    def __stage_changes(xml: WordCoreXml | WordAppXml, xml_data: bytes | None,
+                        changes: dict[str, str | int | None]) -> bool:
+        """Stage changes in the part and tell if they differ from its values, a missing part always differs"""
+        current_values = {key: xml[key] for key in changes} if xml_data is not None else None
+        for key, value in changes.items():
+            xml[key] = value
+        return current_values is None or any(xml[key] != current_values[key] for key in changes)
+
+    def __commit(self, core_changes: dict[str, str | int | None], app_changes: dict[str, str | int | None]) -> bool:
+        """Write the changes and tell if the file was written, nothing is written when the file has these values"""
+        core_data, app_data, content_types_data, rels_data = self.__read_parts(
+            CORE_XML_PART_NAME, APP_XML_PART_NAME, CONTENT_TYPES_XML_PART_NAME, RELS_XML_PART_NAME
+        )
+        core = self.__core_xml_from(core_data) if core_changes else None
+        app = self.__app_xml_from(app_data) if app_changes else None
+        core_changed = core is not None and self.__stage_changes(core, core_data, core_changes)
+        app_changed = app is not None and self.__stage_changes(app, app_data, app_changes)
+        if not core_changed and not app_changed:
+            return False
+
+        content_types = WordContentTypesXml(xml_data=content_types_data)
+        rels = WordRelsXml(xml_data=rels_data)
+        replaced_parts = {}
+
+        if core_changed:
+            if core_data is None:
+                core.created = datetime.datetime.now(pytz.utc)
+                core.modified = datetime.datetime.now(pytz.utc)
+                content_types.add_information_about_core()
+                rels.add_information_about_core()
+            core.flush()
+            replaced_parts[CORE_XML_PART_NAME] = core.xml_data
+
+        if app_changed:
+            if app_data is None:
+                content_types.add_information_about_app()
+                rels.add_information_about_app()
+            app.flush()
+            replaced_parts[APP_XML_PART_NAME] = app.xml_data
+
+        if content_types.xml_data != content_types_data:
+            replaced_parts[CONTENT_TYPES_XML_PART_NAME] = content_types.xml_data
+        if rels.xml_data != rels_data:
+            replaced_parts[RELS_XML_PART_NAME] = rels.xml_data
+
+        match self.__update_mode:
+            case "append":
+                zip_package.append(self.__filepath, replaced_parts)
+                self.__sync(False)
+            case "padded":
+                if zip_package.overwrite_in_place(self.__filepath, replaced_parts):
+                    self.__sync(False)
+                    return True
+                # Padding is missing or exhausted, both parts are padded again so the next edit is in place
+                for part_name, part_data in ((CORE_XML_PART_NAME, core_data), (APP_XML_PART_NAME, app_data)):
+                    if part_name not in replaced_parts and part_data is not None:
+                        replaced_parts[part_name] = part_data
+                self.__rewrite(replaced_parts, (CORE_XML_PART_NAME, APP_XML_PART_NAME))
+            case _:
+                self.__rewrite(replaced_parts)
+        return True
+
+    def __sync(self, replaced: bool) -> None:
+        """Sync the committed file, the data of a replaced file is synced before the rename, only its folder is left"""
+        match self.__durability:
+            case "fsync":
+                fsync_path(self.__filepath.parent if replaced else self.__filepath)
+            case "group":
+                self.__durability_group.add(self.__filepath, replaced)
+
+    def __rewrite(self, replaced_parts: dict[str, bytes], padded_parts: tuple[str, ...] = ()) -> None:
+        """Write the package to a sibling file and replace the original with it, so a crash leaves one of them"""
+        file_descriptor, staged_filepath = tempfile.mkstemp(prefix=f".{self.__filepath.name}.",
+                                                            suffix=STAGED_FILE_SUFFIX, dir=self.__filepath.parent)
+        os.close(file_descriptor)
+        self.__staged_filepath = pathlib.Path(staged_filepath)
+        try:
+            zip_package.rewrite(self.__filepath, self.__staged_filepath, replaced_parts, padded_parts)
+            shutil.copymode(self.__filepath, self.__staged_filepath)
+            # Data has to be on the disk before the rename is, otherwise a crash can leave an empty file
+            if self.__durability in ("fsync", "group"):
+                fsync_path(self.__staged_filepath)
+            os.replace(self.__staged_filepath, self.__filepath)
+        except BaseException:
+            self.__staged_filepath.unlink(missing_ok=True)
+            raise
+        self.__sync(True)
+
+    def edit(self) -> MetadataEditSession:
+        return MetadataEditSession(self, self.__commit)
+
+    def dead_bytes(self) -> int:
+        """Space taken by parts replaced in "append" update mode"""
+        return zip_package.dead_bytes(self.__filepath)
+
+    def compact(self) -> int:
+        """Rewrite the package without dead bytes and return the number of reclaimed bytes"""
+        if (reclaimable_bytes := self.dead_bytes()) == 0:
+            return 0
+        self.__rewrite({})
+        return reclaimable_bytes
+
+    @property
+    def application_name(self) -> str | None:
+        return self.__app_xml.application
+
+    @application_name.setter
+    def application_name(self, value: str | None) -> None:
+        with self.edit() as session:
+            session.application_name = value
+
+    @property
+    def editing_time(self) -> int | None:
+        return self.__app_xml.total_time
+
+    @editing_time.setter
+    def editing_time(self, value: int | None):
+        with self.edit() as session:
+            session.editing_time = value
+
+    @property
+    def creator(self) -> str | None:
+        return self.__core_xml.creator
+
+    @creator.setter
+    def creator(self, value: str | None) -> None:
+        with self.edit() as session:
+            session.creator = value
+
+    @property
+    def last_modified_by(self) -> str | None:
+        return self.__core_xml.last_modified_by
+
+    @last_modified_by.setter
+    def last_modified_by(self, value: str | None):
+        with self.edit() as session:
+            session.last_modified_by = value
+
+    @property
+    def revision(self) -> int | None:
+        return self.__core_xml.revision
+
+    @revision.setter
+    def revision(self, value: int | None):
+        with self.edit() as session:
+            session.revision = value
+
+    def __getitem__(self, item: str) -> str | int | None:
+        match item:
+            case str():
                 try:
-                    self.__extract_all()
-                    core[key] = value
-                    self.__pack_all()
+                    return self.__core_xml[item]
                 except KeyError:
                     pass
-                else:
-                    return
-                finally:
-                    self.__remove_temp_folder()
 
-                app_xml_file = pathlib.Path(self._temp_folder_path, "docProps", "app.xml")
-                app = WordAppXml(app_xml_file)
                 try:
-                    self.__extract_all()
-                    app[key] = value
-                    self.__pack_all()
+                    return self.__app_xml[item]
                 except KeyError:
-                    raise KeyError(f'Invalid property name "{key}"')
-                finally:
-                    self.__remove_temp_folder()
-            case _, str() | int() | None:
-                raise TypeError(f"Key should be string (not {type(key)})")
-            case str(), _:
-                raise TypeError(f"Value should be string or NoneType (not {type(key)})")
+                    raise KeyError(f'Invalid property name "{item}"')
             case _:
-                raise TypeError("Invalid key and value")
+                raise TypeError(f"Key should be string (not {type(item)})")
+
+    def __setitem__(self, key: str, value: str | int | None):
+        with self.edit() as session:
+            session[key] = value
 
-    def __init__(self, filepath: pathlib.Path):
+    def __init__(self, filepath: pathlib.Path, update_mode: Literal["rewrite", "append", "padded"] | None = None,
+                 durability: Literal["none", "fsync", "group"] | None = None,
+                 durability_group: DurabilityGroup | None = None):
+        match update_mode:
+            case None:
+                update_mode = default_update_mode()
+            case str() if update_mode in UPDATE_MODES:
+                pass
+            case _:
+                raise ValueError(f'Metadata(filepath, update_mode) update_mode should be one of '
+                                 f'{", ".join(UPDATE_MODES)} or None (not {update_mode!r})')
+        match durability:
+            case None:
+                durability = default_durability()
+            case str() if durability in DURABILITY_MODES:
+                pass
+            case _:
+                raise ValueError(f'Metadata(filepath, update_mode, durability) durability should be one of '
+                                 f'{", ".join(DURABILITY_MODES)} or None (not {durability!r})')
+        match durability_group:
+            case DurabilityGroup() | None:
+                pass
+            case _:
+                raise TypeError(f"Metadata(filepath, update_mode, durability, durability_group) durability_group "
+                                f"should be DurabilityGroup or None (not {type(durability_group)})")
+        # Nothing would ever sync a "group" commit without a group
+        if durability == "group" and durability_group is None:
+            durability = "fsync"
         self.__filepath = filepath
+        self.__update_mode = update_mode
+        self.__durability = durability
+        self.__durability_group = durability_group
+        self.__staged_filepath = None
@@ -0,0 +1,184 @@
+import codecs
+import xml.parsers.expat
+from typing import NamedTuple, Iterable
+from xml.sax.saxutils import escape, quoteattr
+
+import xml_stream
+
+
+# Constants
+ASCII_COMPATIBLE_ENCODINGS = ("utf-8", "utf8", "us-ascii", "ascii", "iso-8859-1", "latin-1", "windows-1252")
+
+
+class XmlElementSpan(NamedTuple):
+    qualified_name: bytes
+    start: int  # Index of "<" of the start tag
+    start_tag_end: int  # Index of ">" of the start tag
+    end: int  # Index of "<" of the end tag (or start_tag_end + 1 for empty-element tags)
+    attributes: dict[str, str]
+
+    @property
+    def self_closing(self) -> bool:
+        return self.end == self.start_tag_end + 1
+
+
+class XmlPatcher:
+    """Changes text of root children and appends new children of an XML part
+
+    Only the text spans of changed elements and the insertion points of new elements are rewritten,
+    every other byte of the part stays as it is.
+    """
+    def __find_start_tag_end(self, start: int) -> int:
+        quote = None
+        for index in range(start, len(self.xml_data)):
+            char = self.xml_data[index:index + 1]
+            if quote is not None:
+                if char == quote:
+                    quote = None
+            elif char in (b'"', b"'"):
+                quote = char
+            elif char == b">":
+                return index
+        raise ValueError("Start tag is not closed")
+
+    def __span(self, start: int, end: int, attributes: dict[str, str]) -> XmlElementSpan:
+        start_tag_end = self.__find_start_tag_end(start)
+        qualified_name = self.xml_data[start + 1:start_tag_end].split(None, 1)[0].rstrip(b"/")
+        if self.xml_data[start_tag_end - 1:start_tag_end] == b"/":
+            end = start_tag_end + 1
+        return XmlElementSpan(qualified_name, start, start_tag_end, end, attributes)
+
+    def __index(self) -> None:
+        """Find spans of the root element and its children in one expat pass"""
+        starts = []
+        parser = xml.parsers.expat.ParserCreate(namespace_separator=xml_stream.NAMESPACE_SEPARATOR)
+
+        def xml_declaration(_version, encoding, _standalone):
+            if encoding is not None:
+                self.__encoding = encoding.lower()
+
+        def start_namespace_declaration(prefix, uri):
+            if not starts:
+                self.__namespaces[prefix] = uri
+
+        def start_element(name, attributes):
+            starts.append((name, parser.CurrentByteIndex, attributes))
+
+        def end_element(_name):
+            name, start, attributes = starts.pop()
+            if len(starts) == 1:
+                self.children.append((name, self.__span(start, parser.CurrentByteIndex, attributes)))
+            elif not starts:
+                self.__root = self.__span(start, parser.CurrentByteIndex, attributes)
+
+        parser.XmlDeclHandler = xml_declaration
+        parser.StartNamespaceDeclHandler = start_namespace_declaration
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.Parse(self.xml_data, True)
+
+        if self.xml_data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            self.__encoding = "utf-16"
+        if self.__encoding not in ASCII_COMPATIBLE_ENCODINGS:
+            raise ValueError(f'XmlPatcher does not support "{self.__encoding}" encoded parts')
+
+    def __child(self, name: str) -> XmlElementSpan | None:
+        for child_name, span in self.children:
+            if child_name == name:
+                return span
+        return None
+
+    def __qualified_name(self, namespace_uri: str, local_name: str, preferred_prefix: str | None) -> str:
+        for prefix, uri in (self.__namespaces | self.__new_namespaces).items():
+            if uri == namespace_uri:
+                return local_name if prefix is None else f"{prefix}:{local_name}"
+
+        prefix = preferred_prefix
+        index = 0
+        while prefix is None or prefix in self.__namespaces or prefix in self.__new_namespaces:
+            prefix = f"ns{index}"
+            index += 1
+        self.__new_namespaces[prefix] = namespace_uri
+        return f"{prefix}:{local_name}"
+
+    def __encode(self, text: str) -> bytes:
+        return text.encode(self.__encoding, "xmlcharrefreplace")
+
+    def set_text(self, namespace_uri: str, local_name: str, text: str, preferred_prefix: str | None = None,
+                 following_names: Iterable[tuple[str, str]] = ()) -> None:
+        """Set text of the first root child with the given name
+
+        A missing child is inserted before the first present element of following_names
+        or at the end of the root element.
+        """
+        self.__texts[xml_stream.expanded_name(namespace_uri, local_name)] = (
+            namespace_uri, local_name, text, preferred_prefix, tuple(following_names)
+        )
+
+    def append_child(self, markup: str) -> None:
+        """Insert serialized element at the end of the root element"""
+        self.__appended_children.append(markup)
+
+    def patch(self) -> bytes:
+        edits = []
+        root_end_insertions = []
+
+        for name, (namespace_uri, local_name, text, preferred_prefix, following_names) in self.__texts.items():
+            escaped_text = self.__encode(escape(text))
+            if (span := self.__child(name)) is not None:
+                if not span.self_closing:
+                    edits.append((span.start_tag_end + 1, span.end, 1, escaped_text))
+                elif text != "":
+                    edits.append((span.start_tag_end - 1, span.end, 1,
+                                  b">" + escaped_text + b"</" + span.qualified_name + b">"))
+                continue
+
+            qualified_name = self.__encode(self.__qualified_name(namespace_uri, local_name, preferred_prefix))
+            element = b"<" + qualified_name + b">" + escaped_text + b"</" + qualified_name + b">"
+            for following_name in following_names:
+                if (following_span := self.__child(xml_stream.expanded_name(*following_name))) is not None:
+                    edits.append((following_span.start, following_span.start, 1, element))
+                    break
+            else:
+                root_end_insertions.append(element)
+
+        root_end_insertions.extend(self.__encode(markup) for markup in self.__appended_children)
+
+        namespace_declarations = b"".join(
+            self.__encode(f" xmlns:{prefix}={quoteattr(uri)}")
+            for prefix, uri in self.__new_namespaces.items()
+        )
+        root = self.__root
+        if namespace_declarations:
+            position = root.start_tag_end - 1 if root.self_closing else root.start_tag_end
+            edits.append((position, position, 0, namespace_declarations))
+        if root_end_insertions:
+            if root.self_closing:
+                edits.append((root.start_tag_end - 1, root.end, 1,
+                              b">" + b"".join(root_end_insertions) + b"</" + root.qualified_name + b">"))
+            else:
+                edits.append((root.end, root.end, 2, b"".join(root_end_insertions)))
+
+        result = []
+        cursor = 0
+        for start, end, _order, replacement in sorted(edits, key=lambda edit: (edit[0], edit[2])):
+            result.append(self.xml_data[cursor:start])
+            result.append(replacement)
+            cursor = max(cursor, end)
+        result.append(self.xml_data[cursor:])
+        return b"".join(result)
+
+    def __init__(self, xml_data: bytes):
+        match xml_data:
+            case bytes():
+                self.xml_data = xml_data
+            case _:
+                raise TypeError(f"XmlPatcher(xml_data) xml_data should be bytes (not {type(xml_data)})")
+        self.children = []
+        self.__root = None
+        self.__encoding = "utf-8"
+        self.__namespaces = {}
+        self.__new_namespaces = {}
+        self.__texts = {}
+        self.__appended_children = []
+        self.__index()
@@ -0,0 +1,83 @@
+import pathlib
+import xml.parsers.expat
+from typing import Iterable
+
+
+# Constants
+NAMESPACE_SEPARATOR = " "
+
+
+class _ReadCompleted(Exception):
+    pass
+
+
+def expanded_name(namespace_uri: str, local_name: str) -> str:
+    """Name of an element as expat reports it with namespace processing enabled"""
+    return f"{namespace_uri}{NAMESPACE_SEPARATOR}{local_name}"
+
+
+class XmlStreamReader:
+    """Reads text of the root element children without building a DOM
+
+    Parsing stops as soon as every requested element is found, so big trailing
+    vectors (e.g. TitlesOfParts in app.xml) are never parsed.
+    """
+    def read(self, element_names: Iterable[str]) -> dict[str, str | None]:
+        requested_names = set(element_names)
+        result = dict.fromkeys(requested_names)
+        found_names = set()
+        depth = 0
+        current_name = None
+        text_chunks = []
+
+        def start_element(name, _attributes):
+            nonlocal depth, current_name
+            depth += 1
+            if depth == 2 and name in requested_names and name not in found_names:
+                current_name = name
+                text_chunks.clear()
+
+        def end_element(_name):
+            nonlocal depth, current_name
+            if depth == 2 and current_name is not None:
+                result[current_name] = "".join(text_chunks) or None
+                found_names.add(current_name)
+                current_name = None
+                if found_names == requested_names:
+                    raise _ReadCompleted
+            depth -= 1
+
+        def character_data(data):
+            if depth == 2 and current_name is not None:
+                text_chunks.append(data)
+
+        if not requested_names:
+            return result
+
+        parser = xml.parsers.expat.ParserCreate(namespace_separator=NAMESPACE_SEPARATOR)
+        parser.buffer_text = True
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+
+        try:
+            if self.xml_data is not None:
+                parser.Parse(self.xml_data, True)
+            else:
+                with open(self.xml_file_path, "rb") as file:
+                    parser.ParseFile(file)
+        except _ReadCompleted:
+            pass
+        return result
+
+    def __init__(self, xml_file_path: pathlib.Path | None = None, xml_data: bytes | None = None):
+        match xml_file_path, xml_data:
+            case pathlib.Path(), None:
+                pass
+            case None, bytes():
+                pass
+            case _:
+                raise TypeError("XmlStreamReader(xml_file_path, xml_data) expects either xml_file_path as "
+                                f"pathlib.Path or xml_data as bytes (not {type(xml_file_path)}, {type(xml_data)})")
+        self.xml_file_path = xml_file_path
+        self.xml_data = xml_data
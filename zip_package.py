@@ -0,0 +1,197 @@
+import copy
+import os
+import pathlib
+import struct
+import time
+import warnings
+import zipfile
+import zlib
+from typing import Iterable
+
+
+# Constants
+COPY_CHUNK_SIZE = 1024 * 1024
+LOCAL_HEADER_NAME_LENGTHS_OFFSET = 26
+DATA_DESCRIPTOR_FLAG = 0x08
+DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+DATA_DESCRIPTOR_SIZE = 12
+ZIP64_DATA_DESCRIPTOR_SIZE = 20
+ENCRYPTED_FLAG = 0x01
+LOCAL_HEADER_CRC_OFFSET = 14
+CENTRAL_DIRECTORY_CRC_OFFSET = 16
+CENTRAL_DIRECTORY_NAME_LENGTHS_OFFSET = 28
+# Padded parts are stored uncompressed with this many spaces after the XML for later in-place edits
+PADDING_SIZE = 1024
+PADDING_CHARACTER = b" "
+
+
+def __skip_local_header(source: zipfile.ZipFile, zip_info: zipfile.ZipInfo) -> None:
+    source.fp.seek(zip_info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f'Bad local file header of "{zip_info.filename}"')
+    name_length, extra_length = struct.unpack_from("<HH", header, LOCAL_HEADER_NAME_LENGTHS_OFFSET)
+    source.fp.seek(name_length + extra_length, os.SEEK_CUR)
+
+
+def copy_member_raw(source: zipfile.ZipFile, target: zipfile.ZipFile, zip_info: zipfile.ZipInfo) -> None:
+    """Copy compressed bytes of a member with its original CRC, sizes and compression method"""
+    __skip_local_header(source, zip_info)
+
+    target_info = copy.copy(zip_info)
+    # Sizes and CRC are already known, so they go to the local header instead of a data descriptor
+    target_info.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    target.fp.seek(target.start_dir)
+    target_info.header_offset = target.fp.tell()
+    target.fp.write(target_info.FileHeader())
+
+    remaining = zip_info.compress_size
+    while remaining > 0:
+        chunk = source.fp.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f'Member "{zip_info.filename}" is truncated')
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+
+    target.start_dir = target.fp.tell()
+    target.filelist.append(target_info)
+    target.NameToInfo[target_info.filename] = target_info
+
+
+def pad(part_data: bytes, size: int) -> bytes:
+    """XML part followed by spaces up to size, the padding of an earlier write is dropped first"""
+    part_data = part_data.rstrip()
+    if len(part_data) > size:
+        raise ValueError(f"Part of {len(part_data)} bytes doesn't fit into {size} bytes")
+    return part_data + PADDING_CHARACTER * (size - len(part_data))
+
+
+def __replaced_entry(part_name: str, part_data: bytes, zip_info: zipfile.ZipInfo | None,
+                     padded: bool = False) -> tuple[zipfile.ZipInfo, bytes]:
+    """Entry of a replaced part that keeps date and attributes of the entry it replaces"""
+    if zip_info is not None:
+        replaced_info = zipfile.ZipInfo(part_name, date_time=zip_info.date_time)
+        replaced_info.external_attr = zip_info.external_attr
+    else:
+        replaced_info = zipfile.ZipInfo(part_name, date_time=time.localtime(time.time())[:6])
+    if padded:
+        replaced_info.compress_type = zipfile.ZIP_STORED
+        part_data = pad(part_data, len(part_data.rstrip()) + PADDING_SIZE)
+    else:
+        replaced_info.compress_type = zipfile.ZIP_DEFLATED
+    return replaced_info, part_data
+
+
+def rewrite(source_path: pathlib.Path, target_path: pathlib.Path, replaced_parts: dict[str, bytes],
+            padded_parts: Iterable[str] = ()) -> None:
+    """Write a copy of the package where only replaced_parts are encoded again.
+
+    Parts missing in the source package are appended to the end of the new one.
+    Replaced parts named in padded_parts are stored uncompressed with PADDING_SIZE spaces of reserve,
+    so later edits can overwrite them in place (see overwrite_in_place()).
+    """
+    padded_parts = set(padded_parts)
+    with zipfile.ZipFile(source_path, "r") as source, zipfile.ZipFile(target_path, "w") as target:
+        for zip_info in source.infolist():
+            if zip_info.filename in replaced_parts:
+                target.writestr(*__replaced_entry(zip_info.filename, replaced_parts[zip_info.filename], zip_info,
+                                                  zip_info.filename in padded_parts))
+            else:
+                copy_member_raw(source, target, zip_info)
+
+        source_names = set(source.namelist())
+        for part_name, part_data in replaced_parts.items():
+            if part_name not in source_names:
+                target.writestr(*__replaced_entry(part_name, part_data, None, part_name in padded_parts))
+
+
+def append(path: pathlib.Path, replaced_parts: dict[str, bytes]) -> None:
+    """Update the package in place by appending new entries of replaced_parts and a new central directory
+
+    The new entries are written after the end of the file, so the old central directory stays valid
+    until the new one is complete. Old entries of replaced parts and the old central directory stay
+    in the file as dead bytes until the package is compacted (rewritten without changes).
+    """
+    with zipfile.ZipFile(path, "a") as package:
+        package.start_dir = package.fp.seek(0, os.SEEK_END)
+        for part_name, part_data in replaced_parts.items():
+            old_info = package.NameToInfo.get(part_name)
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+                package.writestr(*__replaced_entry(part_name, part_data, old_info))
+            # Only the new entry is written to the central directory
+            if old_info is not None:
+                package.filelist.remove(old_info)
+
+
+def dead_bytes(path: pathlib.Path) -> int:
+    """Number of bytes between the entries referenced by the central directory, e.g. replaced entries and old
+    central directories left by append()"""
+    with zipfile.ZipFile(path, "r") as package:
+        zip_infos = package.infolist()
+        live_bytes = 0
+        for zip_info in zip_infos:
+            __skip_local_header(package, zip_info)
+            package.fp.seek(zip_info.compress_size, os.SEEK_CUR)
+            entry_end = package.fp.tell()
+            if zip_info.flag_bits & DATA_DESCRIPTOR_FLAG:
+                descriptor_size = (ZIP64_DATA_DESCRIPTOR_SIZE if zip_info.file_size > zipfile.ZIP64_LIMIT
+                                   else DATA_DESCRIPTOR_SIZE)
+                if package.fp.read(4) == DATA_DESCRIPTOR_SIGNATURE:
+                    descriptor_size += 4
+                entry_end += descriptor_size
+            live_bytes += entry_end - zip_info.header_offset
+
+        first_header_offset = min((zip_info.header_offset for zip_info in zip_infos), default=package.start_dir)
+        return max(package.start_dir - first_header_offset - live_bytes, 0)
+
+
+def __central_directory_offsets(package: zipfile.ZipFile) -> dict[str, int]:
+    """Offsets of central directory records, they are in the order of package.infolist()"""
+    offsets = {}
+    package.fp.seek(package.start_dir)
+    for zip_info in package.infolist():
+        offset = package.fp.tell()
+        record = package.fp.read(zipfile.sizeCentralDir)
+        if len(record) != zipfile.sizeCentralDir or record[:4] != zipfile.stringCentralDir:
+            raise zipfile.BadZipFile(f'Bad central directory record of "{zip_info.filename}"')
+        name_length, extra_length, comment_length = struct.unpack_from("<HHH", record,
+                                                                       CENTRAL_DIRECTORY_NAME_LENGTHS_OFFSET)
+        package.fp.seek(name_length + extra_length + comment_length, os.SEEK_CUR)
+        offsets[zip_info.filename] = offset
+    return offsets
+
+
+def __write_at(file, data: bytes, offset: int) -> None:
+    if hasattr(os, "pwrite"):
+        os.pwrite(file.fileno(), data, offset)
+    else:
+        file.seek(offset)
+        file.write(data)
+
+
+def overwrite_in_place(path: pathlib.Path, replaced_parts: dict[str, bytes]) -> bool:
+    """Overwrite padded stored parts in place, only their data and CRCs are written
+
+    Nothing is written and False is returned when any part is missing, compressed or doesn't fit into its entry.
+    """
+    with open(path, "r+b") as file:
+        with zipfile.ZipFile(file, "r") as package:
+            central_directory_offsets = __central_directory_offsets(package)
+            writes = []
+            for part_name, part_data in replaced_parts.items():
+                zip_info = package.NameToInfo.get(part_name)
+                if (zip_info is None or zip_info.compress_type != zipfile.ZIP_STORED
+                        or zip_info.flag_bits & (DATA_DESCRIPTOR_FLAG | ENCRYPTED_FLAG)
+                        or len(part_data.rstrip()) > zip_info.file_size):
+                    return False
+                __skip_local_header(package, zip_info)
+                writes.append((package.fp.tell(), zip_info.header_offset, central_directory_offsets[part_name],
+                               pad(part_data, zip_info.file_size)))
+
+        for data_offset, header_offset, central_directory_offset, part_data in writes:
+            crc = struct.pack("<I", zlib.crc32(part_data))
+            __write_at(file, part_data, data_offset)
+            __write_at(file, crc, header_offset + LOCAL_HEADER_CRC_OFFSET)
+            __write_at(file, crc, central_directory_offset + CENTRAL_DIRECTORY_CRC_OFFSET)
+    return True